@@ -0,0 +1,201 @@
+"""
+Action Log - Append-only, segmented history of executed daemon actions
+Entries are written as JSON lines to the active segment, which rotates by size or age.
+Sealed segments can be gzipped, and history is read back as a filtered stream.
+"""
+
+import os
+import gzip
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Timestamp = Union[str, datetime]
+
+
+def _as_iso(value: Optional[Timestamp]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+class ActionLog:
+    """Segmented JSONL action log with size/age rotation"""
+
+    SEGMENT_PREFIX = "actions-"
+
+    def __init__(self, log_dir: Path, max_segment_bytes: int = 10 * 1024 * 1024,
+                 max_segment_age_seconds: int = 24 * 3600, compress: bool = True):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(exist_ok=True, parents=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age_seconds = max_segment_age_seconds
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._active = None
+        self._active_path: Optional[Path] = None
+        self._active_started: Optional[datetime] = None
+        self._sequence = 0
+
+        self._resume()
+
+    def _segment_name(self, started: datetime) -> str:
+        self._sequence += 1
+        return f"{self.SEGMENT_PREFIX}{started.strftime('%Y%m%dT%H%M%S')}-{self._sequence:06d}.jsonl"
+
+    @staticmethod
+    def _segment_started(path: Path) -> datetime:
+        stamp = path.name.split('-')[1]
+        return datetime.strptime(stamp, '%Y%m%dT%H%M%S')
+
+    def segments(self) -> List[Path]:
+        """All segments, oldest first"""
+        paths = {p.name: p for p in self.log_dir.glob(f"{self.SEGMENT_PREFIX}*") if not p.name.endswith('.tmp')}
+        # Once the compressed copy is in place the plain file is about to be removed; read the copy only
+        return sorted(path for name, path in paths.items() if name + '.gz' not in paths)
+
+    def _resume(self):
+        """Pick up the sequence counter and reopen the newest uncompressed segment"""
+        # A rotation interrupted between writing the compressed copy and removing the original
+        for path in self.log_dir.glob(f"{self.SEGMENT_PREFIX}*.jsonl"):
+            if path.with_name(path.name + '.gz').exists():
+                path.unlink()
+        segments = self.segments()
+        if segments:
+            self._sequence = max(int(p.name.split('-')[2].split('.')[0]) for p in segments)
+            newest = segments[-1]
+            if newest.suffix == '.jsonl':
+                self._active_path = newest
+                self._active_started = self._segment_started(newest)
+                self._active = open(newest, 'a')
+            # Older plain segments were left uncompressed by an interrupted rotation
+            for path in segments[:-1]:
+                if path.suffix == '.jsonl' and self.compress:
+                    self._compress_segment(path)
+
+    def _open_segment(self):
+        self._active_started = datetime.now()
+        self._active_path = self.log_dir / self._segment_name(self._active_started)
+        self._active = open(self._active_path, 'a')
+
+    def _should_rotate(self) -> bool:
+        if self._active is None:
+            return True
+        if self._active.tell() >= self.max_segment_bytes:
+            return True
+        age = (datetime.now() - self._active_started).total_seconds()
+        return age >= self.max_segment_age_seconds
+
+    def _compress_segment(self, path: Path):
+        try:
+            tmp_path = path.with_name(path.name + '.gz.tmp')
+            with open(path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, path.with_name(path.name + '.gz'))
+            path.unlink()
+        except Exception as e:
+            logger.error(f"Failed to compress action log segment {path.name}: {e}")
+
+    def rotate(self):
+        """Seal the active segment and start a new one"""
+        with self._lock:
+            self._rotate()
+
+    def _rotate(self):
+        sealed = self._active_path
+        if self._active is not None:
+            self._active.close()
+        self._open_segment()
+        if sealed and self.compress:
+            threading.Thread(target=self._compress_segment, args=(sealed,),
+                             name="action-log-compress", daemon=True).start()
+
+    def append(self, entry: Dict):
+        """Append one action record"""
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._should_rotate():
+                self._rotate()
+            self._active.write(line)
+            self._active.flush()
+
+    def _read_segment(self, path: Path) -> Iterator[Dict]:
+        opener = gzip.open if path.suffix == '.gz' else open
+        try:
+            with opener(path, 'rt') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable action log line in {path.name}")
+        except FileNotFoundError:
+            # Segment was compressed while we were listing; read the compressed copy
+            if path.suffix == '.jsonl':
+                yield from self._read_segment(path.with_name(path.name + '.gz'))
+
+    def query(self, trigger_id: Optional[str] = None, action_id: Optional[str] = None,
+              since: Optional[Timestamp] = None, until: Optional[Timestamp] = None) -> Iterator[Dict]:
+        """Stream matching entries oldest first without loading the full history"""
+        since, until = _as_iso(since), _as_iso(until)
+        segments = self.segments()
+
+        for i, path in enumerate(segments):
+            started = self._segment_started(path).isoformat()
+            if until is not None and started > until:
+                break
+            # A segment ends where the next one starts (names are truncated to whole seconds)
+            if since is not None and i + 1 < len(segments):
+                next_started = self._segment_started(segments[i + 1]) + timedelta(seconds=1)
+                if next_started.isoformat() <= since:
+                    continue
+
+            for entry in self._read_segment(path):
+                if trigger_id is not None and entry.get('trigger_id') != trigger_id:
+                    continue
+                if action_id is not None and entry.get('action_id') != action_id:
+                    continue
+                timestamp = entry.get('timestamp', '')
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp > until:
+                    continue
+                yield entry
+
+    def import_legacy(self, legacy_file: Path):
+        """Move entries from the old single-file action_log.json into segments"""
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                entries = json.load(f)
+            if entries:
+                # Name the segment after its oldest entry so time-range queries still find it
+                started = datetime.fromisoformat(min(e.get('timestamp', '') for e in entries) or datetime.now().isoformat())
+                with self._lock:
+                    path = self.log_dir / self._segment_name(started)
+                    with open(path, 'w') as f:
+                        for entry in entries:
+                            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                if self.compress:
+                    self._compress_segment(path)
+            os.replace(legacy_file, legacy_file.with_name(legacy_file.name + '.migrated'))
+            logger.info(f"Imported {len(entries)} entries from {legacy_file.name}")
+        except Exception as e:
+            logger.error(f"Error importing legacy action log: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
@@ -0,0 +1,263 @@
+"""
+Action Queue - Prioritized async execution of trigger actions
+Firing a trigger enqueues its action instead of running it inside the polling tick. A pool of
+workers takes the most urgent job whose action type is below its concurrency cap; failed jobs
+are retried with exponential backoff and dead-lettered once their attempts run out.
+
+Priorities follow the AI's 1-10 scale: a higher number runs sooner, ties run in arrival order.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRIORITY = 5
+
+
+@dataclass(slots=True)
+class QueuedAction:
+    """One unit of work waiting in or running from the queue"""
+    action_type: str
+    payload: Dict[str, Any]
+    priority: int = DEFAULT_PRIORITY
+    trigger_id: Optional[str] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'action_type': self.action_type,
+            'payload': self.payload,
+            'priority': self.priority,
+            'trigger_id': self.trigger_id,
+            'attempts': self.attempts,
+            'last_error': self.last_error
+        }
+
+
+def parse_type_limits(spec: str) -> Dict[str, int]:
+    """Parse 'create_quest=2,trigger=4' into per-type concurrency caps"""
+    limits = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        try:
+            limits[name.strip()] = max(int(value), 1)
+        except ValueError:
+            logger.error(f"Ignoring invalid action type limit '{part.strip()}'")
+    return limits
+
+
+def clamp_priority(value: Any) -> int:
+    """Coerce an AI-supplied priority onto the 1-10 scale"""
+    try:
+        return min(max(int(value), 1), 10)
+    except (TypeError, ValueError):
+        return DEFAULT_PRIORITY
+
+
+class ActionQueue:
+    """Priority queue of actions drained by a worker pool
+
+    submit() waits while max_pending jobs are queued, which pushes back on the polling loop.
+    Follow-up actions submitted by a running job pass wait=False and are never held up, so
+    workers cannot deadlock on a full queue. While the workers are not running, submit()
+    executes the job inline, without retries.
+    """
+
+    def __init__(self, handler: Callable[[QueuedAction], Awaitable[Any]], workers: int = 4,
+                 max_pending: int = 1000, type_limits: Optional[Dict[str, int]] = None,
+                 max_attempts: int = 3, retry_backoff: float = 2.0,
+                 on_dead_letter: Optional[Callable[[QueuedAction], None]] = None,
+                 window: int = 500):
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self.type_limits = type_limits or {}
+        self.max_attempts = max(max_attempts, 1)
+        self.retry_backoff = retry_backoff
+        self.on_dead_letter = on_dead_letter
+
+        self._heap: List = []
+        # Jobs whose type was at its cap when reached, per type; one returns per freed slot
+        self._deferred: Dict[str, List] = {}
+        self._seq = itertools.count()
+        self._running: Dict[str, int] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._retries: set = set()
+        self._workers: List[asyncio.Task] = []
+        self.active = False
+
+        self.dead_letters: Deque[QueuedAction] = deque(maxlen=100)
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._durations: Deque[float] = deque(maxlen=window)
+        self.counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'retried': 0,
+                       'dead_lettered': 0, 'backpressure_waits': 0}
+
+    def __len__(self) -> int:
+        return len(self._heap) + sum(len(entries) for entries in self._deferred.values())
+
+    async def submit(self, action_type: str, payload: Dict[str, Any], priority: Any = DEFAULT_PRIORITY,
+                     trigger_id: Optional[str] = None, wait: bool = True):
+        """Queue an action, waiting for room if the queue is full and wait is set"""
+        job = QueuedAction(action_type, payload, clamp_priority(priority), trigger_id)
+        self.counts['submitted'] += 1
+        if not self.active:
+            await self._execute(job, inline=True)
+            return
+        async with self._cond:
+            if wait and len(self) >= self.max_pending:
+                self.counts['backpressure_waits'] += 1
+                await self._cond.wait_for(lambda: len(self) < self.max_pending)
+            self._push(job)
+
+    def _push(self, job: QueuedAction):
+        heapq.heappush(self._heap, (-job.priority, next(self._seq), job))
+        self._cond.notify_all()
+
+    def _pop_eligible(self) -> Optional[QueuedAction]:
+        """Most urgent job whose type has a free slot
+
+        Jobs of a type at its cap are parked until a slot of that type frees up, so a wake
+        never re-sorts the jobs that cannot run yet.
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            action_type = entry[2].action_type
+            limit = self.type_limits.get(action_type)
+            if limit is None or self._running.get(action_type, 0) < limit:
+                return entry[2]
+            heapq.heappush(self._deferred.setdefault(action_type, []), entry)
+        return None
+
+    def _release(self, action_type: str):
+        """Return the most urgent parked job of a type whose slot just freed up"""
+        deferred = self._deferred.get(action_type)
+        if deferred:
+            heapq.heappush(self._heap, heapq.heappop(deferred))
+            if not deferred:
+                del self._deferred[action_type]
+
+    async def _worker(self):
+        while True:
+            async with self._cond:
+                job = None
+                while job is None:
+                    job = self._pop_eligible()
+                    if job is None:
+                        await self._cond.wait()
+                self._running[job.action_type] = self._running.get(job.action_type, 0) + 1
+                # A slot below max_pending opened up for waiting producers
+                self._cond.notify_all()
+            try:
+                await self._execute(job)
+            finally:
+                self._running[job.action_type] -= 1
+                async with self._cond:
+                    self._release(job.action_type)
+                    self._cond.notify_all()
+
+    async def _execute(self, job: QueuedAction, inline: bool = False):
+        started = time.monotonic()
+        self._waits.append(started - job.enqueued_at)
+        job.attempts += 1
+        try:
+            await self.handler(job)
+            self.counts['completed'] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.counts['failed'] += 1
+            job.last_error = str(e)
+            logger.error(f"Action {job.action_type} failed (attempt {job.attempts}/{self.max_attempts}): {e}")
+            if job.attempts < self.max_attempts and not inline:
+                self.counts['retried'] += 1
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                task = asyncio.create_task(self._retry_later(job, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+            else:
+                self._dead_letter(job)
+        finally:
+            self._durations.append(time.monotonic() - started)
+
+    async def _retry_later(self, job: QueuedAction, delay: float):
+        await asyncio.sleep(delay)
+        job.enqueued_at = time.monotonic()
+        async with self._cond:
+            # Leave the retry set before waking join(), which would otherwise miss the change
+            self._retries.discard(asyncio.current_task())
+            self._push(job)
+
+    def _dead_letter(self, job: QueuedAction):
+        self.counts['dead_lettered'] += 1
+        self.dead_letters.append(job)
+        logger.error(f"Action {job.action_type} dead-lettered after {job.attempts} attempts: {job.last_error}")
+        if self.on_dead_letter:
+            try:
+                self.on_dead_letter(job)
+            except Exception as e:
+                logger.error(f"Dead-letter handler failed: {e}")
+
+    def start(self):
+        """Start the worker pool on the running event loop"""
+        self._cond = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self.active = True
+
+    async def stop(self, drain_timeout: float = 0):
+        """Give queued actions up to drain_timeout seconds to finish, then stop the workers"""
+        if not self.active:
+            return
+        if drain_timeout > 0:
+            try:
+                await asyncio.wait_for(self.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.active = False
+        for task in self._workers + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if len(self):
+            logger.warning(f"Action queue stopped with {len(self)} actions pending")
+
+    async def join(self):
+        """Wait until no job is queued, running or waiting to be retried"""
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: not len(self) and not any(self._running.values()) and not self._retries
+            )
+
+    def as_dict(self) -> Dict[str, Any]:
+        waits, durations = sorted(self._waits), sorted(self._durations)
+
+        def p95(values):
+            return round(values[min(int(len(values) * 0.95), len(values) - 1)], 3) if values else 0.0
+
+        by_priority: Dict[int, int] = {}
+        for entries in (self._heap, *self._deferred.values()):
+            for _, _, job in entries:
+                by_priority[job.priority] = by_priority.get(job.priority, 0) + 1
+        return {
+            'depth': len(self),
+            'depth_by_priority': dict(sorted(by_priority.items(), reverse=True)),
+            'running': {t: n for t, n in self._running.items() if n},
+            'retrying': len(self._retries),
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            **self.counts,
+            'mean_wait': round(sum(waits) / len(waits), 3) if waits else 0.0,
+            'p95_wait': p95(waits),
+            'mean_duration': round(sum(durations) / len(durations), 3) if durations else 0.0,
+            'p95_duration': p95(durations)
+        }
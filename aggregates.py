@@ -0,0 +1,110 @@
+"""
+Aggregates - Running network totals maintained by DaemonCore mutations
+Each mutation adjusts the counters in O(1), so network context never needs a full scan.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+# Metric names usable in condition expressions (see conditions.py)
+METRICS = (
+    'total_operatives', 'active_operatives', 'average_rank', 'total_reputation',
+    'total_quests', 'available_quests', 'active_quests', 'completed_quests',
+    'total_triggers', 'active_triggers'
+)
+
+
+class NetworkAggregates:
+    """Counts by quest status, operative totals and trigger activity"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_operatives = 0
+        self.active_operatives = 0
+        self.rank_sum = 0
+        self.total_reputation = 0
+        self.quests_by_status: Dict[str, int] = {}
+        self.total_triggers = 0
+        self.active_triggers = 0
+
+    @classmethod
+    def from_stats(cls, stats: Dict[str, Any]) -> 'NetworkAggregates':
+        """Seed the counters from a full recompute such as StateStore.network_stats()"""
+        aggregates = cls()
+        aggregates.total_operatives = stats['total_operatives']
+        aggregates.active_operatives = stats['active_operatives']
+        aggregates.rank_sum = stats['rank_sum']
+        aggregates.total_reputation = stats['total_reputation']
+        aggregates.quests_by_status = {str(k): v for k, v in stats['quests_by_status'].items() if v}
+        aggregates.total_triggers = stats['total_triggers']
+        aggregates.active_triggers = stats['active_triggers']
+        return aggregates
+
+    def as_stats(self) -> Dict[str, Any]:
+        """Counters in the same shape as StateStore.network_stats()"""
+        with self._lock:
+            return {
+                'total_operatives': self.total_operatives,
+                'active_operatives': self.active_operatives,
+                'rank_sum': self.rank_sum,
+                'total_reputation': self.total_reputation,
+                'total_quests': sum(self.quests_by_status.values()),
+                'quests_by_status': dict(self.quests_by_status),
+                'total_triggers': self.total_triggers,
+                'active_triggers': self.active_triggers
+            }
+
+    def quest_count(self, status: str) -> int:
+        return self.quests_by_status.get(status, 0)
+
+    def metric(self, name: str) -> float:
+        """Current value of one of METRICS"""
+        if name == 'average_rank':
+            return self.rank_sum / max(self.total_operatives, 1)
+        if name == 'total_quests':
+            return sum(self.quests_by_status.values())
+        if name.endswith('_quests'):
+            return self.quests_by_status.get(name[:-len('_quests')], 0)
+        if name in METRICS:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def quest_status_changed(self, old: Optional[str], new: Optional[str]):
+        """Move a quest between status buckets (None for a quest being added or removed)"""
+        with self._lock:
+            if old is not None:
+                remaining = self.quests_by_status.get(str(old), 0) - 1
+                if remaining:
+                    self.quests_by_status[str(old)] = remaining
+                else:
+                    self.quests_by_status.pop(str(old), None)
+            if new is not None:
+                self.quests_by_status[str(new)] = self.quests_by_status.get(str(new), 0) + 1
+
+    def operative_added(self, rank: int, reputation: int, active: bool):
+        with self._lock:
+            self.total_operatives += 1
+            self.active_operatives += int(bool(active))
+            self.rank_sum += rank
+            self.total_reputation += reputation
+
+    def operative_changed(self, rank_delta: int = 0, reputation_delta: int = 0, active_delta: int = 0):
+        with self._lock:
+            self.rank_sum += rank_delta
+            self.total_reputation += reputation_delta
+            self.active_operatives += active_delta
+
+    def trigger_added(self, active: bool):
+        with self._lock:
+            self.total_triggers += 1
+            self.active_triggers += int(bool(active))
+
+    def trigger_active_changed(self, was_active: bool, is_active: bool):
+        with self._lock:
+            self.active_triggers += int(bool(is_active)) - int(bool(was_active))
+
+    def diff(self, expected: Dict[str, Any]) -> Dict[str, tuple]:
+        """Fields whose maintained value differs from a full recompute, as (maintained, recomputed)"""
+        actual = self.as_stats()
+        expected = dict(expected, quests_by_status={str(k): v for k, v in expected['quests_by_status'].items() if v})
+        return {k: (actual[k], expected[k]) for k in actual if actual[k] != expected.get(k)}
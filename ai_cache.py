@@ -0,0 +1,243 @@
+"""
+AI Cache - Content-addressed cache of AI responses
+Responses are keyed by a hash of provider, model, temperature, response format and the
+whitespace-normalized prompt. An in-memory LRU sits over a SQLite tier that survives restarts.
+Each AICore method has its own TTL; a TTL of 0 opts the method out of caching.
+
+Disk lookups run on a worker thread and disk writes are queued to a background writer, so
+the SQLite tier never blocks the event loop.
+"""
+
+import json
+import time
+import queue
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a response stays valid, per calling method. Creative output is not cached so that
+# repeated calls keep producing fresh quests and messages. Prompts that embed the raw network
+# context carry its timestamp, so they never repeat and are not cached either.
+DEFAULT_TTLS = {
+    'evaluate_trigger_with_ai': 300,
+    'evaluate_triggers_batch': 300,
+    'generate_trigger_actions': 0,
+    'make_decision': 0,
+    'assess_network_threat': 600,
+    'strategic_planning': 3600,
+    # Operatives' submissions and their assessments are never written to disk
+    'analyze_operative_submission': 0,
+    'parse_natural_language_trigger': 7 * 86400,
+    'validate_trigger_safety': 7 * 86400,
+    'generate_quest': 0,
+    'generate_darknet_communication': 0,
+}
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY, method TEXT, value TEXT NOT NULL,
+    latency REAL NOT NULL DEFAULT 0, created REAL NOT NULL, expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires);
+"""
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse 'generate_quest=0,evaluate_trigger_with_ai=60' into per-method TTLs"""
+    ttls = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, value = part.partition('=')
+        try:
+            ttls[name.strip()] = max(float(value), 0)
+        except ValueError:
+            logger.error(f"Ignoring invalid AI cache TTL '{part.strip()}'")
+    return ttls
+
+
+def cache_key(provider: str, model: str, temperature: float, response_format: str, prompt: str) -> str:
+    """Content address of a request; whitespace differences in the prompt do not matter"""
+    normalized = ' '.join(prompt.split())
+    material = json.dumps([provider, model, temperature, response_format, normalized])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU over a SQLite tier of AI responses"""
+
+    def __init__(self, db_path: Path, max_entries: int = 1000, max_disk_entries: int = 50000,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.max_entries = max(max_entries, 1)
+        self.max_disk_entries = max(max_disk_entries, self.max_entries)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        # key -> (expires, JSON text, latency); values are decoded per hit so callers get their own copy
+        self._memory: 'OrderedDict[str, Tuple[float, str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # The connection is shared by lookup threads and the writer thread
+        self._db_lock = threading.Lock()
+        self._writes: 'queue.Queue[Optional[Tuple[str, tuple]]]' = queue.Queue()
+        self.counts = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0,
+                       'expired': 0, 'evictions': 0, 'skipped': 0}
+        self.saved_seconds = 0.0
+        self.hits_by_method: Dict[str, int] = {}
+
+        db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(CACHE_SCHEMA)
+        self.conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+        # Drop entries left by methods that have since been opted out of caching
+        opted_out = [method for method, ttl in self.ttls.items() if ttl == 0]
+        self.conn.execute(
+            f"DELETE FROM responses WHERE method IN ({', '.join('?' * len(opted_out))})", opted_out
+        )
+        self._writer = threading.Thread(target=self._write_loop, name="ai-cache-writer", daemon=True)
+        self._writer.start()
+
+    def ttl_for(self, method: Optional[str]) -> float:
+        """TTL of a calling method; unnamed calls are not cached"""
+        if method is None:
+            return 0
+        return self.ttls.get(method, 0)
+
+    def _read(self, key: str) -> Optional[Tuple[float, str, float]]:
+        with self._db_lock:
+            row = self.conn.execute(
+                "SELECT expires, value, latency FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1], row[2]) if row is not None else None
+
+    async def get(self, key: str, method: Optional[str] = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            tier = 'memory_hits'
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read, key)
+            tier = 'disk_hits'
+
+        now = time.time()
+        with self._lock:
+            if entry is None:
+                self.counts['misses'] += 1
+                return None
+            expires, value, latency = entry
+            if expires < now:
+                self._memory.pop(key, None)
+                self._writes.put(("DELETE FROM responses WHERE key = ?", (key,)))
+                self.counts['expired'] += 1
+                self.counts['misses'] += 1
+                return None
+
+            if tier == 'disk_hits':
+                self._remember(key, entry)
+            self.counts['hits'] += 1
+            self.counts[tier] += 1
+            self.saved_seconds += latency
+            if method:
+                self.hits_by_method[method] = self.hits_by_method.get(method, 0) + 1
+            return json.loads(value)
+
+    def put(self, key: str, value: Any, ttl: float, method: Optional[str] = None, latency: float = 0.0):
+        """Store a response for ttl seconds, along with how long it took to produce
+
+        The memory tier is updated at once; the disk write is queued for the writer thread.
+        """
+        now = time.time()
+        text = json.dumps(value)
+        with self._lock:
+            self._remember(key, (now + ttl, text, latency))
+            self._writes.put((
+                "INSERT OR REPLACE INTO responses (key, method, value, latency, created, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, method, text, latency, now, now + ttl)
+            ))
+            self.counts['stores'] += 1
+            if self.counts['stores'] % 100 == 0:
+                self._prune_disk(now)
+
+    def skip(self):
+        """Count a call whose method is opted out of caching"""
+        self.counts['skipped'] += 1
+
+    def _remember(self, key: str, entry: Tuple[float, str, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counts['evictions'] += 1
+
+    def _prune_disk(self, now: float):
+        self._writes.put(("DELETE FROM responses WHERE expires < ?", (now,)))
+        self._writes.put((
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        ))
+
+    def _write_loop(self):
+        """Apply queued disk writes, each burst in one transaction, until close() queues None"""
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            statements = [write for write in batch if write is not None]
+            try:
+                with self._db_lock:
+                    self.conn.execute("BEGIN")
+                    try:
+                        for sql, params in statements:
+                            self.conn.execute(sql, params)
+                        self.conn.execute("COMMIT")
+                    except Exception:
+                        self.conn.execute("ROLLBACK")
+                        raise
+            except Exception as e:
+                logger.error(f"AI cache write failed: {e}")
+            for _ in batch:
+                self._writes.task_done()
+            if len(statements) < len(batch):
+                return
+
+    def flush(self):
+        """Wait until every queued disk write has been applied"""
+        self._writes.join()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._writes.put(("DELETE FROM responses", ()))
+        self.flush()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._db_lock:
+            disk_entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            lookups = self.counts['hits'] + self.counts['misses']
+            return {
+                **self.counts,
+                'hit_rate': round(self.counts['hits'] / lookups, 3) if lookups else 0.0,
+                'saved_seconds': round(self.saved_seconds, 2),
+                'hits_by_method': dict(self.hits_by_method),
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries
+            }
+
+    def close(self):
+        """Apply the queued writes, stop the writer and close the database"""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        with self._db_lock:
+            self.conn.close()
@@ -0,0 +1,86 @@
+"""
+AI Context - Canonical network context for AI trigger evaluation
+The raw context changes on every tick (a fresh timestamp, floating point averages), so two
+evaluations of an unchanged network never look alike. Canonicalizing it per trigger keeps only
+the fields the trigger depends on and rounds floating point values to a few significant
+figures, so an unchanged network yields the same digest and the trigger's previous verdict can
+be reused. Integer counts are kept exact unless the condition opts in to rounding them.
+
+ai_decision conditions may tune this with
+    "context": ["active_operatives", "total_operatives"]   fields the decision depends on
+    "precision": 2                                         significant figures kept
+    "round_integers": true                                 round integer counts as well
+    "time_bucket": "hour" | "day" | "weekday"              keep a coarse time of evaluation
+Without "context", the metrics named in the condition are kept, or every metric if none are.
+"""
+
+import re
+import json
+import math
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Fields that change on every call and never belong in the canonical form
+VOLATILE_FIELDS = {'timestamp'}
+
+TIME_BUCKETS = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+    'weekday': '%A',
+}
+
+
+def quantize(value: Any, precision: int, integers: bool = False) -> Any:
+    """Round a float (and an int if integers is set) to precision significant figures
+
+    Other values pass through unchanged.
+    """
+    numeric = (int, float) if integers else float
+    if isinstance(value, bool) or not isinstance(value, numeric) or value == 0:
+        return value
+    if isinstance(value, float) and not math.isfinite(value):
+        return value
+    digits = precision - int(math.floor(math.log10(abs(value)))) - 1
+    rounded = round(value, digits)
+    return int(rounded) if digits <= 0 or float(rounded).is_integer() else rounded
+
+
+def relevant_fields(condition: Dict, context: Dict) -> Optional[set]:
+    """Context fields a trigger depends on, or None for all of them"""
+    explicit = condition.get('context')
+    if isinstance(explicit, list) and explicit:
+        return {str(name) for name in explicit}
+    text = json.dumps(condition)
+    mentioned = {name for name in context if re.search(rf'\b{re.escape(name)}\b', text)}
+    return mentioned - VOLATILE_FIELDS or None
+
+
+def canonical_context(context: Dict, condition: Optional[Dict] = None, precision: int = 2) -> Dict:
+    """The parts of a context a trigger's decision depends on, quantized"""
+    condition = condition if isinstance(condition, dict) else {}
+    precision = condition.get('precision', precision)
+    if not isinstance(precision, int) or isinstance(precision, bool) or precision < 1:
+        precision = 2
+    integers = condition.get('round_integers') is True
+    fields = relevant_fields(condition, context)
+
+    canonical = {
+        name: quantize(value, precision, integers)
+        for name, value in sorted(context.items())
+        if name not in VOLATILE_FIELDS and (fields is None or name in fields)
+    }
+
+    bucket = TIME_BUCKETS.get(condition.get('time_bucket'))
+    if bucket:
+        try:
+            when = datetime.fromisoformat(context['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            when = datetime.now()
+        canonical['time'] = when.strftime(bucket)
+    return canonical
+
+
+def context_digest(canonical: Dict) -> str:
+    """Stable digest of a canonical context"""
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
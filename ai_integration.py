@@ -6,13 +6,19 @@ and autonomous operations.
 
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 import anthropic
 import openai
 from dotenv import load_dotenv
+from http_pool import ConnectionStats, PoolConfig, pooled_client
+from ai_cache import ResponseCache, cache_key, parse_ttls
+from rate_limit import RateLimiter, estimate_tokens
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +26,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Failures without an HTTP status that are worth retrying
+TRANSIENT_ERRORS = (anthropic.APIConnectionError, openai.APIConnectionError)
+
 
 class AICore:
     """Core AI integration for autonomous daemon operations"""
@@ -28,22 +37,45 @@ class AICore:
         self.config_path = Path(config_path)
         self.config = self.load_config()
         
-        # Initialize API clients
+        # Long-lived API clients sharing a keep-alive connection pool per provider. Their
+        # connections belong to one event loop, so _bind_loop recreates them for a new loop
         self.claude_client = None
         self.openai_client = None
+        self._client_loop = None
+        self.pool_config = PoolConfig.from_env('AI')
+        self.connection_stats = {'claude': ConnectionStats(), 'openai': ConnectionStats()}
+
+        # Requests and tokens per minute are budgeted per provider and in-flight calls are
+        # capped overall; throttled calls are retried here rather than inside the SDKs
+        self.rate_limiters = {
+            'claude': RateLimiter.from_env('claude', 'AI_CLAUDE', requests_per_minute=50, tokens_per_minute=80000),
+            'openai': RateLimiter.from_env('openai', 'AI_OPENAI', requests_per_minute=500, tokens_per_minute=150000)
+        }
+        self.max_concurrency = max(int(os.getenv('AI_MAX_CONCURRENCY', '8')), 1)
+        self.concurrency = asyncio.Semaphore(self.max_concurrency)
+
+        # Responses to repeated prompts are served from the cache, per-method TTLs permitting
+        self.cache = None
+        if os.getenv('AI_CACHE', 'true').lower() == 'true':
+            self.cache = ResponseCache(
+                self.config_path.parent / 'ai_cache.db',
+                max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '1000')),
+                max_disk_entries=int(os.getenv('AI_CACHE_DISK_MAX_ENTRIES', '50000')),
+                ttls=parse_ttls(os.getenv('AI_CACHE_TTLS', ''))
+            )
         
         # Try to get API keys from environment variables (loaded from .env)
         claude_key = os.getenv('ANTHROPIC_API_KEY') or self.config.get('claude_api_key')
         openai_key = os.getenv('OPENAI_API_KEY') or self.config.get('openai_api_key')
+        self.claude_key = claude_key
+        self.openai_key = openai_key
+        self._create_clients()
         
         if claude_key:
-            self.claude_client = anthropic.Anthropic(api_key=claude_key)
             logger.info("Claude API initialized")
         else:
             logger.warning("No Claude API key found. Set ANTHROPIC_API_KEY in .env file")
         
-        # Store OpenAI key for later use (client created per-request with new API)
-        self.openai_key = openai_key
         if openai_key:
             logger.info("OpenAI API key found")
         else:
@@ -114,12 +146,78 @@ Respond in JSON format:
     "recommended_action": "specific action to take"
 }}"""
         
-        result = await self.query_ai(prompt, response_format='json')
+        result = await self.query_ai(prompt, response_format='json', cache='evaluate_trigger_with_ai')
         return result
     
+    async def evaluate_triggers_batch(self, triggers: List[Dict], context: Dict) -> Dict[str, Dict]:
+        """Evaluate several triggers against one shared context in a single request
+
+        Returns verdicts keyed by trigger_id. Triggers whose verdict is missing or malformed in
+        the batched response are evaluated individually.
+        """
+        if len(triggers) <= 1:
+            verdicts = {}
+            for trigger in triggers:
+                result = await self.evaluate_trigger_with_ai(trigger, context)
+                if result:
+                    verdicts[trigger['trigger_id']] = result
+            return verdicts
+
+        conditions = [
+            {'trigger_id': t['trigger_id'], 'type': t.get('trigger_type'), 'condition': t.get('condition')}
+            for t in triggers
+        ]
+        prompt = f"""You are the autonomous decision-making system for a distributed daemon network.
+
+Triggers:
+{json.dumps(conditions, indent=2)}
+
+Current Context (shared by every trigger):
+{json.dumps(context, indent=2)}
+
+For each trigger, analyze independently whether its condition is met based on the current context.
+
+Respond in JSON format, with exactly one verdict per trigger:
+{{
+    "verdicts": [
+        {{
+            "trigger_id": "id from the list above",
+            "should_trigger": true/false,
+            "confidence": 0.0-1.0,
+            "reasoning": "brief explanation",
+            "recommended_action": "specific action to take"
+        }}
+    ]
+}}"""
+
+        result = await self.query_ai(prompt, response_format='json', cache='evaluate_triggers_batch')
+        ids = {t['trigger_id'] for t in triggers}
+        verdicts = {}
+        entries = result.get('verdicts') if isinstance(result, dict) else None
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and entry.get('trigger_id') in ids \
+                    and isinstance(entry.get('should_trigger'), bool):
+                verdicts[entry['trigger_id']] = entry
+
+        missing = [t for t in triggers if t['trigger_id'] not in verdicts]
+        if missing:
+            logger.warning(f"Batched evaluation returned no usable verdict for {len(missing)} of "
+                           f"{len(triggers)} triggers, evaluating them individually")
+            results = await asyncio.gather(*(self.evaluate_trigger_with_ai(t, context) for t in missing))
+            for trigger, result in zip(missing, results):
+                if result:
+                    verdicts[trigger['trigger_id']] = result
+        return verdicts
+
     async def generate_quest(self, context: Dict, difficulty: int = 2) -> Dict:
         """Generate a new quest using AI based on current context"""
-        prompt = f"""You are creating quests for a distributed autonomous network system inspired by the Daemon novel.
+        result = await self.query_ai(self.quest_prompt(context, difficulty), response_format='json',
+                                     cache='generate_quest')
+        return result
+
+    def quest_prompt(self, context: Dict, difficulty: int = 2) -> str:
+        """Prompt asking for one quest of the given difficulty"""
+        return f"""You are creating quests for a distributed autonomous network system inspired by the Daemon novel.
 
 Current Network Context:
 {json.dumps(context, indent=2)}
@@ -154,9 +252,6 @@ Respond in JSON format:
     "estimated_time": "time estimate",
     "category": "category name"
 }}"""
-        
-        result = await self.query_ai(prompt, response_format='json')
-        return result
     
     async def analyze_operative_submission(self, quest_id: str, operative_id: str, 
                                           submission: str, quest_details: Dict) -> Dict:
@@ -187,7 +282,7 @@ Respond in JSON format:
     "recommendations": "suggestions for improvement"
 }}"""
         
-        result = await self.query_ai(prompt, response_format='json')
+        result = await self.query_ai(prompt, response_format='json', cache='analyze_operative_submission')
         return result
     
     async def generate_trigger_actions(self, trigger_event: str, context: Dict) -> List[Dict]:
@@ -219,7 +314,7 @@ Respond in JSON format:
     "reasoning": "why these actions are appropriate"
 }}"""
         
-        result = await self.query_ai(prompt, response_format='json')
+        result = await self.query_ai(prompt, response_format='json', cache='generate_trigger_actions')
         return result.get('actions', [])
     
     async def assess_network_threat(self, anomaly_data: Dict) -> Dict:
@@ -248,7 +343,7 @@ Respond in JSON format:
     "alert_operatives": true/false
 }}"""
         
-        result = await self.query_ai(prompt, response_format='json')
+        result = await self.query_ai(prompt, response_format='json', cache='assess_network_threat')
         return result
     
     async def generate_darknet_communication(self, message_type: str, 
@@ -269,7 +364,7 @@ Create a concise, clear message in the darknet communication style:
 
 Return only the message text, no JSON."""
         
-        result = await self.query_ai(prompt, response_format='text')
+        result = await self.query_ai(prompt, response_format='text', cache='generate_darknet_communication')
         return result
     
     async def strategic_planning(self, network_state: Dict, goals: List[str]) -> Dict:
@@ -315,97 +410,280 @@ Respond in JSON format:
     }}
 }}"""
         
-        result = await self.query_ai(prompt, response_format='json')
+        result = await self.query_ai(prompt, response_format='json', cache='strategic_planning')
         return result
     
+    def _create_clients(self):
+        """Build the provider clients on pooled HTTP clients"""
+        timeout = self.pool_config.httpx_timeout
+        if self.claude_key:
+            self.claude_client = anthropic.AsyncAnthropic(
+                api_key=self.claude_key, timeout=timeout, max_retries=0,
+                http_client=pooled_client(self.pool_config, self.connection_stats['claude'])
+            )
+        if self.openai_key:
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=self.openai_key, timeout=timeout, max_retries=0,
+                http_client=pooled_client(self.pool_config, self.connection_stats['openai'])
+            )
+
+    def _bind_loop(self):
+        """Recreate the async clients when called from a new event loop
+
+        The previous clients are closed on the loop their connections belong to. A loop that
+        is already closed can no longer shut them down, so await close() before closing it.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is None:
+            self._client_loop = loop
+        elif self._client_loop is not loop:
+            self._close_on_loop(self._client_loop)
+            self._create_clients()
+            self.concurrency = asyncio.Semaphore(self.max_concurrency)
+            for limiter in self.rate_limiters.values():
+                limiter.bind_loop()
+            self._client_loop = loop
+
+    def get_rate_limit_stats(self) -> Dict:
+        """Per-provider budgets, throttling, retries and queue wait before calls were sent"""
+        stats = {provider: limiter.as_dict() for provider, limiter in self.rate_limiters.items()}
+        stats['max_concurrency'] = self.max_concurrency
+        return stats
+
+    def get_connection_stats(self) -> Dict:
+        """Requests, new vs reused connections and TLS handshakes per provider"""
+        return {provider: stats.as_dict() for provider, stats in self.connection_stats.items()}
+
+    def _close_on_loop(self, loop: asyncio.AbstractEventLoop):
+        """Close the current clients' connection pools on their own event loop"""
+        closing = self._close_clients((self.claude_client, self.openai_client))
+        if loop.is_closed():
+            closing.close()
+            logger.warning("AI clients outlived their event loop; await AICore.close() before closing it")
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(closing, loop)
+        else:
+            # An idle loop cannot run inside the current one, but it can on another thread
+            thread = threading.Thread(target=loop.run_until_complete, args=(closing,))
+            thread.start()
+            thread.join()
+
+    async def _close_clients(self, clients: Tuple):
+        for client in clients:
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.warning(f"Error closing AI client: {e}")
+
+    async def close(self):
+        """Close the provider clients' connection pools"""
+        await self._close_clients((self.claude_client, self.openai_client))
+        # Fresh, unbound clients for whichever loop uses them next
+        self._create_clients()
+        self._client_loop = None
+
     async def query_ai(self, prompt: str, response_format: str = 'json',
-                      ai_provider: Optional[str] = None) -> Any:
-        """Query the configured AI provider"""
+                      ai_provider: Optional[str] = None, cache: Optional[str] = None) -> Any:
+        """Query the configured AI provider
+
+        cache names the calling method; its TTL decides whether the response may be cached.
+        """
         provider = ai_provider or self.config.get('default_ai', 'claude')
         
+        key = None
+        ttl = self.cache.ttl_for(cache) if self.cache else 0
+        if ttl > 0:
+            model = self.config.get('claude_model' if provider == 'claude' else 'openai_model')
+            key = cache_key(provider, model, self.config.get('temperature'), response_format, prompt)
+            cached = await self.cache.get(key, cache)
+            if cached is not None:
+                return cached
+        elif self.cache and cache:
+            self.cache.skip()
+
+        started = time.monotonic()
         try:
             if provider == 'claude' and self.claude_client:
-                return await self.query_claude(prompt, response_format)
+                result = await self.query_claude(prompt, response_format)
             elif provider == 'openai' and self.openai_key:
-                return await self.query_openai(prompt, response_format)
+                result = await self.query_openai(prompt, response_format)
             else:
                 logger.error(f"AI provider {provider} not available")
                 return None
         except Exception as e:
             logger.error(f"AI query error: {e}")
             return None
+
+        # Failed queries return None and are not cached
+        if key is not None and result is not None:
+            self.cache.put(key, result, ttl, cache, time.monotonic() - started)
+        return result
+
+    def get_cache_stats(self) -> Dict:
+        """Cache hits (memory/disk), misses, expirations, evictions and AI time saved"""
+        return self.cache.as_dict() if self.cache else {}
     
     async def query_claude(self, prompt: str, response_format: str = 'json') -> Any:
         """Query Claude API"""
         try:
-            if response_format == 'json':
-                prompt += "\n\nIMPORTANT: Respond ONLY with valid JSON, no additional text."
-            
-            message = self.claude_client.messages.create(
-                model=self.config.get('claude_model', 'claude-sonnet-4-20250514'),
-                max_tokens=self.config.get('max_tokens', 4096),
-                temperature=self.config.get('temperature', 0.7),
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+            self._bind_loop()
+            params = self.claude_params(prompt, response_format)
+            message = await self.rate_limiters['claude'].call(
+                lambda: self.claude_client.messages.create(**params),
+                estimate_tokens(params['messages'][0]['content']) + params['max_tokens'],
+                self.concurrency,
+                usage=lambda m: m.usage.input_tokens + m.usage.output_tokens,
+                transient=TRANSIENT_ERRORS
             )
-            
-            response_text = message.content[0].text
-            
-            if response_format == 'json':
-                # Try to extract JSON from response
-                try:
-                    return json.loads(response_text)
-                except json.JSONDecodeError:
-                    # Try to find JSON in the response
-                    import re
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        return json.loads(json_match.group())
-                    logger.error(f"Could not parse JSON from Claude response: {response_text}")
-                    return None
-            else:
-                return response_text
+            return self.parse_response(message.content[0].text, response_format)
                 
         except Exception as e:
             logger.error(f"Claude API error: {e}")
             return None
     
+    def claude_params(self, prompt: str, response_format: str = 'json') -> Dict:
+        """Messages API parameters for a prompt"""
+        if response_format == 'json':
+            prompt += "\n\nIMPORTANT: Respond ONLY with valid JSON, no additional text."
+        return {
+            'model': self.config.get('claude_model', 'claude-sonnet-4-20250514'),
+            'max_tokens': self.config.get('max_tokens', 4096),
+            'temperature': self.config.get('temperature', 0.7),
+            'messages': [{
+                "role": "user",
+                "content": prompt
+            }]
+        }
+
+    def parse_response(self, response_text: str, response_format: str = 'json') -> Any:
+        """Decode a model's reply, extracting the JSON object from surrounding text if needed"""
+        if response_format != 'json':
+            return response_text
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError:
+            # Try to find JSON in the response
+            import re
+            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group())
+            logger.error(f"Could not parse JSON from AI response: {response_text}")
+            return None
+
     async def query_openai(self, prompt: str, response_format: str = 'json') -> Any:
         """Query OpenAI API"""
         try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            
-            messages = [
-                {"role": "system", "content": "You are an autonomous AI system managing a distributed network."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            kwargs = {
-                'model': self.config.get('openai_model', 'gpt-4-turbo-preview'),
-                'messages': messages,
-                'temperature': self.config.get('temperature', 0.7),
-                'max_completion_tokens': self.config.get('max_tokens', 4096)  # Changed from max_tokens
-            }
-            
-            if response_format == 'json':
-                kwargs['response_format'] = {"type": "json_object"}
-            
-            response = client.chat.completions.create(**kwargs)
-            response_text = response.choices[0].message.content
-            
-            if response_format == 'json':
-                return json.loads(response_text)
-            else:
-                return response_text
-                
+            self._bind_loop()
+            params = self.openai_params(prompt, response_format)
+            response = await self.rate_limiters['openai'].call(
+                lambda: self.openai_client.chat.completions.create(**params),
+                sum(estimate_tokens(m['content']) for m in params['messages']) + params['max_completion_tokens'],
+                self.concurrency,
+                usage=lambda r: r.usage.total_tokens,
+                transient=TRANSIENT_ERRORS
+            )
+            return self.parse_response(response.choices[0].message.content, response_format)
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             return None
 
+    def openai_params(self, prompt: str, response_format: str = 'json') -> Dict:
+        """Chat Completions parameters for a prompt"""
+        messages = [
+            {"role": "system", "content": "You are an autonomous AI system managing a distributed network."},
+            {"role": "user", "content": prompt}
+        ]
+
+        kwargs = {
+            'model': self.config.get('openai_model', 'gpt-4-turbo-preview'),
+            'messages': messages,
+            'temperature': self.config.get('temperature', 0.7),
+            'max_completion_tokens': self.config.get('max_tokens', 4096)  # Changed from max_tokens
+        }
+
+        if response_format == 'json':
+            kwargs['response_format'] = {"type": "json_object"}
+        return kwargs
+
+    async def submit_batch(self, requests: List[Tuple[str, str]], response_format: str = 'json',
+                           ai_provider: Optional[str] = None) -> Tuple[str, str]:
+        """Submit (custom_id, prompt) pairs as one provider batch job; returns (provider, batch_id)
+
+        Batch jobs complete asynchronously, typically within minutes and at most within 24 hours.
+        """
+        provider = ai_provider or self.config.get('default_ai', 'claude')
+        self._bind_loop()
+
+        if provider == 'claude' and self.claude_client:
+            batch = await self.claude_client.messages.batches.create(requests=[
+                {'custom_id': custom_id, 'params': self.claude_params(prompt, response_format)}
+                for custom_id, prompt in requests
+            ])
+            return provider, batch.id
+
+        if provider == 'openai' and self.openai_client:
+            # The Batch API reads its requests from an uploaded JSONL file
+            lines = [
+                json.dumps({'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions',
+                            'body': self.openai_params(prompt, response_format)})
+                for custom_id, prompt in requests
+            ]
+            upload = await self.openai_client.files.create(
+                file=('batch_requests.jsonl', '\n'.join(lines).encode()), purpose='batch'
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=upload.id, endpoint='/v1/chat/completions', completion_window='24h'
+            )
+            return provider, batch.id
+
+        raise ValueError(f"AI provider {provider} not available for batch jobs")
+
+    async def batch_status(self, provider: str, batch_id: str) -> str:
+        """'in_progress', 'ended' (results available) or 'failed'"""
+        self._bind_loop()
+        if provider == 'claude':
+            batch = await self.claude_client.messages.batches.retrieve(batch_id)
+            return 'ended' if batch.processing_status == 'ended' else 'in_progress'
+
+        batch = await self.openai_client.batches.retrieve(batch_id)
+        if batch.status == 'completed':
+            return 'ended'
+        if batch.status in ('expired', 'cancelled', 'failed'):
+            # Expired and cancelled batches still return the requests that did complete
+            return 'ended' if batch.output_file_id else 'failed'
+        return 'in_progress'
+
+    async def batch_results(self, provider: str, batch_id: str, response_format: str = 'json') -> Dict[str, Any]:
+        """Parsed response per custom_id of an ended batch; failed requests map to None"""
+        self._bind_loop()
+        results = {}
+        if provider == 'claude':
+            async for entry in await self.claude_client.messages.batches.results(batch_id):
+                result = entry.result
+                if result.type == 'succeeded':
+                    results[entry.custom_id] = self.parse_response(result.message.content[0].text, response_format)
+                else:
+                    logger.warning(f"Batch request {entry.custom_id} {result.type}")
+                    results[entry.custom_id] = None
+            return results
+
+        batch = await self.openai_client.batches.retrieve(batch_id)
+        if batch.output_file_id:
+            content = await self.openai_client.files.content(batch.output_file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if response.get('status_code') == 200:
+                    text = response['body']['choices'][0]['message']['content']
+                    results[entry['custom_id']] = self.parse_response(text, response_format)
+                else:
+                    logger.warning(f"Batch request {entry.get('custom_id')} failed: {entry.get('error')}")
+                    results[entry['custom_id']] = None
+        return results
+
 
 class TriggerAnalyzer:
     """Analyzes custom user triggers using AI"""
@@ -441,13 +719,28 @@ Respond in JSON format:
     }},
     "description": "human readable description",
     "active": true
-}}"""
+}}
+
+For "condition" triggers over network state, prefer a condition of the form
+{{"expression": "<comparison>"}} using the metrics total_operatives, active_operatives,
+average_rank, total_reputation, total_quests, available_quests, active_quests,
+completed_quests, total_triggers and active_triggers, with arithmetic, comparisons,
+and/or/not and min()/max()/abs(). For "event" triggers use {{"event_type": "...", "min_count": 1}}.
+For "web_scrape" triggers use {{"url": "https://...", "regex": "<extraction pattern>", "match": "<pattern>"}};
+omit "match" to fire whenever the extracted text changes. For "ai_decision" triggers, add
+"context": [...] listing the metrics the decision depends on, and "time_bucket": "hour|day|weekday"
+only if it depends on the time."""
         
-        return await self.ai_core.query_ai(prompt, response_format='json')
+        return await self.ai_core.query_ai(prompt, response_format='json', cache='parse_natural_language_trigger')
     
     async def validate_trigger_safety(self, trigger_config: Dict) -> Dict:
         """Use AI to validate that a trigger is safe and ethical"""
-        prompt = f"""Analyze this trigger configuration for safety and ethical concerns.
+        return await self.ai_core.query_ai(self.safety_prompt(trigger_config), response_format='json',
+                                           cache='validate_trigger_safety')
+
+    def safety_prompt(self, trigger_config: Dict) -> str:
+        """Prompt asking whether a trigger configuration is safe to run"""
+        return f"""Analyze this trigger configuration for safety and ethical concerns.
 
 Trigger Configuration:
 {json.dumps(trigger_config, indent=2)}
@@ -473,8 +766,6 @@ Respond in JSON format:
     ],
     "approved": true/false
 }}"""
-        
-        return await self.ai_core.query_ai(prompt, response_format='json')
 
 
 class AutonomousDecisionEngine:
@@ -509,7 +800,7 @@ Respond in JSON format:
     "priority": 1-10
 }}"""
         
-        decision = await self.ai_core.query_ai(prompt, response_format='json')
+        decision = await self.ai_core.query_ai(prompt, response_format='json', cache='make_decision')
         
         # Log the decision
         decision['timestamp'] = datetime.now().isoformat()
@@ -0,0 +1,113 @@
+"""
+Memory Report - tracemalloc footprint of loaded Operative, Quest and Trigger records
+
+Compares the current slotted models (interned enums, quest-id handles) with the
+previous __dict__-based dataclasses, both built from JSON exactly as load_state does.
+
+Usage: python benchmarks/memory_report.py [operatives] [quests] [triggers]
+"""
+
+import gc
+import sys
+import json
+import logging
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from daemon_core import Trigger, Quest, Operative
+from startup_benchmark import build_state
+from records import QUEST_HANDLES, record_to_dict
+
+logging.getLogger('state_store').setLevel(logging.WARNING)
+
+
+@dataclass
+class LegacyTrigger:
+    trigger_id: str
+    trigger_type: str
+    condition: Dict
+    action_id: str
+    active: bool = True
+    last_checked: Optional[str] = None
+    next_run: Optional[str] = None
+    firing: Dict = field(default_factory=dict)
+    fire_state: Dict = field(default_factory=dict)
+
+
+@dataclass
+class LegacyQuest:
+    quest_id: str
+    title: str
+    description: str
+    difficulty: int
+    rewards: Dict
+    requirements: Dict
+    status: str = 'available'
+    assigned_to: Optional[str] = None
+
+
+@dataclass
+class LegacyOperative:
+    operative_id: str
+    username: str
+    darknet_name: str
+    rank: int
+    reputation: int
+    skills: List[str]
+    completed_quests: List[str]
+    active: bool = True
+    joined_date: str = None
+
+
+def footprint(payload: Dict[str, str], models: Dict[str, type]) -> Dict[str, int]:
+    """Bytes retained per collection after decoding JSON into model instances"""
+    sizes = {}
+    for collection, text in payload.items():
+        gc.collect()
+        tracemalloc.start()
+        raw = json.loads(text)
+        records = {k: models[collection](**v) for k, v in raw.items()}
+        del raw
+        gc.collect()
+        sizes[collection] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+    return sizes
+
+
+def main():
+    operatives = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    quests = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    triggers = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    state = build_state(operatives, quests, triggers)
+    payload = {
+        collection: json.dumps({k: record_to_dict(v) for k, v in records.items()})
+        for collection, records in state.items()
+    }
+    counts = {collection: len(records) for collection, records in state.items()}
+    del state
+
+    # Start from an empty handle registry so the compact numbers include its cost
+    QUEST_HANDLES.__init__()
+
+    legacy = footprint(payload, {'triggers': LegacyTrigger, 'quests': LegacyQuest, 'operatives': LegacyOperative})
+    compact = footprint(payload, {'triggers': Trigger, 'quests': Quest, 'operatives': Operative})
+
+    print(f"{'collection':<12}{'records':>10}{'legacy MB':>12}{'compact MB':>12}{'B/record':>12}{'saved':>8}")
+    for collection in payload:
+        n = max(counts[collection], 1)
+        saved = 1 - compact[collection] / max(legacy[collection], 1)
+        print(f"{collection:<12}{counts[collection]:>10}{legacy[collection] / 1e6:>12.1f}"
+              f"{compact[collection] / 1e6:>12.1f}{compact[collection] / n:>12.0f}{saved:>8.0%}")
+    total_legacy, total_compact = sum(legacy.values()), sum(compact.values())
+    print(f"{'total':<12}{sum(counts.values()):>10}{total_legacy / 1e6:>12.1f}{total_compact / 1e6:>12.1f}"
+          f"{'':>12}{1 - total_compact / max(total_legacy, 1):>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
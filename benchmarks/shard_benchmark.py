@@ -0,0 +1,116 @@
+"""
+Shard Benchmark - Trigger evaluation throughput as sharded worker processes are added
+
+Each worker is a DaemonCore on a shared SQLite store that evaluates only its leased shards.
+Trigger evaluation is replaced by a fixed amount of CPU work so the numbers reflect
+scheduling and sharding overhead rather than AI latency.
+
+Usage: python benchmarks/shard_benchmark.py [triggers] [max_workers] [seconds]
+"""
+
+import sys
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Hash rounds per simulated trigger evaluation (roughly 1ms of CPU)
+WORK_ROUNDS = 1500
+
+
+def cpu_bound_evaluation(trigger):
+    digest = trigger.trigger_id.encode()
+    for _ in range(WORK_ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+    return False, None, None
+
+
+def worker(worker_id: str, data_dir: str, seconds: float, barrier, results):
+    logging.disable(logging.CRITICAL)
+    from daemon_core import DaemonCore
+
+    daemon = DaemonCore(data_dir, persistence='sqlite', worker_id=worker_id)
+
+    async def evaluate(trigger):
+        return cpu_bound_evaluation(trigger)
+    daemon.evaluate_polled_trigger = evaluate
+
+    # Let every worker register, then rebalance until each holds its fair share
+    for _ in range(3):
+        daemon.shards.renew()
+        barrier.wait()
+
+    async def ticks():
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            await daemon.check_triggers()
+
+    started = time.monotonic()
+    asyncio.run(ticks())
+    elapsed = time.monotonic() - started
+    stats = daemon.get_tick_stats()
+    results.put((worker_id, len(daemon.shards.owned), stats['triggers_evaluated'], elapsed))
+    daemon.shards.release()
+    daemon.stop()
+
+
+def seed(data_dir: str, triggers: int):
+    logging.disable(logging.CRITICAL)
+    from daemon_core import DaemonCore
+
+    daemon = DaemonCore(data_dir, persistence='sqlite')
+    for i in range(triggers):
+        daemon.create_trigger('event', {'event_type': f'bench_{i % 10}'}, 'noop')
+    daemon.stop()
+
+
+def run(workers: int, triggers: int, seconds: float) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        process = multiprocessing.Process(target=seed, args=(tmp, triggers))
+        process.start()
+        process.join()
+
+        barrier = multiprocessing.Barrier(workers)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker, args=(f"bench-{i}", tmp, seconds, barrier, results))
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        rows = [results.get() for _ in processes]
+        for p in processes:
+            p.join()
+
+    evaluated = sum(r[2] for r in rows)
+    elapsed = max(r[3] for r in rows)
+    shards = sorted(r[1] for r in rows)
+    throughput = evaluated / elapsed
+    print(f"{workers:>7}  {throughput:>14,.0f}  {str(shards):>20}")
+    return throughput
+
+
+def main():
+    triggers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (multiprocessing.cpu_count() or 1)
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    print(f"{triggers} triggers, {seconds:.0f}s per run, {multiprocessing.cpu_count()} CPUs")
+    print(f"{'workers':>7}  {'evaluations/s':>14}  {'shards per worker':>20}")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        throughput = run(workers, triggers, seconds)
+        baseline = baseline or throughput
+        workers *= 2
+    if max_workers > 1:
+        print(f"Scaling at {workers // 2} workers: {throughput / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
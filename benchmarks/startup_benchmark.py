@@ -0,0 +1,148 @@
+"""
+Startup Benchmark - Compare cold-start cost of the JSON and binary snapshot state formats
+Times both the bare store load and a full DaemonCore construction, and reports how many
+records each format had to decode before the daemon was ready.
+
+Usage: python benchmarks/startup_benchmark.py [operatives] [quests] [triggers]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from daemon_core import DaemonCore, Trigger, Quest, Operative
+from state_store import StateStore, SnapshotStateStore
+
+# Startup logs, including the missing API key errors, would drown the table
+logging.disable(logging.ERROR)
+os.environ['AI_CACHE'] = 'false'
+
+MODELS = {'triggers': Trigger, 'quests': Quest, 'operatives': Operative}
+
+
+def build_state(operatives: int, quests: int, triggers: int) -> dict:
+    """Synthetic network with realistic record shapes"""
+    state = {'triggers': {}, 'quests': {}, 'operatives': {}}
+    for i in range(quests):
+        quest_id = f"{i:016x}"
+        state['quests'][quest_id] = Quest(
+            quest_id=quest_id, title=f"Quest {i}", description="Benchmark quest " * 8,
+            difficulty=i % 5 + 1, rewards={'reputation': 50 + i % 200},
+            requirements={'min_rank': i % 7, 'skills': ['recon', 'crypto']},
+            status=('available', 'active', 'completed')[i % 3]
+        )
+    for i in range(operatives):
+        operative_id = f"op{i:014x}"
+        state['operatives'][operative_id] = Operative(
+            operative_id=operative_id, username=f"user{i}", darknet_name=f"Shadow{i % 999:03d}",
+            rank=i % 10 + 1, reputation=i % 5000, skills=['recon', 'social'],
+            completed_quests=[f"{(i + k) % max(quests, 1):016x}" for k in range(i % 6)],
+            joined_date="2026-01-01T00:00:00"
+        )
+    for i in range(triggers):
+        trigger_id = f"tr{i:014x}"
+        state['triggers'][trigger_id] = Trigger(
+            trigger_id=trigger_id, trigger_type='condition',
+            condition={'type': 'operative_count', 'threshold': i}, action_id='ai_decision'
+        )
+    return state
+
+
+def measure(store_cls, data_dir: Path, sample_key: str) -> dict:
+    start = time.perf_counter()
+    store = store_cls(data_dir, MODELS)
+    state = store.load()
+    loaded = time.perf_counter()
+    state['operatives'][sample_key]
+    first_access = time.perf_counter()
+    for collection in state.values():
+        for _ in collection.values():
+            pass
+    materialized = time.perf_counter()
+    store.close()
+    return {
+        'load': loaded - start,
+        'first_access': first_access - loaded,
+        'full_materialize': materialized - first_access,
+    }
+
+
+def measure_daemon(persistence: str, data_dir: Path) -> dict:
+    """Time DaemonCore construction and count the records it decoded"""
+    start = time.perf_counter()
+    daemon = DaemonCore(str(data_dir), persistence=persistence)
+    ready = time.perf_counter()
+    collections = (daemon.triggers, daemon.quests, daemon.operatives)
+    decoded = sum(getattr(c, 'materialized', len(c)) for c in collections)
+    total = sum(len(c) for c in collections)
+    daemon.stop()
+    return {'daemon': ready - start, 'decoded': decoded, 'total': total}
+
+
+def main():
+    operatives = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    quests = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    triggers = int(sys.argv[3]) if len(sys.argv) > 3 else 1_000
+
+    print(f"Building {operatives} operatives, {quests} quests, {triggers} triggers...")
+    state = build_state(operatives, quests, triggers)
+    sample_key = next(iter(state['operatives']))
+
+    workdir = Path(tempfile.mkdtemp(prefix="daemon-bench-"))
+    try:
+        json_dir = workdir / "json"
+        snapshot_dir = workdir / "snapshot"
+        json_dir.mkdir()
+        snapshot_dir.mkdir()
+
+        StateStore(json_dir, MODELS).save(state)
+        snapshot_store = SnapshotStateStore(snapshot_dir, MODELS)
+        snapshot_store.load()
+        snapshot_store.save(state_as_snapshot(snapshot_store, state))
+        snapshot_store.close()
+
+        results = {
+            'json': measure(StateStore, json_dir, sample_key),
+            'snapshot': measure(SnapshotStateStore, snapshot_dir, sample_key),
+        }
+        for name in results:
+            results[name].update(measure_daemon(name, workdir / name))
+        sizes = {
+            'json': sum(p.stat().st_size for p in json_dir.glob('*.json')),
+            'snapshot': (snapshot_dir / "state.snapshot").stat().st_size,
+        }
+
+        print(f"\n{'format':<10}{'size MB':>10}{'load s':>10}{'first s':>10}{'all s':>10}"
+              f"{'daemon s':>10}{'decoded':>12}")
+        for name, r in results.items():
+            print(f"{name:<10}{sizes[name] / 1e6:>10.1f}{r['load']:>10.3f}"
+                  f"{r['first_access']:>10.4f}{r['full_materialize']:>10.3f}"
+                  f"{r['daemon']:>10.3f}{r['decoded']:>12}")
+        speedup = results['json']['daemon'] / max(results['snapshot']['daemon'], 1e-9)
+        print(f"\nTime to a ready DaemonCore: snapshot is {speedup:.0f}x faster than JSON")
+
+        # Triggers are compiled at startup; operatives and quests must stay on disk
+        snapshot = results['snapshot']
+        assert snapshot['decoded'] <= triggers, (
+            f"snapshot startup decoded {snapshot['decoded']} of {snapshot['total']} records"
+        )
+    finally:
+        shutil.rmtree(workdir)
+
+
+def state_as_snapshot(store: SnapshotStateStore, state: dict) -> dict:
+    """Copy plain dict state into the store's lazy collections"""
+    for collection, records in state.items():
+        for key, obj in records.items():
+            store.state[collection][key] = obj
+    return store.state
+
+
+if __name__ == "__main__":
+    main()
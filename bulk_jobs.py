@@ -0,0 +1,123 @@
+"""
+Bulk Jobs - Offline quest generation and trigger re-validation through provider batch APIs
+Hundreds of prompts go out as one Anthropic Message Batch or OpenAI Batch instead of as
+interactive calls. A job is recorded as soon as it is submitted, so it can be resumed by id
+after a restart; once the provider finishes, its results are ingested in one persisted commit.
+
+Usage:
+    python bulk_jobs.py quests <count> [difficulty] [data_dir]
+    python bulk_jobs.py validate [data_dir]
+    python bulk_jobs.py resume <job_id> [data_dir]
+    python bulk_jobs.py list [data_dir]
+"""
+
+import os
+import sys
+import json
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BulkJobKind:
+    GENERATE_QUESTS = 'generate_quests'
+    VALIDATE_TRIGGERS = 'validate_triggers'
+
+
+class BulkJobStatus:
+    SUBMITTED = 'submitted'
+    INGESTED = 'ingested'
+    FAILED = 'failed'
+
+
+@dataclass(slots=True)
+class BulkJob:
+    """A provider batch job and what each of its requests was for"""
+    job_id: str
+    kind: str
+    provider: str
+    batch_id: str
+    items: Dict[str, Dict[str, Any]]  # custom_id -> request parameters
+    status: str = BulkJobStatus.SUBMITTED
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    completed_at: Optional[str] = None
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+
+class BulkJobStore:
+    """Bulk job records in one JSON file, rewritten atomically"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save(self, job: BulkJob):
+        with self._lock:
+            jobs = self._load()
+            jobs[job.job_id] = asdict(job)
+            tmp = self.path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(jobs, f, indent=2)
+            os.replace(tmp, self.path)
+
+    def get(self, job_id: str) -> Optional[BulkJob]:
+        with self._lock:
+            data = self._load().get(job_id)
+        return BulkJob(**data) if data else None
+
+    def all(self) -> List[BulkJob]:
+        with self._lock:
+            return [BulkJob(**data) for data in self._load().values()]
+
+
+async def _main(args: List[str]):
+    from daemon_core import DaemonCore
+
+    command = args[0] if args else 'list'
+    if command == 'quests':
+        count = int(args[1])
+        difficulty = int(args[2]) if len(args) > 2 else 2
+        daemon = DaemonCore(args[3] if len(args) > 3 else "./daemon_data")
+        job = await daemon.submit_bulk_quests(count, difficulty)
+    elif command == 'validate':
+        daemon = DaemonCore(args[1] if len(args) > 1 else "./daemon_data")
+        job = await daemon.submit_bulk_trigger_validation()
+    elif command == 'resume':
+        daemon = DaemonCore(args[2] if len(args) > 2 else "./daemon_data")
+        job = await daemon.resume_bulk_job(args[1])
+    else:
+        daemon = DaemonCore(args[1] if len(args) > 1 else "./daemon_data")
+        for job in daemon.bulk_jobs.all():
+            print(f"{job.job_id}  {job.kind:<18} {job.status:<10} {len(job.items):>5} requests  {job.created_at}")
+        daemon.stop()
+        return
+
+    try:
+        if job is not None and command != 'resume':
+            print(f"Submitted bulk job {job.job_id} ({len(job.items)} requests); waiting for results")
+            job = await daemon.resume_bulk_job(job.job_id)
+        if job is not None:
+            print(f"Bulk job {job.job_id}: {job.status} {json.dumps(job.summary)}")
+    finally:
+        await daemon.ai_core.close()
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(sys.argv[1:]))
+    except KeyboardInterrupt:
+        print("Interrupted; continue later with: python bulk_jobs.py resume <job_id>")
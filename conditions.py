@@ -0,0 +1,260 @@
+"""
+Conditions - Trigger conditions compiled once into evaluator objects
+A trigger's condition is validated and compiled when the trigger is created or loaded, so each
+evaluation is a direct call that reads the metrics it needs and nothing else.
+
+Condition triggers accept the legacy threshold forms
+    {"type": "operative_count", "threshold": 10}
+    {"type": "quest_completion", "threshold": 50}
+or an expression over network metrics (aggregates.METRICS):
+    {"expression": "completed_quests >= 50 and active_operatives / max(total_operatives, 1) > 0.5"}
+Expressions support numbers, metric names, + - * / %, chained comparisons, and/or/not,
+parentheses and min()/max()/abs(). Division by zero yields 0.
+
+Event triggers take {"event_type": ..., "min_count": 1, "within_seconds": null}.
+Web scrape triggers take a URL and extraction rule (see web_scrape.py); their evaluator is async.
+"""
+
+import ast
+import operator
+from typing import Any, Callable, Dict, FrozenSet, Optional, Protocol, Tuple
+
+from aggregates import METRICS
+
+MAX_EXPRESSION_LENGTH = 1000
+
+# Legacy condition types and the metric each one compares against its threshold
+THRESHOLD_METRICS = {
+    'operative_count': 'total_operatives',
+    'quest_completion': 'completed_quests',
+}
+
+# Evaluation result: (condition met, observed value, threshold) - value and threshold are
+# None unless the condition is a single comparison, and feed the firing policy's hysteresis
+Result = Tuple[bool, Optional[float], Optional[float]]
+
+# Which side of its threshold a condition holds on; hysteresis re-arms on the other side
+ABOVE, BELOW = 1, -1
+
+
+class ConditionError(ValueError):
+    """Raised for a trigger condition that cannot be compiled"""
+
+
+class EvaluationContext(Protocol):
+    def metric(self, name: str) -> float: ...
+
+    def event_count(self, event_type: str, within_seconds: Optional[float] = None) -> int: ...
+
+
+class Evaluator:
+    """Compiled condition; metrics lists the network metrics it reads
+
+    direction is ABOVE or BELOW for a condition that compares one value against a threshold,
+    and None for any other condition, which cannot use hysteresis.
+    """
+
+    __slots__ = ('metrics', 'direction')
+
+    def __init__(self, metrics: FrozenSet[str] = frozenset(), direction: Optional[int] = ABOVE):
+        self.metrics = metrics
+        self.direction = direction
+
+    def __call__(self, ctx: EvaluationContext) -> Result:
+        raise NotImplementedError
+
+
+class ThresholdEvaluator(Evaluator):
+    """metric >= threshold"""
+
+    __slots__ = ('metric', 'threshold')
+
+    def __init__(self, metric: str, threshold: float):
+        super().__init__(frozenset([metric]))
+        self.metric = metric
+        self.threshold = threshold
+
+    def __call__(self, ctx: EvaluationContext) -> Result:
+        value = ctx.metric(self.metric)
+        return value >= self.threshold, value, self.threshold
+
+
+class EventCountEvaluator(Evaluator):
+    """At least min_count events of a type, optionally within a recent window"""
+
+    __slots__ = ('event_type', 'min_count', 'within_seconds')
+
+    def __init__(self, event_type: str, min_count: float = 1, within_seconds: Optional[float] = None):
+        super().__init__()
+        self.event_type = event_type
+        self.min_count = min_count
+        self.within_seconds = within_seconds
+
+    def __call__(self, ctx: EvaluationContext) -> Result:
+        count = ctx.event_count(self.event_type, self.within_seconds)
+        return count >= self.min_count, count, self.min_count
+
+
+class ExpressionEvaluator(Evaluator):
+    """Boolean expression over network metrics"""
+
+    __slots__ = ('source', '_fn', '_value', '_threshold')
+
+    def __init__(self, source: str):
+        if len(source) > MAX_EXPRESSION_LENGTH:
+            raise ConditionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+        try:
+            tree = ast.parse(source.strip(), mode='eval').body
+        except SyntaxError as e:
+            raise ConditionError(f"Invalid expression '{source}': {e.msg}")
+        names = set()
+        super().__init__()
+        self.source = source
+        self._fn = _compile(tree, names)
+        self.metrics = frozenset(names)
+
+        # A single 'value <op> constant' ordering comparison also reports value and threshold
+        self._value = self._threshold = self.direction = None
+        if isinstance(tree, ast.Compare) and len(tree.ops) == 1 \
+                and isinstance(tree.comparators[0], ast.Constant) \
+                and type(tree.ops[0]) in COMPARE_DIRECTIONS:
+            self._value = _compile(tree.left, set())
+            self._threshold = tree.comparators[0].value
+            self.direction = COMPARE_DIRECTIONS[type(tree.ops[0])]
+
+    def __call__(self, ctx: EvaluationContext) -> Result:
+        met = bool(self._fn(ctx))
+        if self._value is None:
+            return met, None, None
+        return met, self._value(ctx), self._threshold
+
+
+class NeverEvaluator(Evaluator):
+    """Stands in for a stored condition that no longer compiles"""
+
+    __slots__ = ()
+
+    def __call__(self, ctx: EvaluationContext) -> Result:
+        return False, None, None
+
+
+def _divide(a: float, b: float) -> float:
+    return a / b if b else 0
+
+
+BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: _divide, ast.Mod: lambda a, b: a % b if b else 0,
+}
+COMPARE_OPS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+COMPARE_DIRECTIONS = {ast.Gt: ABOVE, ast.GtE: ABOVE, ast.Lt: BELOW, ast.LtE: BELOW}
+FUNCTIONS = {'min': min, 'max': max, 'abs': abs}
+
+
+def _compile(node: ast.AST, names: set) -> Callable[[EvaluationContext], Any]:
+    """Compile a whitelisted expression node into a closure over the evaluation context"""
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float)):
+            raise ConditionError(f"Unsupported constant {node.value!r}")
+        value = node.value
+        return lambda ctx: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in METRICS:
+            raise ConditionError(f"Unknown metric '{name}', expected one of {', '.join(METRICS)}")
+        names.add(name)
+        return lambda ctx: ctx.metric(name)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPS:
+        op = BINARY_OPS[type(node.op)]
+        left, right = _compile(node.left, names), _compile(node.right, names)
+        return lambda ctx: op(left(ctx), right(ctx))
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda ctx: not operand(ctx)
+        if isinstance(node.op, ast.USub):
+            return lambda ctx: -operand(ctx)
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile(v, names) for v in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda ctx: all(v(ctx) for v in values)
+        return lambda ctx: any(v(ctx) for v in values)
+
+    if isinstance(node, ast.Compare) and all(type(op) in COMPARE_OPS for op in node.ops):
+        operands = [_compile(node.left, names)] + [_compile(c, names) for c in node.comparators]
+        ops = [COMPARE_OPS[type(op)] for op in node.ops]
+        if len(ops) == 1:
+            op, left, right = ops[0], operands[0], operands[1]
+            return lambda ctx: op(left(ctx), right(ctx))
+
+        def chained(ctx):
+            values = [operand(ctx) for operand in operands]
+            return all(op(values[i], values[i + 1]) for i, op in enumerate(ops))
+        return chained
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and node.func.id in FUNCTIONS and not node.keywords:
+        fn = FUNCTIONS[node.func.id]
+        args = [_compile(a, names) for a in node.args]
+        if len(args) < (1 if fn is abs else 2):
+            raise ConditionError(f"Wrong number of arguments to {node.func.id}()")
+        return lambda ctx: fn(*(a(ctx) for a in args))
+
+    raise ConditionError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+
+def _number(condition: Dict, key: str, default: Optional[float]) -> Optional[float]:
+    value = condition.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConditionError(f"'{key}' must be a number, got {value!r}")
+    return value
+
+
+def compile_condition(trigger_type: str, condition: Dict) -> Optional[Evaluator]:
+    """Validate and compile a trigger's condition
+
+    Returns None for trigger types that are not evaluated from a condition here
+    (time triggers are scheduled, AI-decision triggers ask the model).
+    """
+    if not isinstance(condition, dict):
+        raise ConditionError("Condition must be an object")
+
+    if trigger_type == 'event':
+        event_type = condition.get('event_type')
+        if not isinstance(event_type, str) or not event_type:
+            raise ConditionError("Event condition needs an 'event_type'")
+        return EventCountEvaluator(
+            event_type,
+            min_count=_number(condition, 'min_count', 1),
+            within_seconds=_number(condition, 'within_seconds', None)
+        )
+
+    if trigger_type == 'condition':
+        if 'expression' in condition:
+            if not isinstance(condition['expression'], str):
+                raise ConditionError("'expression' must be a string")
+            return ExpressionEvaluator(condition['expression'])
+        condition_type = condition.get('type')
+        metric = THRESHOLD_METRICS.get(condition_type)
+        if metric is None:
+            raise ConditionError(
+                f"Unknown condition type '{condition_type}', expected an 'expression' "
+                f"or one of {', '.join(THRESHOLD_METRICS)}"
+            )
+        return ThresholdEvaluator(metric, _number(condition, 'threshold', 0))
+
+    if trigger_type == 'web_scrape':
+        # Imported here because web_scrape imports ConditionError from this module
+        from web_scrape import WebScrapeEvaluator
+        return WebScrapeEvaluator(condition)
+
+    return None
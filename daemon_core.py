@@ -4,15 +4,37 @@ This module handles the core daemon logic, trigger monitoring, and task executio
 """
 
 import asyncio
+import atexit
+import os
+import sys
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import hashlib
+import inspect
 import secrets
 from ai_integration import AICore, TriggerAnalyzer, AutonomousDecisionEngine
+from state_store import create_state_store, quest_min_rank, SQLiteStateStore, WriteBehindWriter
+from action_log import ActionLog
+from event_store import EventStore
+from records import QuestRefs, QuestStatus, TriggerType, intern_enum
+from aggregates import NetworkAggregates
+from leaderboard import LeaderboardIndex
+from quest_index import QuestIndex
+from scheduler import TriggerScheduler, ScheduleError, TimeSpec
+from tick_stats import TickStats
+from firing import FiringPolicy, evaluate_firing
+from sharding import ShardLeases
+from event_bus import EventBus, DomainEvent, DomainEventType, DependencyIndex, metric_dependencies
+from conditions import compile_condition, ConditionError, Evaluator, NeverEvaluator
+from web_scrape import WebFetcher
+from action_queue import ActionQueue, QueuedAction, parse_type_limits
+from ai_context import canonical_context, context_digest
+from bulk_jobs import BulkJob, BulkJobKind, BulkJobStatus, BulkJobStore
 import fade
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,18 +60,24 @@ banner = r"""
 """
 print (fade.purplepink(banner))
 
-@dataclass
+@dataclass(slots=True)
 class Trigger:
     """Represents a trigger condition that activates daemon tasks"""
     trigger_id: str
-    trigger_type: str  # 'time', 'event', 'web_scrape', 'condition'
+    trigger_type: str  # 'time', 'event', 'web_scrape', 'condition', 'ai_decision'
     condition: Dict
     action_id: str
     active: bool = True
     last_checked: Optional[str] = None
+    next_run: Optional[str] = None  # time triggers: next scheduled fire time (ISO, with offset)
+    firing: Dict = field(default_factory=dict)  # firing policy, see firing.py
+    fire_state: Dict = field(default_factory=dict)  # armed, last_fired, fire_count, recent
 
+    def __post_init__(self):
+        self.trigger_type = intern_enum(TriggerType, self.trigger_type)
 
-@dataclass
+
+@dataclass(slots=True)
 class Quest:
     """Represents a quest/task in the daemon system"""
     quest_id: str
@@ -58,11 +86,14 @@ class Quest:
     difficulty: int
     rewards: Dict
     requirements: Dict
-    status: str = 'available'  # available, active, completed
+    status: str = QuestStatus.AVAILABLE  # available, active, completed
     assigned_to: Optional[str] = None
 
+    def __post_init__(self):
+        self.status = intern_enum(QuestStatus, self.status)
+
 
-@dataclass
+@dataclass(slots=True)
 class Operative:
     """Represents a recruited operative in the daemon network"""
     operative_id: str
@@ -71,15 +102,21 @@ class Operative:
     rank: int
     reputation: int
     skills: List[str]
-    completed_quests: List[str]
+    completed_quests: QuestRefs  # quest ids, stored as integer handles
     active: bool = True
     joined_date: str = None
 
+    def __post_init__(self):
+        self.skills = [sys.intern(skill) if isinstance(skill, str) else skill for skill in self.skills]
+        if not isinstance(self.completed_quests, QuestRefs):
+            self.completed_quests = QuestRefs(self.completed_quests)
+
 
 class DaemonCore:
     """Main daemon orchestration system"""
     
-    def __init__(self, data_dir: str = "./daemon_data"):
+    def __init__(self, data_dir: str = "./daemon_data", persistence: Optional[str] = None,
+                 worker_id: Optional[str] = None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
@@ -87,6 +124,112 @@ class DaemonCore:
         self.quests: Dict[str, Quest] = {}
         self.operatives: Dict[str, Operative] = {}
         
+        # Persistence backend: 'json' rewrites full files, 'journal' appends per-change records,
+        # 'snapshot' adds a lazily loaded binary snapshot, 'sqlite' keeps indexed tables
+        self.store = create_state_store(
+            persistence or os.getenv('DAEMON_PERSISTENCE', 'json'),
+            self.data_dir,
+            {'triggers': Trigger, 'quests': Quest, 'operatives': Operative}
+        )
+
+        # Sharded workers: each process evaluates only the triggers on shards it holds leases for
+        worker_id = worker_id or os.getenv('DAEMON_WORKER_ID')
+
+        # Write-behind persistence: changes are flushed from a background thread at most
+        # every DAEMON_WRITE_BEHIND_MS milliseconds (0 writes synchronously). Sharded workers
+        # write through, so other workers never read a row this one has already changed
+        write_behind_ms = 0 if worker_id else int(os.getenv('DAEMON_WRITE_BEHIND_MS', '250'))
+        self.writer = WriteBehindWriter(self.write_changes, write_behind_ms) if write_behind_ms > 0 else None
+        if self.writer:
+            atexit.register(self.flush)
+
+        self.shards: Optional[ShardLeases] = None
+        if worker_id:
+            if not isinstance(self.store, SQLiteStateStore):
+                raise ValueError("Sharded workers need shared state: set DAEMON_PERSISTENCE=sqlite")
+            # Records are re-read on every access, since other workers change them too
+            self.store.shared = True
+            self.shards = ShardLeases(
+                self.data_dir / "leases.db",
+                worker_id,
+                shards=int(os.getenv('DAEMON_SHARDS', '64')),
+                ttl=float(os.getenv('DAEMON_LEASE_TTL', '6'))
+            )
+
+        # Executed actions go to a rotating JSONL log instead of one ever-growing JSON file
+        self.action_log = ActionLog(
+            self.data_dir / "action_log",
+            max_segment_bytes=int(os.getenv('DAEMON_ACTION_LOG_SEGMENT_MB', '10')) * 1024 * 1024,
+            max_segment_age_seconds=int(os.getenv('DAEMON_ACTION_LOG_SEGMENT_HOURS', '24')) * 3600,
+            compress=os.getenv('DAEMON_ACTION_LOG_COMPRESS', 'true').lower() == 'true'
+        )
+        self.action_log.import_legacy(self.data_dir / "action_log.json")
+
+        # Event triggers read from an index that reloads only when events.json(l) changes
+        retention_hours = float(os.getenv('DAEMON_EVENT_RETENTION_HOURS', '0'))
+        self.event_store = EventStore(
+            self.data_dir / "events.json",
+            retention_seconds=retention_hours * 3600 or None
+        )
+
+        # Network totals kept current by every mutation; debug mode re-verifies them on each read
+        self.aggregates = NetworkAggregates()
+        self.debug_aggregates = os.getenv('DAEMON_DEBUG_AGGREGATES', 'false').lower() == 'true'
+
+        # Ranking index, built on first leaderboard query and then kept current by mutations
+        self._leaderboard: Optional[LeaderboardIndex] = None
+        self._quest_index: Optional[QuestIndex] = None
+
+        # Time triggers wait in a deadline heap instead of being polled every tick
+        self.scheduler = TriggerScheduler()
+
+        # Condition triggers are re-evaluated when a mutation publishes an event they depend on
+        self.event_bus = EventBus()
+        self.condition_deps = DependencyIndex()
+
+        # Trigger conditions compiled once per trigger; invalidate_evaluator drops an entry on edit
+        self.evaluators: Dict[str, Optional[Evaluator]] = {}
+        for event_type in DomainEventType:
+            self.event_bus.subscribe(event_type, self.on_domain_event)
+
+        # Polled triggers are checked concurrently with a per-trigger timeout; the polling
+        # interval backs off from DAEMON_POLL_INTERVAL while ticks overrun it
+        self.trigger_concurrency = max(int(os.getenv('DAEMON_TRIGGER_CONCURRENCY', '10')), 1)
+        self.trigger_timeout = float(os.getenv('DAEMON_TRIGGER_TIMEOUT', '30'))
+        self.tick_stats = TickStats(
+            base_interval=float(os.getenv('DAEMON_POLL_INTERVAL', '5')),
+            max_interval=float(os.getenv('DAEMON_POLL_INTERVAL_MAX', '60'))
+        )
+
+        # AI-decision verdicts are reused while the trigger's canonical context is unchanged:
+        # trigger_id -> (context digest, verdict, monotonic time of the AI evaluation)
+        self.ai_verdicts: Dict[str, Tuple[str, bool, float]] = {}
+        self.ai_verdict_ttl = float(os.getenv('DAEMON_AI_VERDICT_TTL', '3600'))
+        self.ai_context_precision = int(os.getenv('DAEMON_AI_CONTEXT_PRECISION', '2'))
+        self.ai_verdict_stats = {'evaluated': 0, 'reused': 0, 'batched': 0, 'batch_requests': 0}
+        # AI-decision triggers whose context changed are evaluated this many per AI request
+        self.ai_batch_size = max(int(os.getenv('DAEMON_AI_BATCH_SIZE', '10')), 1)
+
+        # web_scrape triggers share one pooled HTTP client with per-host limits
+        self.web_fetcher = WebFetcher.from_env()
+
+        # Fired triggers and the actions the AI plans for them run from a priority queue,
+        # so a slow action never holds up trigger evaluation
+        self.action_queue = ActionQueue(
+            self.run_queued_action,
+            workers=int(os.getenv('DAEMON_ACTION_WORKERS', '4')),
+            max_pending=int(os.getenv('DAEMON_ACTION_QUEUE_MAX', '1000')),
+            type_limits=parse_type_limits(os.getenv('DAEMON_ACTION_TYPE_LIMITS', 'create_quest=2')),
+            max_attempts=int(os.getenv('DAEMON_ACTION_MAX_ATTEMPTS', '3')),
+            retry_backoff=float(os.getenv('DAEMON_ACTION_RETRY_BACKOFF', '2')),
+            on_dead_letter=self.log_dead_letter
+        )
+
+        # Offline quest generation and trigger re-validation run as provider batch jobs,
+        # recorded here so they can be resumed by id
+        self.bulk_jobs = BulkJobStore(self.data_dir / "bulk_jobs.json")
+        self.bulk_poll_interval = float(os.getenv('DAEMON_BULK_POLL_INTERVAL', '60'))
+
         self.running = False
         
         # Initialize AI components
@@ -100,20 +243,16 @@ class DaemonCore:
     def load_state(self):
         """Load daemon state from disk"""
         try:
-            if (self.data_dir / "triggers.json").exists():
-                with open(self.data_dir / "triggers.json", 'r') as f:
-                    data = json.load(f)
-                    self.triggers = {k: Trigger(**v) for k, v in data.items()}
-                    
-            if (self.data_dir / "quests.json").exists():
-                with open(self.data_dir / "quests.json", 'r') as f:
-                    data = json.load(f)
-                    self.quests = {k: Quest(**v) for k, v in data.items()}
-                    
-            if (self.data_dir / "operatives.json").exists():
-                with open(self.data_dir / "operatives.json", 'r') as f:
-                    data = json.load(f)
-                    self.operatives = {k: Operative(**v) for k, v in data.items()}
+            state = self.store.load()
+            self.triggers = state['triggers']
+            self.quests = state['quests']
+            self.operatives = state['operatives']
+            self.aggregates = NetworkAggregates.from_stats(self.store.loaded_stats())
+            self._leaderboard = None
+            self._quest_index = None
+            self.compile_triggers()
+            self.schedule_time_triggers()
+            self.index_condition_triggers()
                     
             logger.info(f"Loaded state: {len(self.triggers)} triggers, {len(self.quests)} quests, {len(self.operatives)} operatives")
         except Exception as e:
@@ -122,36 +261,81 @@ class DaemonCore:
     def save_state(self):
         """Persist daemon state to disk"""
         try:
-            with open(self.data_dir / "triggers.json", 'w') as f:
-                json.dump({k: asdict(v) for k, v in self.triggers.items()}, f, indent=2)
-                
-            with open(self.data_dir / "quests.json", 'w') as f:
-                json.dump({k: asdict(v) for k, v in self.quests.items()}, f, indent=2)
-                
-            with open(self.data_dir / "operatives.json", 'w') as f:
-                json.dump({k: asdict(v) for k, v in self.operatives.items()}, f, indent=2)
-                
+            self.store.save({
+                'triggers': self.triggers,
+                'quests': self.quests,
+                'operatives': self.operatives
+            })
             logger.info("State saved successfully")
         except Exception as e:
             logger.error(f"Error saving state: {e}")
     
-    def create_trigger(self, trigger_type: str, condition: Dict, action_id: str) -> str:
-        """Create a new trigger"""
+    def persist(self, *changes: Tuple[str, str]):
+        """Persist changed records given as (collection, key) pairs
+
+        Incremental backends write only these records; the JSON backend falls back to a full save.
+        With write-behind enabled this only marks the records dirty for the writer thread.
+        """
+        if self.writer:
+            self.writer.mark_dirty(changes)
+        else:
+            self.write_changes(changes)
+
+    def write_changes(self, changes: Iterable[Tuple[str, str]]):
+        """Write changed records to the persistence backend"""
+        if not self.store.incremental:
+            self.save_state()
+            return
+
+        try:
+            self.store.record_many(
+                (collection, key, getattr(self, collection).get(key))
+                for collection, key in changes
+            )
+        except Exception as e:
+            logger.error(f"Error persisting changes: {e}")
+
+    def create_trigger(self, trigger_type: str, condition: Dict, action_id: str,
+                       firing: Optional[Dict] = None) -> str:
+        """Create a new trigger
+
+        Raises ValueError (ConditionError) for a condition or firing policy that does not compile.
+        """
+        policy = FiringPolicy(firing)
+        evaluator = compile_condition(trigger_type, condition)
+        if trigger_type == TriggerType.TIME:
+            try:
+                # Parse the schedule and make sure it ever comes due
+                TimeSpec(condition).next_after(datetime.now().astimezone())
+            except (ValueError, TypeError) as e:
+                raise ConditionError(f"Invalid time trigger: {e}")
+        if policy.hysteresis is not None and getattr(evaluator, 'direction', None) is None:
+            raise ConditionError(
+                "hysteresis needs a condition comparing one value against a threshold with >, >=, < or <="
+            )
         trigger_id = hashlib.sha256(f"{trigger_type}{datetime.now().isoformat()}{secrets.token_hex(8)}".encode()).hexdigest()[:16]
         
         trigger = Trigger(
             trigger_id=trigger_id,
             trigger_type=trigger_type,
             condition=condition,
-            action_id=action_id
+            action_id=action_id,
+            firing=dict(firing or {})
         )
         
         self.triggers[trigger_id] = trigger
-        self.save_state()
+        self.evaluators[trigger_id] = evaluator
+        self.aggregates.trigger_added(trigger.active)
+        if trigger.trigger_type == TriggerType.TIME and trigger.active:
+            self.schedule_trigger(trigger)
+        self.index_condition_trigger(trigger)
+        self.persist(('triggers', trigger_id))
+        self.event_bus.publish(DomainEvent(DomainEventType.TRIGGER_CHANGED, {'trigger_id': trigger_id}))
         logger.info(f"Created trigger {trigger_id} of type {trigger_type}")
         return trigger_id
     
-    async def create_trigger_from_natural_language(self, description: str) -> Optional[str]:
+    async def create_trigger_from_natural_language(self, description: str,
+                                                   firing: Optional[Dict] = None) -> Optional[str]:
         """Create a trigger from natural language description using AI"""
         logger.info(f"Parsing natural language trigger: {description}")
         
@@ -170,11 +354,16 @@ class DaemonCore:
             return None
         
         # Create the trigger
-        trigger_id = self.create_trigger(
-            trigger_type=trigger_config['trigger_type'],
-            condition=trigger_config['condition'],
-            action_id=trigger_config['action'].get('action_type', 'ai_decision')
-        )
+        try:
+            trigger_id = self.create_trigger(
+                trigger_type=trigger_config['trigger_type'],
+                condition=trigger_config['condition'],
+                action_id=trigger_config['action'].get('action_type', 'ai_decision'),
+                firing=firing
+            )
+        except ValueError as e:
+            logger.error(f"Trigger rejected, invalid definition: {e}")
+            return None
         
         # Store the full AI-parsed config for reference
         trigger_config_file = self.data_dir / f"trigger_{trigger_id}_config.json"
@@ -197,24 +386,22 @@ class DaemonCore:
             requirements=requirements
         )
         
-        self.quests[quest_id] = quest
-        self.save_state()
+        self.add_quest(quest)
+        self.persist(('quests', quest_id))
+        self.event_bus.publish(DomainEvent(DomainEventType.QUEST_CREATED, {'quest_id': quest_id}))
         logger.info(f"Created quest: {title}")
         return quest_id
     
+    def add_quest(self, quest: Quest):
+        """Add a quest to memory, aggregates and indexes; the caller persists it"""
+        self.quests[quest.quest_id] = quest
+        self.aggregates.quest_status_changed(None, quest.status)
+        self._index_quest(quest)
+
     async def generate_quest_with_ai(self, difficulty: int = 2) -> Optional[str]:
         """Generate a new quest using AI based on network context"""
-        context = {
-            'network_size': len(self.operatives),
-            'active_operatives': sum(1 for op in self.operatives.values() if op.active),
-            'completed_quests': sum(1 for q in self.quests.values() if q.status == 'completed'),
-            'active_quests': sum(1 for q in self.quests.values() if q.status == 'active'),
-            'average_rank': sum(op.rank for op in self.operatives.values()) / max(len(self.operatives), 1),
-            'timestamp': datetime.now().isoformat()
-        }
-        
         logger.info(f"Generating AI quest with difficulty {difficulty}")
-        quest_data = await self.ai_core.generate_quest(context, difficulty)
+        quest_data = await self.ai_core.generate_quest(self.quest_context(), difficulty)
         
         if not quest_data:
             logger.error("Failed to generate quest")
@@ -231,6 +418,157 @@ class DaemonCore:
         logger.info(f"AI generated quest: {quest_data.get('title')}")
         return quest_id
     
+    def quest_context(self) -> Dict:
+        """Network context the AI generates quests for"""
+        stats = self.get_network_stats()
+        return {
+            'network_size': stats['total_operatives'],
+            'active_operatives': stats['active_operatives'],
+            'completed_quests': stats['quests_by_status'].get('completed', 0),
+            'active_quests': stats['quests_by_status'].get('active', 0),
+            'average_rank': stats['rank_sum'] / max(stats['total_operatives'], 1),
+            'timestamp': datetime.now().isoformat()
+        }
+
+    async def submit_bulk_quests(self, count: int, difficulty: int = 2,
+                                 ai_provider: Optional[str] = None) -> Optional[BulkJob]:
+        """Submit generation of count quests as one provider batch job"""
+        prompt = self.ai_core.quest_prompt(self.quest_context(), difficulty)
+        requests, items = [], {}
+        for i in range(count):
+            custom_id = f"quest-{i}"
+            items[custom_id] = {'difficulty': difficulty}
+            # Identical prompts would come back as near-identical quests
+            requests.append((custom_id, f"{prompt}\n\nThis is quest {i + 1} of {count} generated together; "
+                                        f"make its theme and objectives distinct from the others."))
+        return await self.submit_bulk_job(BulkJobKind.GENERATE_QUESTS, requests, items, ai_provider)
+
+    async def submit_bulk_trigger_validation(self, ai_provider: Optional[str] = None) -> Optional[BulkJob]:
+        """Submit a safety re-validation of every active trigger as one provider batch job"""
+        requests, items = [], {}
+        for trigger in self.store.query_triggers(active=True):
+            custom_id = f"trigger-{trigger.trigger_id}"
+            items[custom_id] = {'trigger_id': trigger.trigger_id}
+            requests.append((custom_id, self.trigger_analyzer.safety_prompt({
+                'trigger_type': trigger.trigger_type,
+                'condition': trigger.condition,
+                'action': {'action_type': trigger.action_id}
+            })))
+        return await self.submit_bulk_job(BulkJobKind.VALIDATE_TRIGGERS, requests, items, ai_provider)
+
+    async def submit_bulk_job(self, kind: str, requests: List[Tuple[str, str]], items: Dict[str, Dict],
+                              ai_provider: Optional[str] = None) -> Optional[BulkJob]:
+        """Submit requests as a provider batch and record the job so it can be resumed"""
+        if not requests:
+            logger.info(f"No requests to submit for bulk {kind} job")
+            return None
+        try:
+            provider, batch_id = await self.ai_core.submit_batch(requests, response_format='json',
+                                                                 ai_provider=ai_provider)
+        except Exception as e:
+            logger.error(f"Error submitting bulk {kind} job: {e}")
+            return None
+
+        job_id = hashlib.sha256(f"{provider}{batch_id}".encode()).hexdigest()[:16]
+        job = BulkJob(job_id=job_id, kind=kind, provider=provider, batch_id=batch_id, items=items)
+        self.bulk_jobs.save(job)
+        logger.info(f"Submitted bulk {kind} job {job_id} ({provider} batch {batch_id}, {len(requests)} requests)")
+        return job
+
+    async def resume_bulk_job(self, job_id: str, poll_interval: Optional[float] = None) -> Optional[BulkJob]:
+        """Wait for a bulk job's provider batch to end, then ingest its results"""
+        job = self.bulk_jobs.get(job_id)
+        if job is None:
+            logger.error(f"Unknown bulk job {job_id}")
+            return None
+        if job.status != BulkJobStatus.SUBMITTED:
+            return job
+
+        poll_interval = self.bulk_poll_interval if poll_interval is None else poll_interval
+        while True:
+            try:
+                status = await self.ai_core.batch_status(job.provider, job.batch_id)
+            except Exception as e:
+                logger.error(f"Error polling bulk job {job_id}, will retry: {e}")
+                status = 'in_progress'
+            if status != 'in_progress':
+                break
+            await asyncio.sleep(poll_interval)
+
+        if status == 'failed':
+            job.status = BulkJobStatus.FAILED
+        else:
+            try:
+                results = await self.ai_core.batch_results(job.provider, job.batch_id)
+            except Exception as e:
+                # The job stays submitted, so a later resume fetches the results again
+                logger.error(f"Error fetching results of bulk job {job_id}: {e}")
+                return job
+            if job.kind == BulkJobKind.GENERATE_QUESTS:
+                job.summary = self.ingest_bulk_quests(job, results)
+            else:
+                job.summary = self.ingest_bulk_validation(job, results)
+            job.status = BulkJobStatus.INGESTED
+
+        job.completed_at = datetime.now().isoformat()
+        self.bulk_jobs.save(job)
+        logger.info(f"Bulk job {job_id} {job.status}: {job.summary}")
+        return job
+
+    def ingest_bulk_quests(self, job: BulkJob, results: Dict[str, Optional[Dict]]) -> Dict:
+        """Create the quests of a finished bulk job in one persisted commit"""
+        created, failed, duplicates = [], 0, 0
+        for custom_id, item in job.items.items():
+            quest_data = results.get(custom_id)
+            if not isinstance(quest_data, dict):
+                failed += 1
+                continue
+            # Derived from the job, so ingesting the same results again creates nothing new
+            quest_id = hashlib.sha256(f"{job.job_id}:{custom_id}".encode()).hexdigest()[:16]
+            if quest_id in self.quests:
+                duplicates += 1
+                continue
+            self.add_quest(Quest(
+                quest_id=quest_id,
+                title=quest_data.get('title', 'Untitled Quest'),
+                description=quest_data.get('description', ''),
+                difficulty=quest_data.get('difficulty', item.get('difficulty', 2)),
+                rewards=quest_data.get('rewards', {'reputation': 50}),
+                requirements=quest_data.get('requirements', {'min_rank': 1})
+            ))
+            created.append(quest_id)
+
+        if created:
+            self.persist(*(('quests', quest_id) for quest_id in created))
+            self.flush()
+            for quest_id in created:
+                self.event_bus.publish(DomainEvent(DomainEventType.QUEST_CREATED, {'quest_id': quest_id}))
+        return {'created': len(created), 'failed': failed, 'duplicates': duplicates}
+
+    def ingest_bulk_validation(self, job: BulkJob, results: Dict[str, Optional[Dict]]) -> Dict:
+        """Deactivate the triggers a finished re-validation job rejected, in one persisted commit"""
+        approved, rejected, failed = 0, [], 0
+        for custom_id, item in job.items.items():
+            verdict = results.get(custom_id)
+            trigger_id = item['trigger_id']
+            if not isinstance(verdict, dict) or trigger_id not in self.triggers:
+                failed += 1
+                continue
+            if verdict.get('approved', False):
+                approved += 1
+                continue
+            logger.warning(f"Trigger {trigger_id} failed re-validation: {verdict.get('concerns')}")
+            if self.triggers[trigger_id].active:
+                self.set_trigger_active(trigger_id, False)
+                rejected.append(trigger_id)
+
+        if rejected:
+            self.persist(*(('triggers', trigger_id) for trigger_id in rejected))
+            self.flush()
+            for trigger_id in rejected:
+                self.event_bus.publish(DomainEvent(DomainEventType.TRIGGER_CHANGED, {'trigger_id': trigger_id}))
+        return {'approved': approved, 'deactivated': len(rejected), 'failed': failed}
+
     def recruit_operative(self, username: str, skills: List[str]) -> str:
         """Recruit a new operative into the daemon network"""
         operative_id = hashlib.sha256(f"{username}{datetime.now().isoformat()}".encode()).hexdigest()[:16]
@@ -243,12 +581,16 @@ class DaemonCore:
             rank=1,
             reputation=0,
             skills=skills,
-            completed_quests=[],
+            completed_quests=QuestRefs(),
             joined_date=datetime.now().isoformat()
         )
         
         self.operatives[operative_id] = operative
-        self.save_state()
+        self.aggregates.operative_added(operative.rank, operative.reputation, operative.active)
+        if self._leaderboard is not None:
+            self._leaderboard.update(operative_id, operative.rank, operative.reputation)
+        self.persist(('operatives', operative_id))
+        self.event_bus.publish(DomainEvent(DomainEventType.OPERATIVE_RECRUITED, {'operative_id': operative_id}))
         logger.info(f"Recruited operative: {username} (darknet: {darknet_name})")
         return operative_id
     
@@ -271,9 +613,14 @@ class DaemonCore:
             logger.warning(f"Operative {operative.darknet_name} does not meet rank requirement")
             return False
         
-        quest.status = 'active'
+        self.aggregates.quest_status_changed(quest.status, QuestStatus.ACTIVE)
+        quest.status = QuestStatus.ACTIVE
         quest.assigned_to = operative_id
-        self.save_state()
+        self._index_quest(quest)
+        self.persist(('quests', quest_id))
+        self.event_bus.publish(DomainEvent(
+            DomainEventType.QUEST_ASSIGNED, {'quest_id': quest_id, 'operative_id': operative_id}
+        ))
         
         logger.info(f"Assigned quest '{quest.title}' to {operative.darknet_name}")
         return True
@@ -289,103 +636,446 @@ class DaemonCore:
         if quest.assigned_to != operative_id:
             return False
         
-        quest.status = 'completed'
+        self.aggregates.quest_status_changed(quest.status, QuestStatus.COMPLETED)
+        quest.status = QuestStatus.COMPLETED
+        self._index_quest(quest)
         operative.completed_quests.append(quest_id)
-        operative.reputation += quest.rewards.get('reputation', 0)
+        reward = quest.rewards.get('reputation', 0)
+        operative.reputation += reward
         
         # Level up logic
-        if operative.reputation >= operative.rank * 100:
+        leveled_up = operative.reputation >= operative.rank * 100
+        if leveled_up:
             operative.rank += 1
             logger.info(f"{operative.darknet_name} leveled up to rank {operative.rank}")
+        self.aggregates.operative_changed(rank_delta=int(leveled_up), reputation_delta=reward)
+        if self._leaderboard is not None:
+            self._leaderboard.update(operative_id, operative.rank, operative.reputation)
         
-        self.save_state()
+        self.persist(('quests', quest_id), ('operatives', operative_id))
+        self.event_bus.publish(DomainEvent(
+            DomainEventType.QUEST_COMPLETED, {'quest_id': quest_id, 'operative_id': operative_id}
+        ))
         logger.info(f"Quest '{quest.title}' completed by {operative.darknet_name}")
         return True
     
+    @property
+    def quest_index(self) -> QuestIndex:
+        """Status/rank/operative indexes over all quests, built on first use"""
+        if self._quest_index is None:
+            self.flush()
+            self._quest_index = QuestIndex(self.store.quest_entries())
+        return self._quest_index
+
+    def _index_quest(self, quest: Quest):
+        if self._quest_index is not None:
+            self._quest_index.update(quest.quest_id, quest.status, quest_min_rank(quest), quest.assigned_to)
+
+    def get_quests_for_operative(self, operative_id: str) -> Dict[str, List[Quest]]:
+        """Get the quests an operative can take, is working on, and has completed"""
+        operative = self.operatives.get(operative_id)
+        if not operative:
+            return {'available': [], 'active': [], 'completed': []}
+
+        index = self.quest_index
+        return {
+            'available': [self.quests[q] for q in index.available(operative.rank)],
+            'active': [self.quests[q] for q in index.active(operative_id)],
+            'completed': [self.quests[q] for q in index.completed(operative_id)]
+        }
+
+    @property
+    def leaderboard(self) -> LeaderboardIndex:
+        """Ranking index over all operatives, built on first use"""
+        if self._leaderboard is None:
+            # Standings may be read from the store, so pending write-behind changes go first
+            self.flush()
+            self._leaderboard = LeaderboardIndex(self.store.standings())
+        return self._leaderboard
+
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[Operative]:
+        """Get a page of operatives ordered by rank and reputation"""
+        return [self.operatives[op_id] for op_id in self.leaderboard.page(offset, limit)]
+
+    def get_operative_standing(self, operative_id: str) -> Optional[Dict]:
+        """Get an operative's 1-based leaderboard position"""
+        position = self.leaderboard.position(operative_id)
+        if position is None:
+            return None
+        return {'position': position + 1, 'total': len(self.leaderboard)}
+
     async def check_triggers(self):
-        """Check all active triggers and execute actions if conditions are met"""
-        for trigger_id, trigger in self.triggers.items():
-            if not trigger.active:
-                continue
-                
+        """Check all active polled triggers and execute actions if conditions are met
+
+        Time triggers are not polled; run_due_time_triggers fires them from the scheduler.
+        Condition triggers are evaluated by on_domain_event when the state they read changes.
+        Polled triggers are evaluated concurrently, at most DAEMON_TRIGGER_CONCURRENCY at once,
+        each bounded by DAEMON_TRIGGER_TIMEOUT seconds. AI-decision triggers are first evaluated
+        in batches of DAEMON_AI_BATCH_SIZE per AI request.
+        """
+        started = time.monotonic()
+        # Other workers' mutations publish no events here, so sharded workers poll condition triggers
+        event_driven = (TriggerType.TIME,) if self.shards else (TriggerType.TIME, TriggerType.CONDITION)
+        if self.shards:
+            self.refresh_shared_state()
+        triggers = [
+            t for t in self.store.query_triggers(active=True)
+            if t.trigger_type not in event_driven and self.owns_trigger(t.trigger_id)
+        ]
+        semaphore = asyncio.Semaphore(self.trigger_concurrency)
+        if self.ai_batch_size > 1:
+            ai_triggers = [t for t in triggers if t.trigger_type == TriggerType.AI_DECISION]
+            if len(ai_triggers) > 1:
+                await self.evaluate_ai_triggers_batched(ai_triggers, semaphore)
+        outcomes = await asyncio.gather(*(self.check_trigger(t, semaphore) for t in triggers))
+
+        duration = time.monotonic() - started
+        interval = self.tick_stats.interval
+        if self.tick_stats.record(
+            duration,
+            evaluated=len(triggers),
+            timeouts=outcomes.count('timeout'),
+            errors=outcomes.count('error')
+        ):
+            logger.warning(
+                f"Trigger tick took {duration:.1f}s, over the {interval:.1f}s interval; "
+                f"polling every {self.tick_stats.interval:.1f}s"
+            )
+
+    async def check_trigger(self, trigger: Trigger, semaphore: asyncio.Semaphore) -> str:
+        """Evaluate one polled trigger under the concurrency limit and timeout"""
+        trigger_id = trigger.trigger_id
+        async with semaphore:
             try:
                 trigger.last_checked = datetime.now().isoformat()
-                should_fire = False
-                
-                if trigger.trigger_type == 'time':
-                    should_fire = self.check_time_condition(trigger.condition)
-                        
-                elif trigger.trigger_type == 'event':
-                    should_fire = self.check_event_condition(trigger.condition)
-                        
-                elif trigger.trigger_type == 'condition':
-                    should_fire = self.check_general_condition(trigger.condition)
-                
-                elif trigger.trigger_type == 'ai_decision':
-                    # Use AI to evaluate complex conditions
-                    context = self.get_network_context()
-                    ai_evaluation = await self.ai_core.evaluate_trigger_with_ai(
-                        asdict(trigger), 
-                        context
-                    )
-                    if ai_evaluation:
-                        should_fire = ai_evaluation.get('should_trigger', False)
-                        logger.info(f"AI evaluation for trigger {trigger_id}: {ai_evaluation.get('reasoning')}")
-                
-                if should_fire:
-                    await self.execute_action(trigger.action_id, trigger_id)
-                        
+                met, value, threshold = await asyncio.wait_for(
+                    self.evaluate_polled_trigger(trigger), self.trigger_timeout
+                )
+                await self.fire_trigger(trigger, met, value, threshold)
+                return 'ok'
+            except asyncio.TimeoutError:
+                logger.warning(f"Trigger {trigger_id} evaluation timed out after {self.trigger_timeout}s")
+                return 'timeout'
             except Exception as e:
                 logger.error(f"Error checking trigger {trigger_id}: {e}")
+                return 'error'
+
+    async def evaluate_polled_trigger(self, trigger: Trigger) -> Tuple[bool, Optional[float], Optional[float]]:
+        """Evaluate a polled trigger's condition as (met, value, threshold)"""
+        evaluator = self.evaluator_for(trigger)
+        if evaluator is not None:
+            result = evaluator(self)
+            if inspect.isawaitable(result):
+                # web_scrape evaluators fetch the page
+                result = await result
+            return result
+
+        if trigger.trigger_type == 'ai_decision':
+            # Use AI to evaluate complex conditions, unless nothing it depends on has changed
+            context, digest = self.ai_decision_context(trigger, self.get_network_context())
+            now = time.monotonic()
+            verdict = self.reusable_verdict(trigger.trigger_id, digest, now)
+            if verdict is not None:
+                self.ai_verdict_stats['reused'] += 1
+                return verdict, None, None
+
+            ai_evaluation = await self.ai_core.evaluate_trigger_with_ai(
+                asdict(trigger),
+                context
+            )
+            self.ai_verdict_stats['evaluated'] += 1
+            if ai_evaluation:
+                logger.info(f"AI evaluation for trigger {trigger.trigger_id}: {ai_evaluation.get('reasoning')}")
+                met = bool(ai_evaluation.get('should_trigger', False))
+                self.ai_verdicts[trigger.trigger_id] = (digest, met, now)
+                return met, None, None
+
+        return False, None, None
+
+    def ai_decision_context(self, trigger: Trigger, network_context: Dict) -> Tuple[Dict, str]:
+        """Canonical context an AI-decision trigger is evaluated against, and its digest"""
+        context = canonical_context(network_context, trigger.condition, self.ai_context_precision)
+        return context, context_digest(context)
+
+    def reusable_verdict(self, trigger_id: str, digest: str, now: float) -> Optional[bool]:
+        """A trigger's previous AI verdict, if it was reached on the same context recently enough"""
+        previous = self.ai_verdicts.get(trigger_id)
+        if previous and previous[0] == digest and now - previous[2] < self.ai_verdict_ttl:
+            return previous[1]
+        return None
+
+    async def evaluate_ai_triggers_batched(self, triggers: List[Trigger], semaphore: asyncio.Semaphore):
+        """Evaluate the AI-decision triggers whose context changed, several per AI request
+
+        Verdicts land in ai_verdicts, where each trigger's own check then finds them.
+        """
+        network_context = self.get_network_context()
+        now = time.monotonic()
+        pending = []
+        for trigger in triggers:
+            context, digest = self.ai_decision_context(trigger, network_context)
+            if self.reusable_verdict(trigger.trigger_id, digest, now) is None:
+                pending.append((trigger, context, digest))
+        if len(pending) < 2:
+            return
+
+        async def evaluate_batch(batch):
+            # Canonical contexts are slices of one network context, so their union is consistent
+            shared = {}
+            for _, context, _ in batch:
+                shared.update(context)
+            async with semaphore:
+                try:
+                    verdicts = await asyncio.wait_for(self.ai_core.evaluate_triggers_batch(
+                        [{'trigger_id': t.trigger_id, 'trigger_type': t.trigger_type, 'condition': t.condition}
+                         for t, _, _ in batch],
+                        shared
+                    ), self.trigger_timeout)
+                except Exception as e:
+                    # Triggers without a verdict are evaluated individually by check_trigger
+                    logger.error(f"Batched AI evaluation of {len(batch)} triggers failed: {e}")
+                    return
+            self.ai_verdict_stats['batch_requests'] += 1
+            for trigger, _, digest in batch:
+                verdict = verdicts.get(trigger.trigger_id)
+                if verdict:
+                    self.ai_verdict_stats['batched'] += 1
+                    self.ai_verdicts[trigger.trigger_id] = (digest, bool(verdict.get('should_trigger', False)), now)
+
+        size = self.ai_batch_size
+        await asyncio.gather(*(evaluate_batch(pending[i:i + size]) for i in range(0, len(pending), size)))
+
+    def owns_trigger(self, trigger_id: str) -> bool:
+        """Whether this process evaluates a trigger (always, unless running as a sharded worker)"""
+        return self.shards is None or self.shards.owns(trigger_id)
+
+    def refresh_shared_state(self):
+        """Pick up changes other worker processes made to the shared store"""
+        self.aggregates = NetworkAggregates.from_stats(self.store.network_stats())
+        for trigger in self.store.query_triggers(active=True, trigger_type=TriggerType.TIME):
+            if trigger.trigger_id not in self.scheduler:
+                self.schedule_trigger(trigger)
+
+    async def run_leases(self):
+        """Renew shard leases every third of the lease TTL"""
+        while self.running:
+            try:
+                await asyncio.to_thread(self.shards.renew)
+            except Exception as e:
+                logger.error(f"Lease renewal failed: {e}")
+            await asyncio.sleep(self.shards.ttl / 3)
+
+    def get_tick_stats(self) -> Dict:
+        """Get polling loop timings: tick durations, overruns, timeouts and the current interval"""
+        return self.tick_stats.as_dict()
+
+    def get_scrape_stats(self) -> Dict:
+        """Get web_scrape fetch counters (requests, 304s, unchanged/changed pages, errors, bytes) and connection reuse"""
+        return {**self.web_fetcher.stats, 'connections': self.web_fetcher.connection_stats.as_dict()}
+
+    def get_ai_verdict_stats(self) -> Dict:
+        """Get how many AI-decision checks called the AI and how many reused a verdict"""
+        return dict(self.ai_verdict_stats)
+
+    def get_action_queue_stats(self) -> Dict:
+        """Get action queue depth, running actions by type, retry/dead-letter counts and wait/run latencies"""
+        return self.action_queue.as_dict()
+
+    def index_condition_triggers(self):
+        """Rebuild the event dependency index for every active condition trigger"""
+        self.condition_deps.clear()
+        for trigger in self.store.query_triggers(active=True, trigger_type=TriggerType.CONDITION):
+            self.index_condition_trigger(trigger)
+
+    def index_condition_trigger(self, trigger: Trigger):
+        """Record which domain events can change a condition trigger's outcome"""
+        evaluator = self.evaluator_for(trigger) if trigger.active else None
+        if trigger.trigger_type == TriggerType.CONDITION and evaluator is not None:
+            self.condition_deps.add(trigger.trigger_id, metric_dependencies(evaluator.metrics))
+        else:
+            self.condition_deps.remove(trigger.trigger_id)
+
+    def compile_triggers(self):
+        """Compile the conditions of every active trigger up front"""
+        self.evaluators = {}
+        self.ai_verdicts = {}
+        for trigger in self.store.query_triggers(active=True):
+            self.evaluator_for(trigger)
+
+    def evaluator_for(self, trigger: Trigger) -> Optional[Evaluator]:
+        """Compiled condition of a trigger, None for types evaluated elsewhere (time, AI)"""
+        try:
+            return self.evaluators[trigger.trigger_id]
+        except KeyError:
+            pass
+        try:
+            evaluator = compile_condition(trigger.trigger_type, trigger.condition)
+        except ConditionError as e:
+            logger.error(f"Trigger {trigger.trigger_id} has an invalid condition and will not fire: {e}")
+            evaluator = NeverEvaluator()
+        self.evaluators[trigger.trigger_id] = evaluator
+        return evaluator
+
+    def invalidate_evaluator(self, trigger_id: str):
+        """Drop a trigger's compiled condition and reusable AI verdict after its definition changes"""
+        self.evaluators.pop(trigger_id, None)
+        self.ai_verdicts.pop(trigger_id, None)
+
+    def metric(self, name: str) -> float:
+        """Network metric lookup for compiled conditions"""
+        return self.aggregates.metric(name)
+
+    def event_count(self, event_type: str, within_seconds: Optional[float] = None) -> int:
+        """Event count lookup for compiled conditions"""
+        return self.event_store.count(event_type, within_seconds=within_seconds)
+
+    async def on_domain_event(self, event: DomainEvent):
+        """Evaluate the condition triggers affected by a state change"""
+        trigger_ids = self.condition_deps.affected(event.type)
+        if event.type == DomainEventType.TRIGGER_CHANGED and event.data['trigger_id'] not in trigger_ids:
+            trigger_ids.append(event.data['trigger_id'])
+
+        for trigger_id in trigger_ids:
+            trigger = self.triggers.get(trigger_id)
+            if trigger is not None and trigger.active and trigger.trigger_type == TriggerType.CONDITION \
+                    and self.owns_trigger(trigger_id):
+                await self.evaluate_condition_trigger(trigger)
+
+    async def evaluate_condition_trigger(self, trigger: Trigger):
+        """Check one condition trigger and execute its action if the condition holds"""
+        try:
+            trigger.last_checked = datetime.now().isoformat()
+            evaluator = self.evaluator_for(trigger)
+            if evaluator is not None:
+                await self.fire_trigger(trigger, *evaluator(self))
+        except Exception as e:
+            logger.error(f"Error checking trigger {trigger.trigger_id}: {e}")
+
+    def get_network_stats(self) -> Dict:
+        """Get maintained network totals, cross-checked against a full recompute in debug mode"""
+        stats = self.aggregates.as_stats()
+        if self.debug_aggregates:
+            self.flush()
+            mismatches = self.aggregates.diff(self.store.network_stats())
+            if mismatches:
+                logger.error(f"Network aggregates drifted from recompute: {mismatches}")
+                self.aggregates = NetworkAggregates.from_stats(self.store.network_stats())
+                stats = self.aggregates.as_stats()
+        return stats
     
     def get_network_context(self) -> Dict:
         """Get current network context for AI decision making"""
+        stats = self.get_network_stats()
+        by_status = stats['quests_by_status']
         return {
-            'total_operatives': len(self.operatives),
-            'active_operatives': sum(1 for op in self.operatives.values() if op.active),
-            'total_quests': len(self.quests),
-            'available_quests': sum(1 for q in self.quests.values() if q.status == 'available'),
-            'active_quests': sum(1 for q in self.quests.values() if q.status == 'active'),
-            'completed_quests': sum(1 for q in self.quests.values() if q.status == 'completed'),
-            'average_rank': sum(op.rank for op in self.operatives.values()) / max(len(self.operatives), 1),
-            'total_reputation': sum(op.reputation for op in self.operatives.values()),
-            'active_triggers': sum(1 for t in self.triggers.values() if t.active),
+            'total_operatives': stats['total_operatives'],
+            'active_operatives': stats['active_operatives'],
+            'total_quests': stats['total_quests'],
+            'available_quests': by_status.get('available', 0),
+            'active_quests': by_status.get('active', 0),
+            'completed_quests': by_status.get('completed', 0),
+            'average_rank': stats['rank_sum'] / max(stats['total_operatives'], 1),
+            'total_reputation': stats['total_reputation'],
+            'active_triggers': stats['active_triggers'],
             'timestamp': datetime.now().isoformat()
         }
     
-    def check_time_condition(self, condition: Dict) -> bool:
-        """Check if time condition is met"""
-        target_time = condition.get('time')
-        if not target_time:
-            return False
-        return datetime.now().strftime('%H:%M') == target_time
+    def schedule_time_triggers(self):
+        """Load every active time trigger into the scheduler"""
+        self.scheduler.clear()
+        for trigger in self.store.query_triggers(active=True, trigger_type=TriggerType.TIME):
+            self.schedule_trigger(trigger)
+        logger.info(f"Scheduled {len(self.scheduler)} time triggers")
     
-    def check_event_condition(self, condition: Dict) -> bool:
-        """Check if event condition is met"""
-        event_file = self.data_dir / "events.json"
-        if not event_file.exists():
+    def schedule_trigger(self, trigger: Trigger) -> bool:
+        """Add a time trigger to the scheduler, resuming from its persisted next run"""
+        try:
+            next_run = self.scheduler.schedule(trigger.trigger_id, trigger.condition, trigger.next_run)
+        except ScheduleError as e:
+            logger.error(f"Cannot schedule trigger {trigger.trigger_id}: {e}")
             return False
-            
-        with open(event_file, 'r') as f:
-            events = json.load(f)
-            
-        event_type = condition.get('event_type')
-        return any(e.get('type') == event_type for e in events)
-    
-    def check_general_condition(self, condition: Dict) -> bool:
-        """Check general condition"""
-        condition_type = condition.get('type')
-        
-        if condition_type == 'operative_count':
-            return len(self.operatives) >= condition.get('threshold', 0)
-        elif condition_type == 'quest_completion':
-            completed = sum(1 for q in self.quests.values() if q.status == 'completed')
-            return completed >= condition.get('threshold', 0)
-            
-        return False
+        trigger.next_run = next_run.isoformat()
+        return True
+
+    async def run_due_time_triggers(self):
+        """Fire time triggers whose deadline has passed, applying their missed-run policy"""
+        for trigger_id, runs, next_run in self.scheduler.due():
+            trigger = self.triggers.get(trigger_id)
+            if trigger is None or not trigger.active:
+                self.scheduler.unschedule(trigger_id)
+                continue
+            if not self.owns_trigger(trigger_id):
+                continue
+            try:
+                trigger.last_checked = datetime.now().isoformat()
+                trigger.next_run = next_run.isoformat()
+                if runs == 0:
+                    logger.info(f"Skipped missed run of trigger {trigger_id}, next at {trigger.next_run}")
+                fired = False
+                for _ in range(runs):
+                    fired = await self.fire_trigger(trigger, True) or fired
+                if not fired:
+                    self.persist(('triggers', trigger_id))
+            except Exception as e:
+                logger.error(f"Error firing time trigger {trigger_id}: {e}")
+
+    async def run_scheduler(self):
+        """Sleep until the next time trigger deadline and fire it"""
+        while self.running:
+            try:
+                await self.run_due_time_triggers()
+                await self.scheduler.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler error: {e}")
+                await asyncio.sleep(1)
+
+    def firing_policy(self, trigger: Trigger) -> FiringPolicy:
+        """Parse a trigger's firing policy, falling back to the default for its type"""
+        default_mode = 'level' if trigger.trigger_type == TriggerType.TIME else 'rising_edge'
+        try:
+            return FiringPolicy(trigger.firing, default_mode)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid firing policy on trigger {trigger.trigger_id}: {e}")
+            return FiringPolicy(None, default_mode)
+
+    async def fire_trigger(self, trigger: Trigger, met: bool, value: Optional[float] = None,
+                           threshold: Optional[float] = None) -> bool:
+        """Queue a trigger's action if its condition holds and its firing policy allows it"""
+        evaluator = self.evaluators.get(trigger.trigger_id)
+        fire, changed = evaluate_firing(
+            self.firing_policy(trigger), trigger.fire_state, met, time.time(), value, threshold,
+            getattr(evaluator, 'direction', None) or 1
+        )
+        if fire or changed:
+            self.persist(('triggers', trigger.trigger_id))
+        if fire:
+            # Waits only while the action queue is full
+            await self.action_queue.submit(
+                'trigger', {'action_id': trigger.action_id}, trigger_id=trigger.trigger_id
+            )
+        return fire
+
+    async def run_queued_action(self, job: QueuedAction):
+        """Action queue handler: plan a fired trigger's actions, or perform one of them"""
+        if job.action_type == 'trigger':
+            await self.execute_action(job.payload['action_id'], job.trigger_id)
+        else:
+            await self.perform_action(job.payload)
+
+    def log_dead_letter(self, job: QueuedAction):
+        """Record an action that failed every attempt in the action log"""
+        self.action_log.append({
+            'action_id': job.payload.get('action_id', job.action_type),
+            'trigger_id': job.trigger_id,
+            'timestamp': datetime.now().isoformat(),
+            'status': 'dead_letter',
+            'action': job.as_dict()
+        })
     
     async def execute_action(self, action_id: str, trigger_id: Optional[str] = None):
-        """Execute an action triggered by a condition"""
+        """Plan the actions for a fired trigger and queue them by their AI-assigned priority"""
         logger.info(f"Executing action: {action_id}")
         
         # Get network context
@@ -398,27 +1088,11 @@ class DaemonCore:
         
         actions = await self.ai_core.generate_trigger_actions(trigger_event, context)
         
-        # Execute each action
         for action in actions:
-            action_type = action.get('action_type')
-            
-            if action_type == 'create_quest':
-                difficulty = action.get('parameters', {}).get('difficulty', 2)
-                await self.generate_quest_with_ai(difficulty)
-            
-            elif action_type == 'send_message':
-                # Log message action
-                logger.info(f"Message action: {action.get('description')}")
-            
-            elif action_type == 'modify_trigger':
-                # Modify trigger state
-                target_trigger = action.get('parameters', {}).get('trigger_id')
-                if target_trigger in self.triggers:
-                    self.triggers[target_trigger].active = action.get('parameters', {}).get('active', True)
-            
-            elif action_type == 'alert_operatives':
-                # Alert system
-                logger.info(f"Alert: {action.get('description')}")
+            await self.action_queue.submit(
+                action.get('action_type', 'other'), action,
+                priority=action.get('priority'), trigger_id=trigger_id, wait=False
+            )
         
         # Log the action
         action_log = {
@@ -429,38 +1103,100 @@ class DaemonCore:
             'ai_generated_actions': actions
         }
         
-        log_file = self.data_dir / "action_log.json"
-        logs = []
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
+        self.action_log.append(action_log)
+
+    async def perform_action(self, action: Dict):
+        """Carry out one AI-generated action"""
+        action_type = action.get('action_type')
         
-        logs.append(action_log)
+        if action_type == 'create_quest':
+            difficulty = action.get('parameters', {}).get('difficulty', 2)
+            if await self.generate_quest_with_ai(difficulty) is None:
+                # Raised so the action queue retries the action and dead-letters it in the end
+                raise RuntimeError(f"Quest generation failed (difficulty {difficulty})")
         
-        with open(log_file, 'w') as f:
-            json.dump(logs, f, indent=2)
+        elif action_type == 'send_message':
+            # Log message action
+            logger.info(f"Message action: {action.get('description')}")
         
-        self.save_state()
+        elif action_type == 'modify_trigger':
+            # Modify trigger state
+            target_trigger = action.get('parameters', {}).get('trigger_id')
+            if target_trigger in self.triggers:
+                self.set_trigger_active(target_trigger, action.get('parameters', {}).get('active', True))
+                self.persist(('triggers', target_trigger))
+                self.event_bus.publish(DomainEvent(DomainEventType.TRIGGER_CHANGED, {'trigger_id': target_trigger}))
+
+        elif action_type == 'alert_operatives':
+            # Alert system
+            logger.info(f"Alert: {action.get('description')}")
+
+    def set_trigger_active(self, trigger_id: str, active: bool):
+        """Activate or deactivate a trigger in memory and the schedules; the caller persists it"""
+        target = self.triggers[trigger_id]
+        self.aggregates.trigger_active_changed(target.active, active)
+        target.active = active
+        self.invalidate_evaluator(trigger_id)
+        if target.trigger_type == TriggerType.TIME:
+            if active:
+                self.schedule_trigger(target)
+            else:
+                self.scheduler.unschedule(trigger_id)
+        self.index_condition_trigger(target)
     
     async def run(self):
         """Main daemon loop"""
         self.running = True
         logger.info("Daemon core started")
         
+        if self.shards:
+            self.shards.renew()
+            lease_task = asyncio.create_task(self.run_leases())
+        self.action_queue.start()
+        scheduler_task = asyncio.create_task(self.run_scheduler())
+        bus_task = asyncio.create_task(self.event_bus.run())
         try:
+            # Changes made while the daemon was stopped published no events
+            for trigger in self.store.query_triggers(active=True, trigger_type=TriggerType.CONDITION):
+                if self.owns_trigger(trigger.trigger_id):
+                    await self.evaluate_condition_trigger(trigger)
+
             while self.running:
                 await self.check_triggers()
-                await asyncio.sleep(5)  # Check every 5 seconds
+                # Poll event/AI triggers every interval; the interval widens while ticks overrun
+                await asyncio.sleep(self.tick_stats.sleep_time())
         except Exception as e:
             logger.error(f"Daemon error: {e}")
         finally:
+            scheduler_task.cancel()
+            bus_task.cancel()
+            if self.shards:
+                lease_task.cancel()
+                self.shards.release()
+            await self.action_queue.stop(drain_timeout=self.trigger_timeout)
+            await self.web_fetcher.close()
+            await self.ai_core.close()
+            self.flush()
             self.save_state()
             logger.info("Daemon core stopped")
     
+    def flush(self):
+        """Write any changes still queued for the background writer"""
+        if self.writer:
+            self.writer.flush()
+
     def stop(self):
         """Stop the daemon"""
         self.running = False
+        if self.writer:
+            self.writer.stop()
         self.save_state()
+        self.store.close()
+        self.action_log.close()
+        if self.ai_core.cache:
+            self.ai_core.cache.close()
+        if self.shards:
+            self.shards.close()
 
 
 if __name__ == "__main__":
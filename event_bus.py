@@ -0,0 +1,145 @@
+"""
+Event Bus - In-process domain events for change-driven trigger evaluation
+DaemonCore mutations publish typed events; a dependency index maps each event type to the
+condition triggers that read the state it changed, so only those triggers are re-evaluated.
+"""
+
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DomainEventType(StrEnum):
+    OPERATIVE_RECRUITED = 'operative_recruited'
+    QUEST_CREATED = 'quest_created'
+    QUEST_ASSIGNED = 'quest_assigned'
+    QUEST_COMPLETED = 'quest_completed'
+    TRIGGER_CHANGED = 'trigger_changed'
+
+
+@dataclass(slots=True)
+class DomainEvent:
+    """A state change published by DaemonCore"""
+    type: DomainEventType
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+# Network metric -> domain events that can change it; a compiled condition depends on the
+# events of every metric it reads
+METRIC_DEPENDENCIES: Dict[str, Set[DomainEventType]] = {
+    'total_operatives': {DomainEventType.OPERATIVE_RECRUITED},
+    'active_operatives': {DomainEventType.OPERATIVE_RECRUITED},
+    'average_rank': {DomainEventType.OPERATIVE_RECRUITED, DomainEventType.QUEST_COMPLETED},
+    'total_reputation': {DomainEventType.QUEST_COMPLETED},
+    'total_quests': {DomainEventType.QUEST_CREATED},
+    'available_quests': {DomainEventType.QUEST_CREATED, DomainEventType.QUEST_ASSIGNED},
+    'active_quests': {DomainEventType.QUEST_ASSIGNED, DomainEventType.QUEST_COMPLETED},
+    'completed_quests': {DomainEventType.QUEST_COMPLETED},
+    'total_triggers': {DomainEventType.TRIGGER_CHANGED},
+    'active_triggers': {DomainEventType.TRIGGER_CHANGED},
+}
+
+
+def metric_dependencies(metrics: Iterable[str]) -> Set[DomainEventType]:
+    """Domain events that can change any of the given metrics"""
+    return set().union(*(METRIC_DEPENDENCIES.get(m, ()) for m in metrics))
+
+
+class DependencyIndex:
+    """Which triggers depend on which domain event types"""
+
+    def __init__(self):
+        self._by_event: Dict[str, Set[str]] = {}
+        self._by_trigger: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_trigger)
+
+    def add(self, trigger_id: str, event_types: Iterable[str]):
+        with self._lock:
+            self._remove(trigger_id)
+            event_types = {str(t) for t in event_types}
+            if not event_types:
+                return
+            self._by_trigger[trigger_id] = event_types
+            for event_type in event_types:
+                self._by_event.setdefault(event_type, set()).add(trigger_id)
+
+    def _remove(self, trigger_id: str):
+        for event_type in self._by_trigger.pop(trigger_id, ()):
+            dependents = self._by_event.get(event_type)
+            if dependents is not None:
+                dependents.discard(trigger_id)
+                if not dependents:
+                    del self._by_event[event_type]
+
+    def remove(self, trigger_id: str):
+        with self._lock:
+            self._remove(trigger_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_event.clear()
+            self._by_trigger.clear()
+
+    def affected(self, event_type: str) -> List[str]:
+        """Trigger ids to re-evaluate after an event of this type"""
+        with self._lock:
+            return list(self._by_event.get(str(event_type), ()))
+
+
+class EventBus:
+    """Delivers domain events to subscribers on the daemon's event loop
+
+    publish() may be called from any thread. Events published while no loop is running
+    the bus are dropped; the daemon evaluates every condition trigger when it starts.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, event_type: str, handler: Callable[[DomainEvent], Any]):
+        """Register a sync or async handler for an event type"""
+        self._handlers.setdefault(str(event_type), []).append(handler)
+
+    def publish(self, event: DomainEvent):
+        loop, queue = self._loop, self._queue
+        if loop is None or queue is None or loop.is_closed():
+            self.dropped += 1
+            return
+        self.published += 1
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            self.dropped += 1
+
+    async def run(self):
+        """Dispatch events to their handlers until cancelled"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        try:
+            while True:
+                event = await self._queue.get()
+                for handler in self._handlers.get(str(event.type), ()):
+                    try:
+                        result = handler(event)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        logger.error(f"Error handling {event.type} event: {e}")
+        finally:
+            self._loop = None
+            self._queue = None
@@ -0,0 +1,186 @@
+"""
+Event Store - Cached, indexed view of external events for event triggers
+events.json is parsed only when it changes, and events.jsonl is tailed as records are appended.
+Events are indexed by type so trigger checks are lookups instead of scans.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _event_time(event: Dict) -> Optional[float]:
+    """Epoch seconds of an event's timestamp, or None if it has no usable timestamp"""
+    timestamp = event.get('timestamp')
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class EventTypeIndex:
+    """Count and sorted timestamps for one event type"""
+
+    __slots__ = ('untimed', 'times')
+
+    def __init__(self):
+        self.untimed = 0
+        self.times: List[float] = []
+
+    def add(self, when: Optional[float]):
+        if when is None:
+            self.untimed += 1
+        elif not self.times or when >= self.times[-1]:
+            self.times.append(when)
+        else:
+            bisect.insort(self.times, when)
+
+    def expire(self, cutoff: float):
+        drop = bisect.bisect_left(self.times, cutoff)
+        if drop:
+            del self.times[:drop]
+
+    def count(self, since: Optional[float] = None) -> int:
+        if since is None:
+            return self.untimed + len(self.times)
+        return len(self.times) - bisect.bisect_left(self.times, since)
+
+
+class EventStore:
+    """Indexes events.json / events.jsonl by type and reloads only on change"""
+
+    def __init__(self, path: Path, retention_seconds: Optional[float] = None,
+                 check_interval: float = 1.0):
+        self.path = Path(path)
+        self.jsonl_path = self.path.with_suffix('.jsonl')
+        self.retention_seconds = retention_seconds
+        self.check_interval = check_interval
+
+        self._index: Dict[str, EventTypeIndex] = {}
+        self._json_signature: Optional[Tuple[int, int]] = None
+        self._jsonl_signature: Optional[Tuple[int, int]] = None
+        self._jsonl_offset = 0
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _add(self, event: Dict):
+        if not isinstance(event, dict):
+            return
+        when = _event_time(event)
+        if when is not None and self.retention_seconds and when < time.time() - self.retention_seconds:
+            return
+        self._index.setdefault(event.get('type'), EventTypeIndex()).add(when)
+
+    def _load_json(self):
+        with open(self.path, 'r') as f:
+            events = json.load(f)
+        for event in events:
+            self._add(event)
+
+    def _tail_jsonl(self):
+        """Index records appended to events.jsonl since the last read"""
+        with open(self.jsonl_path, 'r') as f:
+            f.seek(self._jsonl_offset)
+            while True:
+                line = f.readline()
+                if not line.endswith('\n'):
+                    # Leave a partially written record for the next refresh
+                    break
+                self._jsonl_offset = f.tell()
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._add(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable event record in {self.jsonl_path.name}")
+
+    def _rebuild(self, json_sig, jsonl_sig):
+        """Re-index both files; on failure the previous index is kept"""
+        previous = self._index, self._jsonl_offset
+        self._index = {}
+        self._jsonl_offset = 0
+        try:
+            if json_sig:
+                self._load_json()
+            if jsonl_sig:
+                self._tail_jsonl()
+        except Exception:
+            self._index, self._jsonl_offset = previous
+            raise
+        total = sum(idx.count() for idx in self._index.values())
+        logger.info(f"Indexed {total} events across {len(self._index)} types")
+
+    def refresh(self, force: bool = False):
+        """Pick up changes to the event files, at most once per check_interval"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            self._last_check = now
+            json_sig = self._signature(self.path)
+            jsonl_sig = self._signature(self.jsonl_path)
+
+            try:
+                jsonl_appended = (
+                    self._jsonl_signature is not None and jsonl_sig is not None
+                    and jsonl_sig[1] >= self._jsonl_signature[1]
+                )
+                if json_sig != self._json_signature or (jsonl_sig != self._jsonl_signature and not jsonl_appended):
+                    self._rebuild(json_sig, jsonl_sig)
+                elif jsonl_sig != self._jsonl_signature:
+                    self._tail_jsonl()
+                # Only a successful read counts as seen, so a failed one is retried next time
+                self._json_signature = json_sig
+                self._jsonl_signature = jsonl_sig
+            except Exception as e:
+                logger.error(f"Error reading events: {e}")
+
+            if self.retention_seconds:
+                cutoff = time.time() - self.retention_seconds
+                for idx in self._index.values():
+                    idx.expire(cutoff)
+
+    def count(self, event_type: str, within_seconds: Optional[float] = None) -> int:
+        """Number of retained events of a type, optionally only those in the last within_seconds"""
+        self.refresh()
+        idx = self._index.get(event_type)
+        if idx is None:
+            return 0
+        since = time.time() - within_seconds if within_seconds else None
+        return idx.count(since)
+
+    def latest(self, event_type: str) -> Optional[datetime]:
+        """Timestamp of the newest event of a type"""
+        self.refresh()
+        idx = self._index.get(event_type)
+        if idx is None or not idx.times:
+            return None
+        return datetime.fromtimestamp(idx.times[-1])
+
+    def summary(self) -> Dict[str, int]:
+        """Event counts by type"""
+        self.refresh()
+        return {event_type: idx.count() for event_type, idx in self._index.items()}
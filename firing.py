@@ -0,0 +1,94 @@
+"""
+Firing - Per-trigger firing semantics
+Decides whether a trigger whose condition holds should actually execute its action, based on
+the trigger's firing policy and its persisted firing state.
+
+Policy (Trigger.firing):
+    mode              'rising_edge' (default): fire when the condition becomes true, then re-arm
+                      only after it goes false again
+                      'level': fire every time the condition is found true
+                      'once': fire a single time, ever
+    cooldown_seconds  minimum time between firings
+    max_fires         at most this many firings per window_seconds (default 3600); 0 never fires
+    hysteresis        for threshold conditions, re-arm only once the observed value drops to
+                      threshold - hysteresis (or, for a '<'/'<=' condition, rises to
+                      threshold + hysteresis), so a value hovering at the threshold fires once
+
+Time triggers default to 'level', since each scheduled run is already a discrete event.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from conditions import ConditionError
+
+FIRING_MODES = ('rising_edge', 'level', 'once')
+
+
+class FiringPolicy:
+    """Parsed Trigger.firing settings"""
+
+    __slots__ = ('mode', 'cooldown', 'max_fires', 'window', 'hysteresis')
+
+    def __init__(self, firing: Optional[Dict] = None, default_mode: str = 'rising_edge'):
+        firing = firing or {}
+        self.mode = firing.get('mode', default_mode)
+        if self.mode not in FIRING_MODES:
+            raise ValueError(f"Unknown firing mode '{self.mode}', expected one of {', '.join(FIRING_MODES)}")
+        self.cooldown = float(firing.get('cooldown_seconds', 0) or 0)
+        self.max_fires = int(firing['max_fires']) if firing.get('max_fires') is not None else None
+        if self.max_fires is not None and self.max_fires < 0:
+            raise ConditionError(f"max_fires must not be negative, got {self.max_fires}")
+        self.window = float(firing.get('window_seconds', 3600) or 3600)
+        self.hysteresis = float(firing['hysteresis']) if firing.get('hysteresis') else None
+
+
+def evaluate_firing(policy: FiringPolicy, state: Dict, met: bool, now: float,
+                    value: Optional[float] = None, threshold: Optional[float] = None,
+                    direction: int = 1) -> Tuple[bool, bool]:
+    """Apply a policy to one condition evaluation
+
+    direction is 1 for a condition that holds above its threshold and -1 for one that holds
+    below it.
+
+    Updates state in place and returns (fire, state_changed). A firing that is held back by
+    cooldown or max_fires leaves the trigger armed, so it fires once the limit clears if the
+    condition still holds.
+    """
+    changed = False
+    armed = state.get('armed', True)
+
+    if not met:
+        if policy.hysteresis is None or value is None or threshold is None:
+            rearm = True
+        elif direction < 0:
+            rearm = value >= threshold + policy.hysteresis
+        else:
+            rearm = value <= threshold - policy.hysteresis
+        if rearm and not armed:
+            state['armed'] = True
+            changed = True
+        return False, changed
+
+    if policy.mode == 'once' and state.get('fire_count', 0) > 0:
+        return False, changed
+    if policy.mode == 'rising_edge' and not armed:
+        return False, changed
+
+    last_fired = state.get('last_fired')
+    if policy.cooldown and last_fired is not None and now - last_fired < policy.cooldown:
+        return False, changed
+
+    recent = [t for t in state.get('recent', ()) if now - t < policy.window]
+    if policy.max_fires is not None and len(recent) >= policy.max_fires:
+        if len(recent) != len(state.get('recent', ())):
+            state['recent'] = recent
+            changed = True
+        return False, changed
+
+    if policy.max_fires is not None:
+        recent.append(now)
+        state['recent'] = recent[-policy.max_fires:]
+    state['armed'] = False
+    state['last_fired'] = now
+    state['fire_count'] = state.get('fire_count', 0) + 1
+    return True, True
@@ -0,0 +1,83 @@
+"""
+HTTP Pool - Long-lived pooled async HTTP clients with connection reuse metrics
+The AI provider SDKs and the web_scrape fetcher each hold one pooled client per event loop,
+so requests share keep-alive connections instead of paying a TCP/TLS handshake every time.
+ConnectionStats counts how many requests opened a new connection and how many reused one.
+"""
+
+import os
+from typing import Any, Dict
+
+import httpx
+
+
+class ConnectionStats:
+    """Request and connection counts for one pooled client"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    async def on_request(self, request: httpx.Request):
+        self.requests += 1
+        # httpcore reports connection setup through the trace extension
+        request.extensions['trace'] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == 'connection.connect_tcp.started':
+            self.new_connections += 1
+        elif event_name == 'connection.start_tls.started':
+            self.tls_handshakes += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': reused,
+            'tls_handshakes': self.tls_handshakes,
+            'reuse_rate': round(reused / self.requests, 3) if self.requests else 0.0
+        }
+
+
+class PoolConfig:
+    """Pool size, keep-alive and timeouts for a family of clients"""
+
+    def __init__(self, max_connections: int = 20, max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                 timeout: float = 60.0, connect_timeout: float = 10.0):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> 'PoolConfig':
+        """Read <prefix>_POOL_MAX_CONNECTIONS, _POOL_MAX_KEEPALIVE, _KEEPALIVE_EXPIRY, _TIMEOUT, _CONNECT_TIMEOUT"""
+        config = cls(**defaults)
+        return cls(
+            max_connections=int(os.getenv(f'{prefix}_POOL_MAX_CONNECTIONS', config.max_connections)),
+            max_keepalive=int(os.getenv(f'{prefix}_POOL_MAX_KEEPALIVE', config.max_keepalive)),
+            keepalive_expiry=float(os.getenv(f'{prefix}_KEEPALIVE_EXPIRY', config.keepalive_expiry)),
+            timeout=float(os.getenv(f'{prefix}_TIMEOUT', config.timeout)),
+            connect_timeout=float(os.getenv(f'{prefix}_CONNECT_TIMEOUT', config.connect_timeout))
+        )
+
+    @property
+    def httpx_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+def pooled_client(config: PoolConfig, stats: ConnectionStats, **kwargs) -> httpx.AsyncClient:
+    """Async HTTP client with the configured pool whose requests are counted in stats"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive,
+            keepalive_expiry=config.keepalive_expiry
+        ),
+        timeout=config.httpx_timeout,
+        event_hooks={'request': [stats.on_request]},
+        **kwargs
+    )
@@ -0,0 +1,148 @@
+"""
+Leaderboard - Order-statistic index of operatives by standing
+An indexable skip list keeps operatives sorted by (rank, reputation) so top-K pages,
+arbitrary pages and an operative's own position are all O(log n).
+"""
+
+import math
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_LEVELS = 32
+
+# Sort key: highest rank, then highest reputation, then operative id for a stable order
+StandingKey = Tuple[int, int, str]
+
+
+class _End:
+    """Sentinel that sorts after every key"""
+
+    def __lt__(self, other) -> bool:
+        return False
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, next_nodes: list, widths: list):
+        self.key = key
+        self.next = next_nodes
+        self.width = widths
+
+
+_NIL = _Node(_End(), [], [])
+
+
+class LeaderboardIndex:
+    """Indexable skip list of operatives ordered by rank and reputation, highest first"""
+
+    def __init__(self, standings: Iterable[Tuple[str, int, int]] = ()):
+        self._head = _Node(None, [_NIL] * MAX_LEVELS, [1] * MAX_LEVELS)
+        self._keys: Dict[str, StandingKey] = {}
+        self._lock = threading.Lock()
+        for operative_id, rank, reputation in standings:
+            self.update(operative_id, rank, reputation)
+
+    @staticmethod
+    def _key(operative_id: str, rank: int, reputation: int) -> StandingKey:
+        return (-rank, -reputation, operative_id)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, operative_id: str) -> bool:
+        return operative_id in self._keys
+
+    def _insert(self, key: StandingKey):
+        chain = [None] * MAX_LEVELS
+        steps_at_level = [0] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = min(MAX_LEVELS, 1 - int(math.log(1.0 - random.random(), 2.0)))
+        new_node = _Node(key, [None] * height, [None] * height)
+        steps = 0
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, MAX_LEVELS):
+            chain[level].width[level] += 1
+
+    def _remove(self, key: StandingKey):
+        chain = [None] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is _NIL or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+
+    def _node_at(self, index: int) -> _Node:
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def update(self, operative_id: str, rank: int, reputation: int):
+        """Insert an operative or move it to its new standing"""
+        key = self._key(operative_id, rank, reputation)
+        with self._lock:
+            old = self._keys.get(operative_id)
+            if old == key:
+                return
+            if old is not None:
+                self._remove(old)
+            self._insert(key)
+            self._keys[operative_id] = key
+
+    def remove(self, operative_id: str):
+        with self._lock:
+            key = self._keys.pop(operative_id)
+            self._remove(key)
+
+    def position(self, operative_id: str) -> Optional[int]:
+        """Zero-based leaderboard position of an operative"""
+        with self._lock:
+            key = self._keys.get(operative_id)
+            if key is None:
+                return None
+            node = self._head
+            position = 0
+            for level in reversed(range(MAX_LEVELS)):
+                while node.next[level].key < key:
+                    position += node.width[level]
+                    node = node.next[level]
+            return position
+
+    def page(self, offset: int = 0, limit: int = 10) -> List[str]:
+        """Operative ids at positions offset .. offset + limit - 1"""
+        with self._lock:
+            if offset < 0 or offset >= len(self._keys) or limit <= 0:
+                return []
+            node = self._node_at(offset)
+            result = []
+            while node is not _NIL and len(result) < limit:
+                result.append(node.key[2])
+                node = node.next[0]
+            return result
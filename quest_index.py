@@ -0,0 +1,94 @@
+"""
+Quest Index - Secondary indexes over quests for per-operative listings
+Available quests are bucketed by required rank, active and completed quests by operative,
+so an operative's quest board is assembled without scanning every quest.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from records import QuestStatus
+
+# Per-quest index entry: (status, min_rank, assigned_to)
+QuestEntry = Tuple[str, int, Optional[str]]
+
+
+class QuestIndex:
+    """Quest ids by status, keyed by min_rank for available quests and by operative otherwise"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int, Optional[str]]] = ()):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, QuestEntry] = {}
+        # Dicts used as insertion-ordered sets
+        self.available_by_rank: Dict[int, Dict[str, None]] = {}
+        self.active_by_operative: Dict[str, Dict[str, None]] = {}
+        self.completed_by_operative: Dict[str, Dict[str, None]] = {}
+        for quest_id, status, min_rank, assigned_to in entries:
+            self.update(quest_id, status, min_rank, assigned_to)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bucket(self, entry: QuestEntry, create: bool = False) -> Optional[Dict[str, None]]:
+        status, min_rank, assigned_to = entry
+        if status == QuestStatus.AVAILABLE:
+            buckets, key = self.available_by_rank, min_rank
+        elif status == QuestStatus.ACTIVE and assigned_to:
+            buckets, key = self.active_by_operative, assigned_to
+        elif status == QuestStatus.COMPLETED and assigned_to:
+            buckets, key = self.completed_by_operative, assigned_to
+        else:
+            return None
+        if create:
+            return buckets.setdefault(key, {})
+        return buckets.get(key)
+
+    def _discard(self, quest_id: str, entry: QuestEntry):
+        bucket = self._bucket(entry)
+        if bucket is not None:
+            bucket.pop(quest_id, None)
+            if not bucket:
+                status, min_rank, assigned_to = entry
+                if status == QuestStatus.AVAILABLE:
+                    self.available_by_rank.pop(min_rank, None)
+                elif status == QuestStatus.ACTIVE:
+                    self.active_by_operative.pop(assigned_to, None)
+                else:
+                    self.completed_by_operative.pop(assigned_to, None)
+
+    def update(self, quest_id: str, status: str, min_rank: int, assigned_to: Optional[str]):
+        """Add a quest or move it to the buckets for its current status"""
+        entry = (str(status), min_rank, assigned_to)
+        with self._lock:
+            old = self._entries.get(quest_id)
+            if old == entry:
+                return
+            if old is not None:
+                self._discard(quest_id, old)
+            self._entries[quest_id] = entry
+            bucket = self._bucket(entry, create=True)
+            if bucket is not None:
+                bucket[quest_id] = None
+
+    def remove(self, quest_id: str):
+        with self._lock:
+            old = self._entries.pop(quest_id, None)
+            if old is not None:
+                self._discard(quest_id, old)
+
+    def available(self, max_min_rank: int) -> List[str]:
+        """Available quest ids requiring at most the given rank, lowest requirement first"""
+        with self._lock:
+            return [
+                quest_id
+                for rank in sorted(r for r in self.available_by_rank if r <= max_min_rank)
+                for quest_id in self.available_by_rank[rank]
+            ]
+
+    def active(self, operative_id: str) -> List[str]:
+        with self._lock:
+            return list(self.active_by_operative.get(operative_id, ()))
+
+    def completed(self, operative_id: str) -> List[str]:
+        with self._lock:
+            return list(self.completed_by_operative.get(operative_id, ()))
@@ -0,0 +1,210 @@
+"""
+Rate Limit - Per-provider request and token budgets for AI calls
+Each provider gets two token buckets, one for requests per minute and one for tokens per minute.
+A call reserves its estimated tokens (prompt plus max_tokens) before it is sent, and the
+reservation is corrected to the usage the provider reports. A 429 or overloaded response
+pauses the provider for its Retry-After and slows its refill rate, which recovers gradually
+as calls succeed again; the call itself is retried instead of being dropped.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Rate-limited or overloaded: slow the provider down
+THROTTLE_STATUSES = {429, 503, 529}
+# Worth retrying as is
+TRANSIENT_STATUSES = {408, 409, 500, 502, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt, about four characters per token"""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Capacity refilled continuously at rate_per_minute, scaled by a slowdown factor"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, factor: float):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * factor)
+        self.updated = now
+
+    def time_until(self, amount: float, factor: float = 1.0) -> float:
+        """Seconds until amount is available; 0 if it is now"""
+        self._refill(factor)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.rate * factor)
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Return unused capacity (delta > 0) or charge for overuse (delta < 0)"""
+        self.level = min(self.capacity, self.level + delta)
+
+
+class RateLimiter:
+    """Request and token budgets of one provider, with adaptive slowdown on throttling"""
+
+    def __init__(self, name: str, requests_per_minute: float = 50, tokens_per_minute: float = 80000,
+                 max_retries: int = 3, retry_backoff: float = 2.0, min_factor: float = 0.1,
+                 window: int = 500):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max(max_retries, 0)
+        self.retry_backoff = retry_backoff
+        self.min_factor = min_factor
+        # Refill rate multiplier: halved by each throttled response, recovered by successes
+        self.factor = 1.0
+        self.paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.counts = {'calls': 0, 'attempts': 0, 'throttled': 0, 'retried': 0, 'failed': 0,
+                       'tokens_reserved': 0, 'tokens_used': 0}
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, **defaults) -> 'RateLimiter':
+        """Read <prefix>_RPM, <prefix>_TPM (0 = unlimited), AI_MAX_RETRIES and AI_RETRY_BACKOFF"""
+        limiter = cls(name, **defaults)
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(f'{prefix}_RPM', limiter.requests_per_minute)),
+            tokens_per_minute=float(os.getenv(f'{prefix}_TPM', limiter.tokens_per_minute)),
+            max_retries=int(os.getenv('AI_MAX_RETRIES', limiter.max_retries)),
+            retry_backoff=float(os.getenv('AI_RETRY_BACKOFF', limiter.retry_backoff))
+        )
+
+    def bind_loop(self):
+        """Fresh lock for the running event loop"""
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until the provider may take one more request of estimated_tokens"""
+        if self._lock is None:
+            self.bind_loop()
+        # One waiter at a time, so reservations are granted in arrival order
+        async with self._lock:
+            while True:
+                delay = max(self.paused_until - time.monotonic(), 0.0)
+                if self.requests:
+                    delay = max(delay, self.requests.time_until(1, self.factor))
+                if self.tokens:
+                    delay = max(delay, self.tokens.time_until(estimated_tokens, self.factor))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(estimated_tokens)
+            self.counts['tokens_reserved'] += estimated_tokens
+
+    def record_usage(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Correct a reservation to the tokens the provider actually counted"""
+        if used_tokens is None:
+            return
+        self.counts['tokens_used'] += used_tokens
+        if self.tokens:
+            self.tokens.adjust(min(estimated_tokens, self.tokens.capacity) - used_tokens)
+
+    def throttled(self, retry_after: Optional[float], attempt: int):
+        """Pause and slow down after a 429 or overloaded response"""
+        self.counts['throttled'] += 1
+        self.factor = max(self.factor / 2, self.min_factor)
+        delay = retry_after if retry_after is not None else self.retry_backoff * 2 ** attempt
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        logger.warning(f"{self.name} rate limited; pausing {delay:.1f}s, refill at {self.factor:.0%}")
+
+    def succeeded(self):
+        self.factor = min(self.factor + 0.05, 1.0)
+
+    async def call(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int,
+                   concurrency: asyncio.Semaphore, usage: Callable[[Any], Optional[int]],
+                   transient: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Run request within the provider's budgets and the global concurrency limit
+
+        Throttled and transient failures are retried up to max_retries times; anything else,
+        or the last failure, is raised to the caller.
+        """
+        self.counts['calls'] += 1
+        queued = time.monotonic()
+        attempt = 0
+        while True:
+            await self.acquire(estimated_tokens)
+            async with concurrency:
+                if attempt == 0:
+                    self._waits.append(time.monotonic() - queued)
+                self.counts['attempts'] += 1
+                try:
+                    response = await request()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    status = getattr(e, 'status_code', None)
+                    # A failed request still used its request slot but no tokens
+                    self.record_usage(estimated_tokens, 0)
+                    if attempt >= self.max_retries or not (
+                        status in THROTTLE_STATUSES or status in TRANSIENT_STATUSES or isinstance(e, transient)
+                    ):
+                        self.counts['failed'] += 1
+                        raise
+                    if status in THROTTLE_STATUSES:
+                        self.throttled(retry_after_seconds(e), attempt)
+                    else:
+                        self.paused_until = max(self.paused_until,
+                                                time.monotonic() + self.retry_backoff * 2 ** attempt)
+                    attempt += 1
+                    self.counts['retried'] += 1
+                    continue
+            try:
+                used = usage(response)
+            except Exception:
+                used = None
+            self.record_usage(estimated_tokens, used)
+            self.succeeded()
+            return response
+
+    def as_dict(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            **self.counts,
+            'requests_per_minute': self.requests_per_minute or None,
+            'tokens_per_minute': self.tokens_per_minute or None,
+            'rate_factor': round(self.factor, 3),
+            'paused_for': round(max(self.paused_until - time.monotonic(), 0.0), 2),
+            'mean_wait': round(sum(waits) / len(waits), 3) if waits else 0.0,
+            'p95_wait': round(waits[min(int(len(waits) * 0.95), len(waits) - 1)], 3) if waits else 0.0,
+            'max_wait': round(waits[-1], 3) if waits else 0.0
+        }
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay a throttled response asked for in its Retry-After header, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
@@ -0,0 +1,123 @@
+"""
+Records - Compact building blocks for the daemon data models
+Interned enums for repeated status/type strings, integer handles for quest-id references,
+and serialization of slotted model instances back to plain JSON-ready dicts.
+"""
+
+import sys
+import threading
+from array import array
+from dataclasses import fields
+from enum import StrEnum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Union
+
+
+class QuestStatus(StrEnum):
+    AVAILABLE = 'available'
+    ACTIVE = 'active'
+    COMPLETED = 'completed'
+
+
+class TriggerType(StrEnum):
+    TIME = 'time'
+    EVENT = 'event'
+    CONDITION = 'condition'
+    WEB_SCRAPE = 'web_scrape'
+    AI_DECISION = 'ai_decision'
+
+
+def intern_enum(enum_cls: Type[StrEnum], value: Any) -> Union[StrEnum, str]:
+    """Map a string to its shared enum member, interning values the enum doesn't know"""
+    if isinstance(value, enum_cls) or not isinstance(value, str):
+        return value
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return sys.intern(value)
+
+
+class HandleRegistry:
+    """Assigns a small integer handle to each id string so references can be stored in arrays"""
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._handles: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, key: str) -> int:
+        handle = self._handles.get(key)
+        if handle is None:
+            with self._lock:
+                handle = self._handles.get(key)
+                if handle is None:
+                    handle = len(self._ids)
+                    self._ids.append(key)
+                    self._handles[key] = handle
+        return handle
+
+    def lookup(self, key: str) -> Optional[int]:
+        return self._handles.get(key)
+
+    def key(self, handle: int) -> str:
+        return self._ids[handle]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+QUEST_HANDLES = HandleRegistry()
+
+
+class QuestRefs:
+    """List-like sequence of quest ids stored as 4-byte handles"""
+
+    __slots__ = ('_handles',)
+
+    def __init__(self, quest_ids: Iterable[str] = ()):
+        self._handles = array('I', (QUEST_HANDLES.handle(q) for q in quest_ids))
+
+    def append(self, quest_id: str):
+        self._handles.append(QUEST_HANDLES.handle(quest_id))
+
+    def __iter__(self) -> Iterator[str]:
+        key = QUEST_HANDLES.key
+        return (key(h) for h in self._handles)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, quest_id: object) -> bool:
+        handle = QUEST_HANDLES.lookup(quest_id) if isinstance(quest_id, str) else None
+        return handle is not None and handle in self._handles
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [QUEST_HANDLES.key(h) for h in self._handles[index]]
+        return QUEST_HANDLES.key(self._handles[index])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, QuestRefs):
+            return self._handles == other._handles
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __deepcopy__(self, memo) -> List[str]:
+        # dataclasses.asdict deep-copies unknown types; hand it a plain list instead
+        return list(self)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, QuestRefs):
+        return list(value)
+    if isinstance(value, StrEnum):
+        return value.value
+    return value
+
+
+def record_to_dict(obj: Any) -> Dict[str, Any]:
+    """Plain dict of a model instance for JSON serialization (no deep copy)"""
+    return {f.name: _plain(getattr(obj, f.name)) for f in fields(obj)}
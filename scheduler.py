@@ -0,0 +1,380 @@
+"""
+Scheduler - Deadline scheduling for time triggers
+Each time trigger's next fire time is computed from a cron or interval expression in its
+time zone and kept in a min-heap, so the daemon sleeps until the earliest deadline instead
+of polling every trigger on every tick.
+
+Time trigger conditions:
+    {"time": "09:00"}                       daily at 09:00 (legacy form)
+    {"cron": "*/15 9-17 * * MON-FRI"}       five-field cron, or @hourly/@daily/@weekly/@monthly/@yearly
+    {"interval": 300} / {"interval": "1h30m"}
+    optional: "timezone": "Europe/Berlin", "missed": "skip" | "once" | "catch_up",
+              "misfire_grace_seconds": 60, "max_catch_up": 10
+"""
+
+import os
+import re
+import time
+import asyncio
+import heapq
+import threading
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+MISSED_POLICIES = ('skip', 'once', 'catch_up')
+
+CRON_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'])}
+DAY_NAMES = {name: i for i, name in enumerate(['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT'])}
+
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Upper bound on wall-clock steps when searching for the next cron match (covers leap days)
+MAX_CRON_STEPS = 50000
+
+
+class ScheduleError(ValueError):
+    """Raised for a time trigger condition that cannot be scheduled"""
+
+
+def _parse_cron_field(field: str, low: int, high: int, names: Dict[str, int]) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.upper().split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ScheduleError(f"Invalid cron step '{step_text}'")
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        else:
+            bounds = [names.get(b, b) for b in part.split('-', 1)]
+            try:
+                start = int(bounds[0])
+                end = int(bounds[1]) if len(bounds) == 2 else (high if step > 1 else start)
+            except ValueError:
+                raise ScheduleError(f"Invalid cron value '{part}'")
+        if start < low or end > high or start > end:
+            raise ScheduleError(f"Cron value '{part}' outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = CRON_MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression needs 5 fields: '{expression}'")
+        self.minutes = _parse_cron_field(fields[0], 0, 59, {})
+        self.hours = _parse_cron_field(fields[1], 0, 23, {})
+        self.days = _parse_cron_field(fields[2], 1, 31, {})
+        self.months = _parse_cron_field(fields[3], 1, 12, MONTH_NAMES)
+        # 7 is accepted as Sunday
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7, DAY_NAMES)}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def _day_matches(self, wall: datetime) -> bool:
+        day_ok = wall.day in self.days
+        weekday_ok = (wall.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: when both day fields are restricted, either may match
+        if not self.any_day and not self.any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching time strictly after moment, in moment's time zone"""
+        tz = moment.tzinfo
+        wall = moment.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(MAX_CRON_STEPS):
+            if wall.month not in self.months:
+                wall = (wall.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(wall):
+                wall = wall.replace(hour=0, minute=0) + timedelta(days=1)
+            elif wall.hour not in self.hours:
+                wall = wall.replace(minute=0) + timedelta(hours=1)
+            elif wall.minute not in self.minutes:
+                wall += timedelta(minutes=1)
+            else:
+                candidate = wall.replace(tzinfo=tz)
+                if candidate.timestamp() > moment.timestamp():
+                    return candidate
+                # Repeated wall-clock hour after a DST change
+                wall += timedelta(minutes=1)
+        raise ScheduleError(f"Cron expression never matches: '{self.expression}'")
+
+
+class IntervalSchedule:
+    """Fixed period in seconds"""
+
+    def __init__(self, interval):
+        if isinstance(interval, str):
+            parts = re.findall(r'(\d+(?:\.\d+)?)\s*([smhdw])', interval.lower())
+            if not parts or re.sub(r'[\d.\s smhdw]', '', interval.lower()):
+                raise ScheduleError(f"Invalid interval '{interval}'")
+            seconds = sum(float(n) * INTERVAL_UNITS[u] for n, u in parts)
+        else:
+            try:
+                seconds = float(interval)
+            except (TypeError, ValueError):
+                raise ScheduleError(f"Invalid interval '{interval}'")
+        if seconds <= 0:
+            raise ScheduleError(f"Interval must be positive: '{interval}'")
+        self.period = timedelta(seconds=seconds)
+
+    def next_after(self, moment: datetime) -> datetime:
+        # Add elapsed time in UTC: aware datetime arithmetic is wall-clock and would
+        # stretch or swallow a period across a DST change
+        return (moment.astimezone(timezone.utc) + self.period).astimezone(moment.tzinfo)
+
+
+def default_timezone() -> tzinfo:
+    name = os.getenv('DAEMON_TIMEZONE')
+    if name:
+        return load_timezone(name)
+    return local_timezone()
+
+
+@lru_cache(maxsize=None)
+def local_timezone() -> tzinfo:
+    """The host's time zone with its DST rules, not just the UTC offset in effect right now"""
+    names = []
+    tz_env = os.getenv('TZ', '').lstrip(':')
+    if tz_env:
+        names.append(tz_env)
+    target = os.path.realpath('/etc/localtime')
+    if '/zoneinfo/' in target:
+        names.append(target.split('/zoneinfo/', 1)[1])
+    try:
+        with open('/etc/timezone') as f:
+            names.append(f.read().strip())
+    except OSError:
+        pass
+    for name in names:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    try:
+        with open('/etc/localtime', 'rb') as f:
+            return ZoneInfo.from_file(f, key='localtime')
+    except (OSError, ValueError):
+        return LocalTimezone()
+
+
+class LocalTimezone(tzinfo):
+    """The C library's local time, for hosts without a time zone database"""
+
+    def _local(self, dt: datetime) -> time.struct_time:
+        stamp = time.mktime((dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday(), 0, -1))
+        return time.localtime(stamp)
+
+    def utcoffset(self, dt: datetime) -> timedelta:
+        return timedelta(seconds=self._local(dt).tm_gmtoff)
+
+    def dst(self, dt: datetime) -> timedelta:
+        return timedelta(hours=1) if self._local(dt).tm_isdst > 0 else timedelta(0)
+
+    def tzname(self, dt: datetime) -> str:
+        return self._local(dt).tm_zone
+
+    def fromutc(self, dt: datetime) -> datetime:
+        stamp = (dt.replace(tzinfo=timezone.utc) - datetime(1970, 1, 1, tzinfo=timezone.utc)).total_seconds()
+        local = time.localtime(int(stamp // 1))
+        return datetime(*local[:6], dt.microsecond, tzinfo=self)
+
+
+def load_timezone(name: str) -> tzinfo:
+    if name.upper() == 'UTC':
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ScheduleError(f"Unknown time zone '{name}'")
+
+
+class TimeSpec:
+    """Parsed time trigger condition"""
+
+    __slots__ = ('schedule', 'tz', 'missed', 'grace', 'max_catch_up')
+
+    def __init__(self, condition: Dict):
+        if condition.get('cron'):
+            self.schedule = CronSchedule(str(condition['cron']))
+        elif condition.get('interval') is not None:
+            self.schedule = IntervalSchedule(condition['interval'])
+        elif condition.get('time'):
+            match = re.fullmatch(r'(\d{1,2}):(\d{2})', str(condition['time']).strip())
+            if not match:
+                raise ScheduleError(f"Invalid time '{condition['time']}', expected HH:MM")
+            self.schedule = CronSchedule(f"{int(match.group(2))} {int(match.group(1))} * * *")
+        else:
+            raise ScheduleError("Time trigger needs 'cron', 'interval' or 'time'")
+
+        self.tz = load_timezone(condition['timezone']) if condition.get('timezone') else default_timezone()
+        self.missed = condition.get('missed', 'skip')
+        if self.missed not in MISSED_POLICIES:
+            raise ScheduleError(f"Unknown missed-run policy '{self.missed}'")
+        self.grace = timedelta(seconds=float(condition.get('misfire_grace_seconds', 60)))
+        self.max_catch_up = max(int(condition.get('max_catch_up', 10)), 1)
+
+    def next_after(self, moment: datetime) -> datetime:
+        return self.schedule.next_after(moment.astimezone(self.tz))
+
+
+class _Entry:
+    __slots__ = ('spec', 'deadline', 'version')
+
+    def __init__(self, spec: TimeSpec, deadline: datetime, version: int):
+        self.spec = spec
+        self.deadline = deadline
+        self.version = version
+
+
+class TriggerScheduler:
+    """Min-heap of time trigger deadlines"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._entries: Dict[str, _Entry] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, trigger_id: str) -> bool:
+        return trigger_id in self._entries
+
+    def schedule(self, trigger_id: str, condition: Dict, next_run: Optional[str] = None,
+                 now: Optional[datetime] = None) -> datetime:
+        """(Re)schedule a trigger; a persisted next_run in the past is handled as a missed run"""
+        spec = TimeSpec(condition)
+        now = now or datetime.now(timezone.utc)
+        deadline = None
+        if next_run:
+            try:
+                deadline = datetime.fromisoformat(next_run)
+                if deadline.tzinfo is None:
+                    deadline = deadline.replace(tzinfo=spec.tz)
+            except ValueError:
+                deadline = None
+        if deadline is None:
+            deadline = spec.next_after(now)
+
+        with self._lock:
+            self._version += 1
+            self._entries[trigger_id] = _Entry(spec, deadline, self._version)
+            heapq.heappush(self._heap, (deadline.timestamp(), self._version, trigger_id))
+        self._notify()
+        return deadline
+
+    def unschedule(self, trigger_id: str):
+        # The heap entry is left behind and discarded when it surfaces
+        with self._lock:
+            self._entries.pop(trigger_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+
+    def _discard_stale(self):
+        while self._heap:
+            _, version, trigger_id = self._heap[0]
+            entry = self._entries.get(trigger_id)
+            if entry is not None and entry.version == version:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self) -> Optional[float]:
+        """Timestamp of the earliest scheduled run"""
+        with self._lock:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def due(self, now: Optional[datetime] = None) -> List[Tuple[str, int, datetime]]:
+        """Pop every trigger whose deadline has passed and reschedule it
+
+        Returns (trigger_id, runs, next_run) where runs is how many times to fire under the
+        trigger's missed-run policy: runs within misfire_grace_seconds always fire, older
+        runs are dropped ('skip'), coalesced into one ('once') or replayed up to
+        max_catch_up times ('catch_up').
+        """
+        now = now or datetime.now(timezone.utc)
+        results = []
+        with self._lock:
+            while True:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now.timestamp():
+                    break
+                _, _, trigger_id = heapq.heappop(self._heap)
+                entry = self._entries[trigger_id]
+                spec = entry.spec
+
+                missed = []
+                run = entry.deadline
+                while run <= now and len(missed) < spec.max_catch_up:
+                    missed.append(run)
+                    run = spec.next_after(run)
+                next_run = spec.next_after(now) if run <= now else run
+
+                if spec.missed == 'catch_up':
+                    runs = len(missed)
+                elif spec.missed == 'once':
+                    runs = 1
+                elif run > now:
+                    # The latest missed run is known; it fires if it is at most the grace late
+                    runs = 1 if now - missed[-1] <= spec.grace else 0
+                else:
+                    runs = 1 if spec.next_after(now - spec.grace) <= now else 0
+
+                self._version += 1
+                entry.deadline = next_run
+                entry.version = self._version
+                heapq.heappush(self._heap, (next_run.timestamp(), self._version, trigger_id))
+                results.append((trigger_id, runs, next_run))
+        return results
+
+    def _notify(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass
+
+    async def wait(self, max_sleep: Optional[float] = None):
+        """Sleep until the next deadline, or earlier if a trigger is scheduled meanwhile"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._loop = loop
+        self._wakeup.clear()
+
+        deadline = self.next_deadline()
+        timeout = None if deadline is None else max(deadline - datetime.now(timezone.utc).timestamp(), 0)
+        if max_sleep is not None:
+            timeout = max_sleep if timeout is None else min(timeout, max_sleep)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,107 @@
+"""
+Sharding - Lease-based trigger ownership for multi-process daemon workers
+Trigger ids hash onto a fixed ring of shards. Workers hold renewable leases on shards in a
+shared SQLite file, each taking a fair share of the live workers' total. When a worker dies
+its leases expire and the survivors pick its shards up on their next renewal.
+"""
+
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+LEASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (shard INTEGER PRIMARY KEY, owner TEXT, expires REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL);
+"""
+
+
+def shard_for(key: str, shards: int) -> int:
+    """Stable shard of a trigger id (unlike hash(), identical in every process)"""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+class ShardLeases:
+    """This worker's leases on the shard ring"""
+
+    def __init__(self, db_path: Path, worker_id: str, shards: int = 64, ttl: float = 6.0):
+        self.worker_id = worker_id
+        self.shards = shards
+        self.ttl = ttl
+        self.owned: FrozenSet[int] = frozenset()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(LEASE_SCHEMA)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO leases (shard) VALUES (?)", ((s,) for s in range(shards))
+        )
+
+    def owns(self, trigger_id: str) -> bool:
+        return shard_for(trigger_id, self.shards) in self.owned
+
+    def renew(self, now: Optional[float] = None) -> FrozenSet[int]:
+        """Heartbeat, extend held leases and rebalance toward a fair share of the ring"""
+        now = now or time.time()
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute(
+                    "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) "
+                    "ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                    (self.worker_id, now)
+                )
+                cur.execute("DELETE FROM workers WHERE heartbeat < ?", (now - self.ttl,))
+                live = cur.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+                target = math.ceil(self.shards / max(live, 1))
+
+                cur.execute(
+                    "UPDATE leases SET expires = ? WHERE owner = ? AND expires >= ?",
+                    (now + self.ttl, self.worker_id, now)
+                )
+                owned = [r[0] for r in cur.execute(
+                    "SELECT shard FROM leases WHERE owner = ? AND expires >= ? ORDER BY shard",
+                    (self.worker_id, now)
+                )]
+
+                if len(owned) > target:
+                    # Hand surplus shards back so newly started workers can take them
+                    surplus = owned[target:]
+                    cur.executemany("UPDATE leases SET owner = NULL, expires = 0 WHERE shard = ?",
+                                    ((s,) for s in surplus))
+                    owned = owned[:target]
+                elif len(owned) < target:
+                    free = [r[0] for r in cur.execute(
+                        "SELECT shard FROM leases WHERE owner IS NULL OR expires < ? ORDER BY shard LIMIT ?",
+                        (now, target - len(owned))
+                    )]
+                    cur.executemany("UPDATE leases SET owner = ?, expires = ? WHERE shard = ?",
+                                    ((self.worker_id, now + self.ttl, s) for s in free))
+                    owned.extend(free)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+        previous, self.owned = self.owned, frozenset(owned)
+        if self.owned != previous:
+            logger.info(f"Worker {self.worker_id} owns {len(self.owned)}/{self.shards} shards")
+        return self.owned
+
+    def release(self):
+        """Give up every lease so other workers take over without waiting for expiry"""
+        with self._lock:
+            self.conn.execute("UPDATE leases SET owner = NULL, expires = 0 WHERE owner = ?", (self.worker_id,))
+            self.conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+        self.owned = frozenset()
+
+    def close(self):
+        self.conn.close()
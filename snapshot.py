@@ -0,0 +1,274 @@
+"""
+Snapshot - Compact binary snapshot format for daemon state
+Records are stored length-prefixed with a sorted key index per collection, so a snapshot
+can be memory-mapped and its records decoded one at a time on first access.
+
+Layout (little-endian):
+    header:     MAGIC | version:u16 | collections:u16
+                per collection: name_len:u16 | name | count:u32 | index_offset:u64
+    records:    key_len:u16 | key | value (compact JSON)
+    index:      per collection, count entries of record_offset:u64 | record_length:u32, sorted by key
+
+Aggregate counters for the records are kept as the single record of a reserved _stats
+collection, so opening a snapshot never has to decode records to count them.
+"""
+
+import os
+import json
+import mmap
+import struct
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+
+from records import record_to_dict
+
+MAGIC = b'DMNSNAP\x00'
+VERSION = 1
+
+_HEADER = struct.Struct('<HH')
+_COLLECTION = struct.Struct('<IQ')
+_NAME_LEN = struct.Struct('<H')
+_INDEX_ENTRY = struct.Struct('<QI')
+_KEY_LEN = struct.Struct('<H')
+
+# Reserved collection holding the counters passed to write_snapshot
+STATS_COLLECTION = '_stats'
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or of an unknown version"""
+
+
+def encode_record(obj: Any) -> bytes:
+    return json.dumps(record_to_dict(obj), separators=(',', ':')).encode()
+
+
+def write_snapshot(path: Path, collections: Dict[str, Iterable[Tuple[str, bytes]]],
+                   stats: Optional[Dict[str, Any]] = None):
+    """Write (key, encoded value) pairs per collection, and optionally their counters, to path atomically"""
+    path = Path(path)
+    if stats is not None:
+        collections = dict(collections)
+        collections[STATS_COLLECTION] = [('network', json.dumps(stats, separators=(',', ':')).encode())]
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    names = [name.encode() for name in collections]
+    header_size = len(MAGIC) + _HEADER.size + sum(_NAME_LEN.size + len(n) + _COLLECTION.size for n in names)
+
+    entries = []
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\x00' * header_size)
+        for name, records in collections.items():
+            index = []
+            for key, value in sorted(records, key=lambda kv: kv[0]):
+                key_bytes = key.encode()
+                offset = f.tell()
+                f.write(_KEY_LEN.pack(len(key_bytes)))
+                f.write(key_bytes)
+                f.write(value)
+                index.append(_INDEX_ENTRY.pack(offset, f.tell() - offset))
+            index_offset = f.tell()
+            f.write(b''.join(index))
+            entries.append((len(index), index_offset))
+
+        f.seek(0)
+        f.write(MAGIC)
+        f.write(_HEADER.pack(VERSION, len(names)))
+        for name, (count, index_offset) in zip(names, entries):
+            f.write(_NAME_LEN.pack(len(name)))
+            f.write(name)
+            f.write(_COLLECTION.pack(count, index_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotReader:
+    """Memory-mapped, read-only access to a snapshot file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{self.path.name} is empty")
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise SnapshotError(f"{self.path.name} is not a daemon snapshot")
+        pos = len(MAGIC)
+        version, count = _HEADER.unpack_from(self._map, pos)
+        if version != VERSION:
+            self.close()
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+        pos += _HEADER.size
+
+        self.collections: Dict[str, Tuple[int, int]] = {}
+        for _ in range(count):
+            (name_len,) = _NAME_LEN.unpack_from(self._map, pos)
+            pos += _NAME_LEN.size
+            name = self._map[pos:pos + name_len].decode()
+            pos += name_len
+            self.collections[name] = _COLLECTION.unpack_from(self._map, pos)
+            pos += _COLLECTION.size
+
+    def count(self, collection: str) -> int:
+        return self.collections.get(collection, (0, 0))[0]
+
+    def _entry(self, collection: str, position: int) -> Tuple[str, int, int]:
+        """Key, value offset and value length of the record at an index position"""
+        index_offset = self.collections[collection][1]
+        offset, length = _INDEX_ENTRY.unpack_from(self._map, index_offset + position * _INDEX_ENTRY.size)
+        (key_len,) = _KEY_LEN.unpack_from(self._map, offset)
+        key_start = offset + _KEY_LEN.size
+        key = self._map[key_start:key_start + key_len].decode()
+        value_start = key_start + key_len
+        return key, value_start, offset + length - value_start
+
+    def find(self, collection: str, key: str) -> Optional[int]:
+        """Index position of a key, by binary search over the sorted index"""
+        lo, hi = 0, self.count(collection)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = self._entry(collection, mid)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def raw(self, collection: str, position: int) -> Tuple[str, bytes]:
+        key, start, length = self._entry(collection, position)
+        return key, self._map[start:start + length]
+
+    def get_raw(self, collection: str, key: str) -> Optional[bytes]:
+        position = self.find(collection, key)
+        if position is None:
+            return None
+        return self.raw(collection, position)[1]
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Counters stored with the snapshot, or None for a snapshot written without them"""
+        raw = self.get_raw(STATS_COLLECTION, 'network') if STATS_COLLECTION in self.collections else None
+        return json.loads(raw) if raw is not None else None
+
+    def keys(self, collection: str) -> Iterator[str]:
+        for position in range(self.count(collection)):
+            yield self._entry(collection, position)[0]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class SnapshotCollection(MutableMapping):
+    """Dict-like collection backed by a snapshot; records are decoded on first access"""
+
+    def __init__(self, collection: str, model: Type, reader: Optional[SnapshotReader] = None):
+        self.collection = collection
+        self.model = model
+        self.reader = reader
+        self._objects: Dict[str, Any] = {}
+        self._added: Set[str] = set()
+        self._deleted: Set[str] = set()
+
+    def _in_snapshot(self, key: str) -> bool:
+        return self.reader is not None and self.reader.find(self.collection, key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        obj = self._objects.get(key)
+        if obj is not None:
+            return obj
+        if key in self._deleted or self.reader is None:
+            raise KeyError(key)
+        raw = self.reader.get_raw(self.collection, key)
+        if raw is None:
+            raise KeyError(key)
+        obj = self.model(**json.loads(raw))
+        self._objects[key] = obj
+        return obj
+
+    def __setitem__(self, key: str, obj: Any):
+        if key not in self._objects and key not in self._deleted and not self._in_snapshot(key):
+            self._added.add(key)
+        self._deleted.discard(key)
+        self._objects[key] = obj
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._objects.pop(key, None)
+        if key in self._added:
+            self._added.discard(key)
+        else:
+            self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._objects:
+            return True
+        return key not in self._deleted and self._in_snapshot(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.reader is not None:
+            for key in self.reader.keys(self.collection):
+                if key not in self._deleted:
+                    yield key
+        yield from list(self._added)
+
+    def __len__(self) -> int:
+        base = self.reader.count(self.collection) if self.reader is not None else 0
+        return base - len(self._deleted) + len(self._added)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """All records, walking the index in order instead of searching per key"""
+        result = []
+        if self.reader is not None:
+            for position in range(self.reader.count(self.collection)):
+                key, raw = self.reader.raw(self.collection, position)
+                if key in self._deleted:
+                    continue
+                obj = self._objects.get(key)
+                if obj is None:
+                    obj = self.model(**json.loads(raw))
+                    self._objects[key] = obj
+                result.append((key, obj))
+        result.extend((key, self._objects[key]) for key in list(self._added))
+        return result
+
+    def values(self) -> List[Any]:
+        return [obj for _, obj in self.items()]
+
+    @property
+    def materialized(self) -> int:
+        return len(self._objects)
+
+    def overrides(self) -> Iterator[Tuple[str, Optional[Any], Optional[Any]]]:
+        """(key, snapshot record, current record) for every record decoded, added or deleted since loading
+
+        Either side is None where the record is absent, so counters kept for the
+        snapshot can be brought up to date without decoding untouched records.
+        """
+        for key in list(self._deleted):
+            yield key, self._decode(key), None
+        for key, obj in list(self._objects.items()):
+            yield key, None if key in self._added else self._decode(key), obj
+
+    def _decode(self, key: str) -> Optional[Any]:
+        raw = self.reader.get_raw(self.collection, key) if self.reader is not None else None
+        return self.model(**json.loads(raw)) if raw is not None else None
+
+    def encoded_items(self) -> Iterator[Tuple[str, bytes]]:
+        """Encoded records for writing a new snapshot; untouched records are copied without decoding"""
+        if self.reader is not None:
+            for position in range(self.reader.count(self.collection)):
+                key, raw = self.reader.raw(self.collection, position)
+                if key in self._deleted:
+                    continue
+                obj = self._objects.get(key)
+                yield key, encode_record(obj) if obj is not None else raw
+        for key in list(self._added):
+            yield key, encode_record(self._objects[key])
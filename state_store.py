@@ -0,0 +1,883 @@
+"""
+State Store - Persistence backends for the daemon core
+This module handles how triggers, quests and operatives are written to and restored from disk.
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from dataclasses import fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+from pathlib import Path
+from records import record_to_dict
+from snapshot import SnapshotCollection, SnapshotReader, write_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Collections persisted by every backend, in load order
+COLLECTIONS = ('triggers', 'quests', 'operatives')
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 2):
+    """Write JSON to a temp file and rename it over the target so readers never see a partial file"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_journal(path: Path) -> Iterator[Dict]:
+    """Yield journal entries, skipping a torn final line left by a crash"""
+    if not path.exists():
+        return
+    with open(path, 'r') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable journal entry {path.name}:{line_no}")
+
+
+def apply_journal_entry(raw: Dict[str, Dict[str, Dict]], entry: Dict):
+    """Apply one journal entry to raw record dicts"""
+    records = raw.setdefault(entry['c'], {})
+    if entry.get('v') is None:
+        records.pop(entry['k'], None)
+    else:
+        records[entry['k']] = entry['v']
+
+
+def quest_min_rank(quest: Any) -> int:
+    """Minimum rank a quest requires, tolerating malformed AI-generated requirements"""
+    try:
+        return int(quest.requirements.get('min_rank', 0) or 0)
+    except (TypeError, ValueError, AttributeError):
+        return 0
+
+
+def empty_network_stats() -> Dict[str, Any]:
+    """Counters in the shape returned by StateStore.network_stats(), all zero"""
+    return {
+        'total_operatives': 0, 'active_operatives': 0, 'rank_sum': 0, 'total_reputation': 0,
+        'total_quests': 0, 'quests_by_status': {}, 'total_triggers': 0, 'active_triggers': 0
+    }
+
+
+def tally_record(stats: Dict[str, Any], collection: str, obj: Any, sign: int = 1):
+    """Add one record to network_stats() counters, or remove it with sign=-1"""
+    if collection == 'operatives':
+        stats['total_operatives'] += sign
+        stats['active_operatives'] += sign * int(bool(obj.active))
+        stats['rank_sum'] += sign * obj.rank
+        stats['total_reputation'] += sign * obj.reputation
+    elif collection == 'quests':
+        stats['total_quests'] += sign
+        by_status = stats['quests_by_status']
+        status = str(obj.status)
+        by_status[status] = by_status.get(status, 0) + sign
+        if not by_status[status]:
+            del by_status[status]
+    elif collection == 'triggers':
+        stats['total_triggers'] += sign
+        stats['active_triggers'] += sign * int(bool(obj.active))
+
+
+class StateStore:
+    """Persists daemon state as one pretty-printed JSON file per collection"""
+
+    # Incremental backends write only the records passed to record()
+    incremental = False
+
+    def __init__(self, data_dir: Path, models: Dict[str, Type]):
+        self.data_dir = Path(data_dir)
+        self.models = models
+        self.state: Dict[str, Dict[str, Any]] = {collection: {} for collection in COLLECTIONS}
+        self._lock = threading.RLock()
+
+    def snapshot_path(self, collection: str) -> Path:
+        return self.data_dir / f"{collection}.json"
+
+    def read_snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """Read the raw record dicts of every collection"""
+        raw = {}
+        for collection in COLLECTIONS:
+            path = self.snapshot_path(collection)
+            raw[collection] = {}
+            if path.exists():
+                with open(path, 'r') as f:
+                    raw[collection] = json.load(f)
+        return raw
+
+    def materialize(self, raw: Dict[str, Dict[str, Dict]]) -> Dict[str, Dict[str, Any]]:
+        """Build model instances from raw record dicts and keep them as the queried state"""
+        self.state = {
+            collection: {k: self.models[collection](**v) for k, v in raw.get(collection, {}).items()}
+            for collection in COLLECTIONS
+        }
+        return self.state
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load every collection as a mapping of id -> model instance"""
+        return self.materialize(self.read_snapshot())
+
+    def save(self, state: Dict[str, Dict[str, Any]]):
+        """Write the complete state"""
+        with self._lock:
+            for collection in COLLECTIONS:
+                # Copy first so a concurrent insert cannot break iteration
+                records = dict(state[collection])
+                atomic_write_json(self.snapshot_path(collection), {k: record_to_dict(v) for k, v in records.items()})
+
+    def record(self, collection: str, key: str, obj: Optional[Any]):
+        """Persist a single changed record (None marks a deletion)"""
+        raise NotImplementedError(f"{type(self).__name__} only supports full saves")
+
+    def record_many(self, records: Iterable[Tuple[str, str, Optional[Any]]]):
+        """Persist a batch of changed records"""
+        for collection, key, obj in records:
+            self.record(collection, key, obj)
+
+    def close(self):
+        """Release any files or threads held by the store"""
+
+    def query_triggers(self, active: Optional[bool] = None,
+                       trigger_type: Optional[str] = None) -> List[Any]:
+        """Triggers filtered by active flag and type"""
+        return [
+            t for t in self.state['triggers'].values()
+            if (active is None or t.active == active)
+            and (trigger_type is None or t.trigger_type == trigger_type)
+        ]
+
+    def quest_entries(self) -> List[Tuple[str, str, int, Optional[str]]]:
+        """(quest_id, status, min_rank, assigned_to) for every quest"""
+        return [(k, q.status, quest_min_rank(q), q.assigned_to) for k, q in self.state['quests'].items()]
+
+    def standings(self) -> List[Tuple[str, int, int]]:
+        """(operative_id, rank, reputation) for every operative"""
+        return [(k, op.rank, op.reputation) for k, op in self.state['operatives'].items()]
+
+    def network_stats(self) -> Dict[str, Any]:
+        """Aggregate counts over all collections"""
+        stats = empty_network_stats()
+        for collection in COLLECTIONS:
+            for obj in self.state[collection].values():
+                tally_record(stats, collection, obj)
+        return stats
+
+    def loaded_stats(self) -> Dict[str, Any]:
+        """Aggregate counts for seeding running totals after load(); a full recompute unless overridden"""
+        return self.network_stats()
+
+
+class JournaledStateStore(StateStore):
+    """Appends each change to a write-ahead journal and periodically folds it into the JSON snapshot
+
+    The snapshot files are the same ones written by StateStore, so a compacted
+    data directory can be opened by either backend.
+    """
+
+    incremental = True
+
+    def __init__(self, data_dir: Path, models: Dict[str, Type],
+                 compact_threshold: int = 1000, fsync: bool = False):
+        super().__init__(data_dir, models)
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.journal_path = self.data_dir / "state.journal"
+        self.sealed_path = self.data_dir / "state.journal.compacting"
+        self._journal = None
+        self._pending = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def _open_journal(self):
+        self._journal = open(self.journal_path, 'a')
+
+    def _fold(self, journal_path: Path):
+        """Apply a sealed journal segment to the snapshot files and remove it"""
+        raw = self.read_snapshot()
+        entries = 0
+        for entry in read_journal(journal_path):
+            apply_journal_entry(raw, entry)
+            entries += 1
+        for collection in COLLECTIONS:
+            atomic_write_json(self.snapshot_path(collection), raw[collection])
+        journal_path.unlink()
+        logger.info(f"Compacted {entries} journal entries into snapshot")
+
+    def _compact_in_background(self):
+        try:
+            self._fold(self.sealed_path)
+        except Exception as e:
+            logger.error(f"Journal compaction failed: {e}")
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            # A sealed segment only survives if we crashed mid-compaction
+            if self.sealed_path.exists():
+                self._fold(self.sealed_path)
+
+            raw = self.read_snapshot()
+            for entry in read_journal(self.journal_path):
+                apply_journal_entry(raw, entry)
+                self._pending += 1
+
+            if self._journal is None:
+                self._open_journal()
+
+        return self.materialize(raw)
+
+    def record(self, collection: str, key: str, obj: Optional[Any]):
+        entry = {'c': collection, 'k': key, 'v': record_to_dict(obj) if obj is not None else None}
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+
+        with self._lock:
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._pending += 1
+
+            if self._pending >= self.compact_threshold:
+                self.compact()
+
+    def compact(self, wait: bool = False):
+        """Seal the current journal and fold it into the snapshot on a background thread"""
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                compactor = self._compactor
+            else:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if self.journal_path.exists():
+                    os.replace(self.journal_path, self.sealed_path)
+                    self._pending = 0
+                    self._compactor = threading.Thread(
+                        target=self._compact_in_background,
+                        name="journal-compactor",
+                        daemon=True
+                    )
+                    self._compactor.start()
+                self._open_journal()
+                compactor = self._compactor
+
+        if wait and compactor:
+            compactor.join()
+
+    def save(self, state: Dict[str, Dict[str, Any]]):
+        """Write a full snapshot and truncate the journal it supersedes"""
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                self._compactor.join()
+            for collection in COLLECTIONS:
+                records = dict(state[collection])
+                atomic_write_json(self.snapshot_path(collection), {k: record_to_dict(v) for k, v in records.items()})
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_path, 'w')
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                self._compactor.join()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SnapshotStateStore(JournaledStateStore):
+    """Journaled store whose snapshot is a memory-mapped binary file instead of JSON
+
+    Opening the snapshot reads only its header; records are decoded when first
+    accessed, and untouched records are copied as raw bytes when a new snapshot
+    is written.
+    """
+
+    def __init__(self, data_dir: Path, models: Dict[str, Type],
+                 compact_threshold: int = 1000, fsync: bool = False):
+        super().__init__(data_dir, models, compact_threshold=compact_threshold, fsync=fsync)
+        self.binary_path = self.data_dir / "state.snapshot"
+        self._reader: Optional[SnapshotReader] = None
+
+    def _migrate_json_snapshot(self):
+        """Convert JSON state files into a binary snapshot once"""
+        if self.binary_path.exists():
+            return
+        if not any(self.snapshot_path(c).exists() for c in COLLECTIONS):
+            return
+        raw = self.read_snapshot()
+        stats = empty_network_stats()
+        for collection in COLLECTIONS:
+            for record in raw[collection].values():
+                tally_record(stats, collection, self.models[collection](**record))
+        write_snapshot(self.binary_path, {
+            collection: (
+                (key, json.dumps(record, separators=(',', ':')).encode())
+                for key, record in raw[collection].items()
+            )
+            for collection in COLLECTIONS
+        }, stats)
+        logger.info(f"Converted JSON state files into {self.binary_path.name}")
+
+    def _decode(self, collection: str, raw: bytes) -> Any:
+        return self.models[collection](**json.loads(raw))
+
+    def _snapshot_stats(self, reader: Optional[SnapshotReader]) -> Dict[str, Any]:
+        """Counters stored in a snapshot, counted record by record for snapshots written without them"""
+        if reader is None:
+            return empty_network_stats()
+        stats = reader.stats()
+        if stats is None:
+            logger.info(f"{reader.path.name} has no stored counters; counting its records")
+            stats = empty_network_stats()
+            for collection in COLLECTIONS:
+                for position in range(reader.count(collection)):
+                    tally_record(stats, collection, self._decode(collection, reader.raw(collection, position)[1]))
+        return stats
+
+    def _current_stats(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Stored snapshot counters adjusted for the records touched since loading"""
+        stats = self._snapshot_stats(self._reader)
+        for collection in COLLECTIONS:
+            for _, old, new in state[collection].overrides():
+                if old is not None:
+                    tally_record(stats, collection, old, -1)
+                if new is not None:
+                    tally_record(stats, collection, new)
+        return stats
+
+    def _fold(self, journal_path: Path):
+        """Merge a sealed journal segment into a new binary snapshot"""
+        reader = SnapshotReader(self.binary_path) if self.binary_path.exists() else None
+        overrides: Dict[str, Dict[str, Optional[bytes]]] = {c: {} for c in COLLECTIONS}
+        entries = 0
+        for entry in read_journal(journal_path):
+            value = entry.get('v')
+            overrides.setdefault(entry['c'], {})[entry['k']] = (
+                json.dumps(value, separators=(',', ':')).encode() if value is not None else None
+            )
+            entries += 1
+
+        stats = self._snapshot_stats(reader)
+        for collection, changed in overrides.items():
+            for key, value in changed.items():
+                old = reader.get_raw(collection, key) if reader is not None else None
+                if old is not None:
+                    tally_record(stats, collection, self._decode(collection, old), -1)
+                if value is not None:
+                    tally_record(stats, collection, self._decode(collection, value))
+
+        def merged(collection: str) -> Iterator[Tuple[str, bytes]]:
+            changed = overrides[collection]
+            if reader is not None:
+                for position in range(reader.count(collection)):
+                    key, raw = reader.raw(collection, position)
+                    if key not in changed:
+                        yield key, raw
+            for key, value in changed.items():
+                if value is not None:
+                    yield key, value
+
+        try:
+            write_snapshot(self.binary_path, {c: merged(c) for c in COLLECTIONS}, stats)
+        finally:
+            if reader is not None:
+                reader.close()
+        journal_path.unlink()
+        logger.info(f"Compacted {entries} journal entries into {self.binary_path.name}")
+
+    def load(self) -> Dict[str, Any]:
+        with self._lock:
+            self._migrate_json_snapshot()
+            if self.sealed_path.exists():
+                self._fold(self.sealed_path)
+
+            self._reader = SnapshotReader(self.binary_path) if self.binary_path.exists() else None
+            state = {
+                collection: SnapshotCollection(collection, self.models[collection], self._reader)
+                for collection in COLLECTIONS
+            }
+            for entry in read_journal(self.journal_path):
+                records = state[entry['c']]
+                if entry.get('v') is None:
+                    records.pop(entry['k'], None)
+                else:
+                    records[entry['k']] = self.models[entry['c']](**entry['v'])
+                self._pending += 1
+
+            if self._journal is None:
+                self._open_journal()
+
+        self.state = state
+        return state
+
+    def loaded_stats(self) -> Dict[str, Any]:
+        """Counters from the snapshot header plus the journal, without decoding untouched records"""
+        with self._lock:
+            return self._current_stats(self.state)
+
+    def save(self, state: Dict[str, Any]):
+        """Write a new binary snapshot and truncate the journal it supersedes"""
+        with self._lock:
+            if self._compactor and self._compactor.is_alive():
+                self._compactor.join()
+            # The live collections keep reading from the previous mapping, which stays
+            # valid after the file is replaced
+            write_snapshot(self.binary_path, {c: state[c].encoded_items() for c in COLLECTIONS},
+                           self._current_stats(state))
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_path, 'w')
+            self._pending = 0
+
+    def close(self):
+        super().close()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+# Indexed columns mirrored out of each record, keyed by collection
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS triggers (
+    id TEXT PRIMARY KEY,
+    trigger_type TEXT,
+    active INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_triggers_active_type ON triggers (active, trigger_type);
+CREATE TABLE IF NOT EXISTS quests (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    assigned_to TEXT,
+    min_rank INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quests_status_rank ON quests (status, min_rank);
+CREATE INDEX IF NOT EXISTS idx_quests_assigned ON quests (assigned_to, status);
+CREATE TABLE IF NOT EXISTS operatives (
+    id TEXT PRIMARY KEY,
+    rank INTEGER,
+    reputation INTEGER,
+    active INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_operatives_standing ON operatives (rank DESC, reputation DESC);
+"""
+
+SQLITE_COLUMNS = {
+    'triggers': lambda t: {'trigger_type': t.trigger_type, 'active': int(bool(t.active))},
+    'quests': lambda q: {'status': q.status, 'assigned_to': q.assigned_to, 'min_rank': quest_min_rank(q)},
+    'operatives': lambda op: {'rank': op.rank, 'reputation': op.reputation, 'active': int(bool(op.active))},
+}
+
+
+class SQLiteCollection(MutableMapping):
+    """Dict-like view of one SQLite table that materializes records on first access
+
+    Materialized objects are kept in an identity map so in-place edits made by
+    DaemonCore are what record() later writes back. Assignments and deletions stay
+    in memory as well until the record is persisted, so record() is the only write path.
+    When the store is shared with other worker processes, every access re-reads the row
+    and merges another process's changes into the cached object in place.
+    """
+
+    def __init__(self, store: 'SQLiteStateStore', collection: str):
+        self.store = store
+        self.collection = collection
+        self.model = store.models[collection]
+        self._cache: Dict[str, Any] = {}
+        # key -> the row's JSON as last read from or written to the database
+        self._synced: Dict[str, str] = {}
+        # key -> object assigned, or None if deleted, since the record was last written
+        self._unsaved: Dict[str, Optional[Any]] = {}
+
+    def _materialize(self, key: str, data: str) -> Any:
+        obj = self._cache.get(key)
+        if obj is None:
+            obj = self.model(**json.loads(data))
+            self._cache[key] = obj
+        elif self.store.shared and data != self._synced.get(key):
+            self._merge(key, obj, data)
+        self._synced[key] = data
+        return obj
+
+    def _merge(self, key: str, obj: Any, data: str):
+        """Take another process's changes to a row, field by field, keeping this worker's edits
+
+        A field edited both here and there keeps the local value, which the next write
+        stores; the conflict is logged.
+        """
+        synced = self._synced.get(key)
+        base = json.loads(synced) if synced is not None else None
+        local = json.loads(json.dumps(record_to_dict(obj)))
+        remote = json.loads(data)
+        fresh = self.model(**remote)
+        conflicts = []
+        for f in fields(self.model):
+            name = f.name
+            if base is None or local.get(name) == base.get(name):
+                setattr(obj, name, getattr(fresh, name))
+            elif remote.get(name) not in (base.get(name), local.get(name)):
+                conflicts.append(name)
+        if conflicts:
+            logger.warning(f"{self.collection} {key} was also changed by another worker; "
+                           f"keeping this worker's {', '.join(conflicts)}")
+
+    def changed(self) -> List[Tuple[str, Any]]:
+        """Materialized records edited in memory since they were last read or written"""
+        changed = []
+        for key, obj in self._cache.items():
+            synced = self._synced.get(key)
+            # Compared decoded, so rows written with a different key order still match
+            if synced is None or json.loads(json.dumps(record_to_dict(obj))) != json.loads(synced):
+                changed.append((key, obj))
+        return changed
+
+    def select(self, where: str = "", params: tuple = (), order: str = "",
+               limit: Optional[int] = None, offset: int = 0,
+               match: Optional[Callable[[Any], bool]] = None) -> List[Any]:
+        """Materialize the records matching a SQL filter
+
+        Records assigned but not yet written are appended when there is no filter, or when
+        match, the filter's Python equivalent, accepts them; they are not ordered or paged.
+        """
+        sql = f"SELECT id, data FROM {self.collection}"
+        if where:
+            sql += f" WHERE {where}"
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = tuple(params) + (limit, offset)
+        rows = self.store.query(sql, params)
+        unsaved = dict(self._unsaved)
+        records = [self._materialize(key, data) for key, data in rows if key not in unsaved]
+        if limit is None and (not where or match is not None):
+            records.extend(obj for obj in unsaved.values()
+                           if obj is not None and (match is None or match(obj)))
+        return records
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._unsaved:
+            obj = self._unsaved.get(key)
+            if obj is None:
+                raise KeyError(key)
+            return obj
+        if key in self._cache and not self.store.shared:
+            return self._cache[key]
+        rows = self.store.query(f"SELECT data FROM {self.collection} WHERE id = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+        return self._materialize(key, rows[0][0])
+
+    def __setitem__(self, key: str, obj: Any):
+        self._cache[key] = obj
+        self._unsaved[key] = obj
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._cache.pop(key, None)
+        self._unsaved[key] = None
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._unsaved:
+            return self._unsaved.get(key) is not None
+        if key in self._cache and not self.store.shared:
+            return True
+        return bool(self.store.query(f"SELECT 1 FROM {self.collection} WHERE id = ?", (key,)))
+
+    def __iter__(self) -> Iterator[str]:
+        unsaved = dict(self._unsaved)
+        keys = [row[0] for row in self.store.query(f"SELECT id FROM {self.collection}") if row[0] not in unsaved]
+        return iter(keys + [key for key, obj in unsaved.items() if obj is not None])
+
+    def __len__(self) -> int:
+        count = self.store.query(f"SELECT COUNT(*) FROM {self.collection}")[0][0]
+        unsaved = dict(self._unsaved)
+        if unsaved:
+            placeholders = ', '.join('?' * len(unsaved))
+            stored = {row[0] for row in self.store.query(
+                f"SELECT id FROM {self.collection} WHERE id IN ({placeholders})", tuple(unsaved))}
+            for key, obj in unsaved.items():
+                count += (obj is not None) - (key in stored)
+        return count
+
+    def values(self) -> List[Any]:
+        return self.select()
+
+    def items(self) -> List[tuple]:
+        return [(self.model_key(obj), obj) for obj in self.select()]
+
+    def model_key(self, obj: Any) -> str:
+        return getattr(obj, f"{self.collection[:-1]}_id")
+
+
+class SQLiteStateStore(StateStore):
+    """Keeps state in a SQLite database (WAL mode) with indexes for the daemon's hot queries
+
+    Records are loaded lazily, so startup cost does not grow with the size of the network.
+    Set shared when other worker processes write to the same database.
+    """
+
+    incremental = True
+    shared = False
+
+    def __init__(self, data_dir: Path, models: Dict[str, Type], db_path: Optional[Path] = None):
+        super().__init__(data_dir, models)
+        self.db_path = Path(db_path) if db_path else self.data_dir / "daemon_state.db"
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.tables = {collection: SQLiteCollection(self, collection) for collection in COLLECTIONS}
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query and fetch all rows while holding the connection lock"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def write(self, collection: str, key: str, obj: Optional[Any]):
+        """Upsert or delete one record together with its indexed columns
+
+        A record identical to the row last read or written is skipped.
+        """
+        with self._lock:
+            table = self.tables[collection]
+            if table._unsaved.get(key, obj) is obj:
+                table._unsaved.pop(key, None)
+            if obj is None:
+                self.conn.execute(f"DELETE FROM {collection} WHERE id = ?", (key,))
+                table._synced.pop(key, None)
+                return
+            data = json.dumps(record_to_dict(obj))
+            if table._synced.get(key) == data:
+                return
+            columns = SQLITE_COLUMNS[collection](obj)
+            names = ', '.join(['id', *columns, 'data'])
+            placeholders = ', '.join('?' * (len(columns) + 2))
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {collection} ({names}) VALUES ({placeholders})",
+                (key, *columns.values(), data)
+            )
+            table._synced[key] = data
+
+    def migrate_from_json(self) -> bool:
+        """One-shot import of the JSON snapshot (and any journal tail) into the database"""
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return False
+
+            raw = self.read_snapshot()
+            for journal_path in (self.data_dir / "state.journal.compacting", self.data_dir / "state.journal"):
+                for entry in read_journal(journal_path):
+                    apply_journal_entry(raw, entry)
+
+            with self.transaction():
+                for collection in COLLECTIONS:
+                    model = self.models[collection]
+                    for key, record in raw[collection].items():
+                        self.write(collection, key, model(**record))
+                self.conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated_from_json', datetime('now'))"
+                )
+
+            counts = ', '.join(f"{len(raw[c])} {c}" for c in COLLECTIONS)
+            logger.info(f"Migrated JSON state into {self.db_path.name}: {counts}")
+            return True
+
+    def load(self) -> Dict[str, Any]:
+        self.migrate_from_json()
+        self.state = dict(self.tables)
+        return self.state
+
+    def save(self, state: Dict[str, Any]):
+        """Write back the materialized records edited in memory, in one transaction
+
+        Unchanged records are left alone, so a stale copy never overwrites a row another
+        worker process has updated since.
+        """
+        with self.transaction():
+            for collection, table in self.tables.items():
+                for key, obj in table.changed():
+                    self.write(collection, key, obj)
+                for key, obj in list(table._unsaved.items()):
+                    if obj is None:
+                        self.write(collection, key, None)
+
+    def record(self, collection: str, key: str, obj: Optional[Any]):
+        self.write(collection, key, obj)
+
+    def record_many(self, records: Iterable[Tuple[str, str, Optional[Any]]]):
+        with self.transaction():
+            for collection, key, obj in records:
+                self.write(collection, key, obj)
+
+    @contextmanager
+    def transaction(self):
+        """Run the writes made inside the block as one transaction; nested blocks join it"""
+        with self._lock:
+            if self.conn.in_transaction:
+                yield
+                return
+            self.conn.execute("BEGIN")
+            try:
+                yield
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def query_triggers(self, active: Optional[bool] = None,
+                       trigger_type: Optional[str] = None) -> List[Any]:
+        clauses, params = [], []
+        if active is not None:
+            clauses.append("active = ?")
+            params.append(int(active))
+        if trigger_type is not None:
+            clauses.append("trigger_type = ?")
+            params.append(trigger_type)
+        return self.tables['triggers'].select(
+            ' AND '.join(clauses), tuple(params),
+            match=lambda t: (active is None or bool(t.active) == active)
+            and (trigger_type is None or t.trigger_type == trigger_type)
+        )
+
+    def quest_entries(self) -> List[Tuple[str, str, int, Optional[str]]]:
+        return self.query("SELECT id, status, min_rank, assigned_to FROM quests")
+
+    def standings(self) -> List[Tuple[str, int, int]]:
+        # Served from the indexed columns without materializing operatives
+        return self.query("SELECT id, rank, reputation FROM operatives")
+
+    def network_stats(self) -> Dict[str, Any]:
+        total_ops, active_ops, rank_sum, reputation = self.query(
+            "SELECT COUNT(*), COALESCE(SUM(active), 0), COALESCE(SUM(rank), 0), "
+            "COALESCE(SUM(reputation), 0) FROM operatives"
+        )[0]
+        quests_by_status = dict(self.query("SELECT status, COUNT(*) FROM quests GROUP BY status"))
+        total_triggers, active_triggers = self.query(
+            "SELECT COUNT(*), COALESCE(SUM(active), 0) FROM triggers"
+        )[0]
+        return {
+            'total_operatives': total_ops,
+            'active_operatives': active_ops,
+            'rank_sum': rank_sum,
+            'total_reputation': reputation,
+            'total_quests': sum(quests_by_status.values()),
+            'quests_by_status': quests_by_status,
+            'total_triggers': total_triggers,
+            'active_triggers': active_triggers
+        }
+
+
+class WriteBehindWriter:
+    """Coalesces persistence requests and writes them from a dedicated thread
+
+    Callers mark records dirty and return immediately. The writer thread waits
+    interval_ms after the first dirty mark so a burst of changes collapses into
+    a single call to write_fn with the set of changed (collection, key) pairs.
+    """
+
+    def __init__(self, write_fn: Callable[[Set[Tuple[str, str]]], None], interval_ms: int = 250):
+        self.write_fn = write_fn
+        self.interval = interval_ms / 1000
+        self.flush_count = 0
+        self._pending: Set[Tuple[str, str]] = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self, changes: Iterable[Tuple[str, str]] = ()):
+        with self._lock:
+            self._pending.update(changes)
+            self._dirty = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait()
+            # Let the burst accumulate before writing
+            self._stopping.wait(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Write everything marked dirty so far on the calling thread"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    self._wake.clear()
+                    return
+                changes, self._pending = self._pending, set()
+                self._dirty = False
+                self._wake.clear()
+            try:
+                self.write_fn(changes)
+                self.flush_count += 1
+            except Exception as e:
+                logger.error(f"Background state write failed, will retry: {e}")
+                self.mark_dirty(changes)
+
+    def stop(self):
+        """Flush outstanding changes and stop the writer thread"""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+def create_state_store(backend: str, data_dir: Path, models: Dict[str, Type]) -> StateStore:
+    """Build the persistence backend named by DAEMON_PERSISTENCE"""
+    if backend == 'json':
+        return StateStore(data_dir, models)
+    if backend == 'journal':
+        return JournaledStateStore(
+            data_dir, models,
+            compact_threshold=int(os.getenv('DAEMON_JOURNAL_COMPACT_THRESHOLD', '1000')),
+            fsync=os.getenv('DAEMON_JOURNAL_FSYNC', 'false').lower() == 'true'
+        )
+    if backend == 'snapshot':
+        return SnapshotStateStore(
+            data_dir, models,
+            compact_threshold=int(os.getenv('DAEMON_JOURNAL_COMPACT_THRESHOLD', '1000')),
+            fsync=os.getenv('DAEMON_JOURNAL_FSYNC', 'false').lower() == 'true'
+        )
+    if backend == 'sqlite':
+        return SQLiteStateStore(data_dir, models)
+    raise ValueError(f"Unknown persistence backend: {backend}")
+
+
+if __name__ == "__main__":
+    import sys
+    from daemon_core import Trigger, Quest, Operative
+
+    # Usage: python state_store.py [data_dir] -- migrate JSON state into SQLite
+    data_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "./daemon_data")
+    store = SQLiteStateStore(data_dir, {'triggers': Trigger, 'quests': Quest, 'operatives': Operative})
+    if not store.migrate_from_json():
+        print(f"{store.db_path} was already migrated")
+    store.close()
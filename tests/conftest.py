@@ -0,0 +1,38 @@
+"""
+Shared fixtures: daemons on a temporary data directory with no AI provider configured
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    """Run from tmp_path with no AI keys, so nothing reaches a real provider"""
+    for name in ('ANTHROPIC_API_KEY', 'OPENAI_API_KEY', 'ANTHROPIC_BASE_URL', 'OPENAI_BASE_URL',
+                 'DAEMON_PERSISTENCE', 'DAEMON_WORKER_ID', 'DAEMON_TIMEZONE'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def make_daemon(offline):
+    """Factory for DaemonCore instances on the shared temporary data directory"""
+    from daemon_core import DaemonCore
+
+    daemons = []
+
+    def make(**kwargs):
+        daemon = DaemonCore(str(offline / "daemon_data"), **kwargs)
+        daemons.append(daemon)
+        return daemon
+
+    yield make
+    for daemon in daemons:
+        if daemon.running is not None:
+            daemon.stop()
@@ -0,0 +1,80 @@
+"""
+Segmented action log: rotation, compression, filtered queries and resuming
+"""
+
+import gzip
+import shutil
+import time
+from datetime import datetime, timedelta
+
+from action_log import ActionLog
+
+
+START = datetime.now()
+
+
+def at(i):
+    return (START + timedelta(seconds=i)).isoformat()
+
+
+def entry(i, trigger_id='t1'):
+    return {'action_id': f'a{i}', 'trigger_id': trigger_id, 'timestamp': at(i)}
+
+
+def wait_for_compression(log, count):
+    deadline = time.monotonic() + 5
+    while len(list(log.log_dir.glob('*.jsonl.gz'))) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_rotates_by_size_and_compresses_sealed_segments(tmp_path):
+    log = ActionLog(tmp_path, max_segment_bytes=200)
+    for i in range(10):
+        log.append(entry(i))
+    sealed = len(log.segments()) - 1
+    assert sealed >= 2
+    wait_for_compression(log, sealed)
+    assert [p.suffix for p in log.segments()] == ['.gz'] * sealed + ['.jsonl']
+    assert [e['action_id'] for e in log.query()] == [f'a{i}' for i in range(10)]
+    log.close()
+
+
+def test_query_filters_by_trigger_action_and_time(tmp_path):
+    log = ActionLog(tmp_path, compress=False)
+    for i in range(6):
+        log.append(entry(i, 't1' if i % 2 else 't2'))
+    assert [e['action_id'] for e in log.query(trigger_id='t1')] == ['a1', 'a3', 'a5']
+    assert [e['action_id'] for e in log.query(action_id='a4')] == ['a4']
+    assert [e['action_id'] for e in log.query(since=at(2), until=at(4))] == \
+        ['a2', 'a3', 'a4']
+    log.close()
+
+
+def test_segment_being_compressed_is_read_once(tmp_path):
+    log = ActionLog(tmp_path, compress=False)
+    log.append(entry(0))
+    log.rotate()
+    log.append(entry(1))
+    sealed = log.segments()[0]
+    # The compressed copy is in place but the original has not been removed yet
+    with open(sealed, 'rb') as src, gzip.open(sealed.with_name(sealed.name + '.gz'), 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    assert [e['action_id'] for e in log.query()] == ['a0', 'a1']
+    log.close()
+
+    resumed = ActionLog(tmp_path, compress=False)
+    assert not sealed.exists()
+    resumed.append(entry(2))
+    assert [e['action_id'] for e in resumed.query()] == ['a0', 'a1', 'a2']
+    resumed.close()
+
+
+def test_resume_appends_to_the_newest_segment(tmp_path):
+    log = ActionLog(tmp_path, compress=False)
+    log.append(entry(0))
+    log.close()
+    resumed = ActionLog(tmp_path, compress=False)
+    resumed.append(entry(1))
+    assert len(resumed.segments()) == 1
+    assert [e['action_id'] for e in resumed.query()] == ['a0', 'a1']
+    resumed.close()
@@ -0,0 +1,64 @@
+"""
+Actions that fail are retried and finally dead-lettered
+"""
+
+import asyncio
+
+
+def test_failed_quest_generation_is_retried_then_dead_lettered(make_daemon, monkeypatch):
+    daemon = make_daemon()
+    daemon.action_queue.retry_backoff = 0.01
+    attempts = []
+
+    async def generate_quest_with_ai(difficulty=2):
+        attempts.append(difficulty)
+        return None
+
+    monkeypatch.setattr(daemon, 'generate_quest_with_ai', generate_quest_with_ai)
+
+    async def run():
+        daemon.action_queue.start()
+        await daemon.action_queue.submit('create_quest', {'action_type': 'create_quest',
+                                                          'parameters': {'difficulty': 3}})
+        await daemon.action_queue.join()
+        await daemon.action_queue.stop()
+
+    asyncio.run(run())
+    stats = daemon.get_action_queue_stats()
+    assert attempts == [3] * daemon.action_queue.max_attempts
+    assert stats['completed'] == 0
+    assert stats['dead_lettered'] == 1
+    assert [entry['status'] for entry in daemon.action_log.query()] == ['dead_letter']
+
+
+def test_capped_types_are_parked_and_run_in_priority_order():
+    from action_queue import ActionQueue
+
+    order, running, peak = [], {'slow': 0}, []
+
+    async def handler(job):
+        if job.action_type == 'slow':
+            running['slow'] += 1
+            peak.append(running['slow'])
+            await asyncio.sleep(0.01)
+            running['slow'] -= 1
+        order.append((job.action_type, job.priority))
+
+    async def run():
+        queue = ActionQueue(handler, workers=4, type_limits={'slow': 1})
+        queue.start()
+        for priority in (3, 9, 5, 7):
+            await queue.submit('slow', {}, priority)
+        await asyncio.sleep(0)
+        # Waiting capped jobs are parked, not left in the shared heap
+        assert len(queue._heap) == 0 and len(queue) == 3
+        assert queue.as_dict()['depth'] == 3
+        await queue.submit('fast', {}, 1)
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(run())
+    assert max(peak) == 1
+    # The fast job is not held up behind the capped ones
+    assert order[0] == ('fast', 1)
+    assert [p for t, p in order if t == 'slow'] == [9, 7, 5, 3]
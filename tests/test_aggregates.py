@@ -0,0 +1,101 @@
+"""
+Running network aggregates stay equal to a full recompute across mutations and restarts
+"""
+
+import pytest
+
+from daemon_core import Operative, Quest, Trigger
+from snapshot import write_snapshot
+from state_store import SnapshotStateStore
+
+MODELS = {'triggers': Trigger, 'quests': Quest, 'operatives': Operative}
+
+
+def mutate(daemon):
+    """Recruit, create, assign, complete and deactivate; returns the ids involved"""
+    ops = [daemon.recruit_operative(f"user{i}", ['recon']) for i in range(3)]
+    quests = [daemon.create_quest(f"Quest {i}", "", 1, {'reputation': 150}, {'min_rank': 0}) for i in range(4)]
+    daemon.assign_quest(quests[0], ops[0])
+    daemon.assign_quest(quests[1], ops[1])
+    daemon.complete_quest(quests[0], ops[0])
+    triggers = [daemon.create_trigger('condition', {'type': 'operative_count', 'threshold': i}, 'ai_decision')
+                for i in range(2)]
+    daemon.set_trigger_active(triggers[0], False)
+    daemon.persist(('triggers', triggers[0]))
+    daemon.flush()
+    return ops, quests, triggers
+
+
+def test_aggregates_follow_mutations(make_daemon):
+    daemon = make_daemon()
+    mutate(daemon)
+
+    stats = daemon.get_network_stats()
+    assert daemon.aggregates.diff(daemon.store.network_stats()) == {}
+    assert stats['total_operatives'] == 3 and stats['rank_sum'] == 4 and stats['total_reputation'] == 150
+    assert stats['quests_by_status'] == {'available': 2, 'active': 1, 'completed': 1}
+    assert (stats['total_triggers'], stats['active_triggers']) == (2, 1)
+
+
+@pytest.mark.parametrize('persistence', ['json', 'journal', 'snapshot', 'sqlite'])
+def test_aggregates_survive_a_restart(make_daemon, persistence):
+    daemon = make_daemon(persistence=persistence)
+    mutate(daemon)
+    before = daemon.get_network_stats()
+    daemon.stop()
+    daemon.running = None
+
+    restarted = make_daemon(persistence=persistence)
+    assert restarted.get_network_stats() == before
+    assert restarted.aggregates.diff(restarted.store.network_stats()) == {}
+
+
+def seed_snapshot(data_dir, count, with_stats=True):
+    """Write count operatives and quests to a binary snapshot, then change a few through the journal"""
+    data_dir.mkdir()
+    store = SnapshotStateStore(data_dir, MODELS)
+    state = store.load()
+    for i in range(count):
+        state['operatives'][f"op{i:04d}"] = Operative(f"op{i:04d}", f"user{i}", f"Shadow{i}", i % 5 + 1, i, [], [])
+        state['quests'][f"q{i:04d}"] = Quest(f"q{i:04d}", f"Quest {i}", "", 1, {}, {},
+                                             ('available', 'active', 'completed')[i % 3])
+    if with_stats:
+        store.save(state)
+    else:
+        write_snapshot(store.binary_path, {c: state[c].encoded_items() for c in MODELS})
+    store.close()
+
+    store = SnapshotStateStore(data_dir, MODELS)
+    store.load()
+    store.record('quests', 'q0000', None)
+    store.record('operatives', 'op0001', Operative('op0001', 'user1', 'Shadow1', 9, 900, [], [], active=False))
+    store.record('operatives', 'new', Operative('new', 'new', 'Ghost', 1, 0, [], []))
+    store.close()
+
+
+def test_startup_reads_counters_without_decoding_records(make_daemon, offline):
+    seed_snapshot(offline / "daemon_data", 500)
+
+    daemon = make_daemon(persistence='snapshot')
+    # Only the records the journal touched have been decoded
+    assert daemon.operatives.materialized == 2
+    assert daemon.quests.materialized == 0
+
+    stats = daemon.get_network_stats()
+    assert stats['total_operatives'] == 501 and stats['active_operatives'] == 500
+    assert stats['total_quests'] == 499
+    assert daemon.aggregates.diff(daemon.store.network_stats()) == {}
+
+
+def test_snapshot_without_counters_is_counted_once(make_daemon, offline):
+    seed_snapshot(offline / "daemon_data", 30, with_stats=False)
+
+    daemon = make_daemon(persistence='snapshot')
+    assert daemon.aggregates.diff(daemon.store.network_stats()) == {}
+    daemon.stop()
+    daemon.running = None
+
+    # Saving on stop stored the counters, so the next start decodes nothing
+    restarted = make_daemon(persistence='snapshot')
+    assert restarted.operatives.materialized == 0 and restarted.quests.materialized == 0
+    assert restarted.aggregates.diff(restarted.store.network_stats()) == {}
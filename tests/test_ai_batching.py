@@ -0,0 +1,83 @@
+"""
+Batched AI-decision evaluation: one request per batch, individual fallback and verdict reuse
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+
+@pytest.fixture
+def ai_daemon(make_daemon, monkeypatch):
+    """Daemon whose AI answers from a stub; batch replies omit the trigger named 'skipped'"""
+    monkeypatch.setenv('AI_CACHE', 'false')
+    monkeypatch.setenv('DAEMON_AI_BATCH_SIZE', '3')
+    daemon = make_daemon()
+    daemon.prompts = []
+
+    async def query_ai(prompt, response_format='text', cache=None):
+        if cache.startswith('evaluate_'):
+            daemon.prompts.append(cache)
+        if cache == 'evaluate_triggers_batch':
+            listed = json.loads(re.search(r'Triggers:\n(\[.*?\n\])', prompt, re.S).group(1))
+            return {'verdicts': [
+                {'trigger_id': t['trigger_id'], 'should_trigger': t['condition']['fire'], 'reasoning': 'stub'}
+                for t in listed if t['condition']['description'] != 'skipped'
+            ] + [{'trigger_id': 'unknown', 'should_trigger': True}, {'should_trigger': 'yes'}]}
+        return {'should_trigger': True, 'reasoning': 'stub'}
+
+    daemon.ai_core.query_ai = query_ai
+    return daemon
+
+
+def ai_trigger(daemon, description, fire=False):
+    return daemon.create_trigger('ai_decision', {'description': description, 'fire': fire}, 'noop')
+
+
+def test_batch_reply_keeps_well_formed_verdicts_and_asks_again_for_the_rest(ai_daemon):
+    triggers = [{'trigger_id': 'a', 'condition': {'description': 'a', 'fire': False}},
+                {'trigger_id': 'b', 'condition': {'description': 'skipped', 'fire': False}}]
+    verdicts = asyncio.run(ai_daemon.ai_core.evaluate_triggers_batch(triggers, {}))
+    assert sorted(verdicts) == ['a', 'b']
+    assert verdicts['a']['should_trigger'] is False and verdicts['b']['should_trigger'] is True
+    assert ai_daemon.prompts == ['evaluate_triggers_batch', 'evaluate_trigger_with_ai']
+
+
+def test_triggers_are_evaluated_in_batches_and_reused(ai_daemon):
+    fired = [ai_trigger(ai_daemon, f"watch {i}", fire=i % 2 == 0) for i in range(4)]
+    skipped = ai_trigger(ai_daemon, 'skipped')
+
+    asyncio.run(ai_daemon.check_triggers())
+    # Five triggers in batches of three, plus one request for the trigger the batch left out
+    assert sorted(ai_daemon.prompts) == ['evaluate_trigger_with_ai'] + ['evaluate_triggers_batch'] * 2
+    stats = ai_daemon.get_ai_verdict_stats()
+    assert (stats['batch_requests'], stats['batched'], stats['evaluated']) == (2, 5, 0)
+    assert {t: ai_daemon.ai_verdicts[t][1] for t in fired + [skipped]} == {
+        fired[0]: True, fired[1]: False, fired[2]: True, fired[3]: False, skipped: True
+    }
+
+    # Nothing in the context changed, so the next tick asks the AI nothing
+    ai_daemon.prompts.clear()
+    asyncio.run(ai_daemon.check_triggers())
+    assert ai_daemon.prompts == []
+    # Each tick's individual checks found the verdicts already in place
+    assert ai_daemon.get_ai_verdict_stats()['reused'] == 10
+
+
+def test_failed_batch_falls_back_to_individual_requests(ai_daemon):
+    query_ai = ai_daemon.ai_core.query_ai
+
+    async def failing(prompt, response_format='text', cache=None):
+        if cache == 'evaluate_triggers_batch':
+            raise RuntimeError("overloaded")
+        return await query_ai(prompt, response_format, cache)
+
+    ai_daemon.ai_core.query_ai = failing
+    for i in range(3):
+        ai_trigger(ai_daemon, f"watch {i}")
+
+    asyncio.run(ai_daemon.check_triggers())
+    assert ai_daemon.prompts == ['evaluate_trigger_with_ai'] * 3
+    assert ai_daemon.get_ai_verdict_stats()['batch_requests'] == 0
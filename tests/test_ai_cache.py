@@ -0,0 +1,93 @@
+"""
+AI response cache: hits, TTL expiry, LRU eviction and which methods are cached
+"""
+
+import asyncio
+import time
+
+from ai_cache import ResponseCache
+
+
+def test_methods_fed_the_raw_context_are_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path / 'ai_cache.db')
+    assert cache.ttl_for('generate_trigger_actions') == 0
+    assert cache.ttl_for('make_decision') == 0
+    assert cache.ttl_for('evaluate_trigger_with_ai') > 0
+    cache.close()
+
+
+def test_operative_submissions_are_never_stored(tmp_path):
+    path = tmp_path / 'ai_cache.db'
+    cache = ResponseCache(path, ttls={'analyze_operative_submission': 60})
+    cache.put('k', {'verdict': 'ok'}, 60, 'analyze_operative_submission')
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert cache.ttl_for('analyze_operative_submission') == 0
+    # Entries stored while the method was cached are dropped once it is opted out
+    assert cache.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+    cache.close()
+
+
+def test_hits_from_memory_and_from_disk_after_a_restart(tmp_path):
+    path = tmp_path / 'ai_cache.db'
+    cache = ResponseCache(path)
+    cache.put('k', {'answer': 42}, 60, 'evaluate_trigger_with_ai', latency=1.5)
+    assert asyncio.run(cache.get('k', 'evaluate_trigger_with_ai')) == {'answer': 42}
+    assert asyncio.run(cache.get('other')) is None
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert asyncio.run(cache.get('k', 'evaluate_trigger_with_ai')) == {'answer': 42}
+    # Promoted to memory by the disk hit
+    assert asyncio.run(cache.get('k')) == {'answer': 42}
+    stats = cache.as_dict()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['saved_seconds']) == (1, 1, 3.0)
+    assert stats['hits_by_method'] == {'evaluate_trigger_with_ai': 1}
+    cache.close()
+
+
+def test_expired_entries_are_misses_and_removed(tmp_path):
+    cache = ResponseCache(tmp_path / 'ai_cache.db')
+    cache.put('k', 'v', 0.01)
+    time.sleep(0.02)
+    assert asyncio.run(cache.get('k')) is None
+    cache.flush()
+    assert cache.as_dict()['expired'] == 1
+    assert cache.as_dict()['disk_entries'] == 0
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_from_memory(tmp_path):
+    cache = ResponseCache(tmp_path / 'ai_cache.db', max_entries=2)
+    cache.put('a', 1, 60)
+    cache.put('b', 2, 60)
+    asyncio.run(cache.get('a'))
+    cache.put('c', 3, 60)
+    assert list(cache._memory) == ['a', 'c']
+    assert cache.as_dict()['evictions'] == 1
+    # The evicted entry is still served from disk
+    cache.flush()
+    assert asyncio.run(cache.get('b')) == 2
+    assert cache.as_dict()['disk_hits'] == 1
+    cache.close()
+
+
+def test_disk_lookups_do_not_block_the_event_loop(tmp_path):
+    cache = ResponseCache(tmp_path / 'ai_cache.db')
+
+    async def run():
+        beats = 0
+        with cache._db_lock:
+            # The database is busy; the lookup waits on a worker thread, not on the loop
+            lookup = asyncio.create_task(cache.get('missing'))
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                beats += 1
+            assert not lookup.done()
+        assert await lookup is None
+        return beats
+
+    assert asyncio.run(run()) == 10
+    cache.put('k', 'v', 60)
+    cache.close()
@@ -0,0 +1,119 @@
+"""
+AI calls run concurrently on the async clients without blocking the event loop
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+DELAY = 0.5
+CALLS = 8
+
+
+class SlowChatCompletions(BaseHTTPRequestHandler):
+    """Answers every chat completion with a JSON reply after DELAY seconds"""
+
+    protocol_version = 'HTTP/1.1'
+    content = '{"ok": true}'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['content-length']))
+        time.sleep(DELAY)
+        body = json.dumps({
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': self.content}}],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_openai(offline, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowChatCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('OPENAI_API_KEY', 'stub-key')
+    monkeypatch.setenv('OPENAI_BASE_URL', f'http://127.0.0.1:{server.server_address[1]}/v1')
+    monkeypatch.setenv('AI_CACHE', 'false')
+    monkeypatch.setenv('AI_MAX_CONCURRENCY', str(CALLS))
+    yield
+    server.shutdown()
+
+
+def test_concurrent_queries_overlap_without_blocking_the_loop(stub_openai, offline):
+    from ai_integration import AICore
+
+    ai = AICore(str(offline / "ai_config.json"))
+    gaps = []
+
+    async def heartbeat(done):
+        last = time.monotonic()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+
+    async def run():
+        # The SDK imports its resource modules on first use; keep that out of the measurement
+        await ai.query_ai("warm up", ai_provider='openai')
+        done = asyncio.Event()
+        beat = asyncio.create_task(heartbeat(done))
+        started = time.monotonic()
+        results = await asyncio.gather(*[ai.query_ai(f"prompt {i}", ai_provider='openai') for i in range(CALLS)])
+        elapsed = time.monotonic() - started
+        done.set()
+        await beat
+        await ai.close()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    assert results == [{'ok': True}] * CALLS
+    # Overlapping requests finish in about one delay, not CALLS of them; leave room for a busy host
+    assert elapsed < DELAY * CALLS / 2
+    # The loop kept running while requests were in flight
+    assert max(gaps) < DELAY / 2
+
+
+def test_moving_to_a_new_loop_closes_the_previous_clients(stub_openai, offline):
+    from ai_integration import AICore
+
+    ai = AICore(str(offline / "ai_config.json"))
+    first = asyncio.new_event_loop()
+    assert first.run_until_complete(ai.query_ai("first", ai_provider='openai')) == {'ok': True}
+    previous = ai.openai_client
+
+    async def second():
+        result = await ai.query_ai("second", ai_provider='openai')
+        await ai.close()
+        return result
+
+    assert asyncio.run(second()) == {'ok': True}
+    assert previous.is_closed()
+    first.close()
+
+
+def test_openai_replies_in_a_code_fence_are_parsed(stub_openai, offline, monkeypatch):
+    from ai_integration import AICore
+
+    monkeypatch.setattr(SlowChatCompletions, 'content', 'Here you go:\n```json\n{"ok": true}\n```')
+    ai = AICore(str(offline / "ai_config.json"))
+
+    async def run():
+        try:
+            return await ai.query_ai("fenced", ai_provider='openai')
+        finally:
+            await ai.close()
+
+    assert asyncio.run(run()) == {'ok': True}
@@ -0,0 +1,24 @@
+"""
+Canonical AI context keeps integer counts exact and rounds floats
+"""
+
+from ai_context import canonical_context, quantize
+
+
+def test_integers_stay_exact_and_floats_are_rounded():
+    assert quantize(1049, 2) == 1049
+    assert quantize(1049.0, 2) == 1000
+    assert quantize(0.12345, 2) == 0.12
+    assert quantize(True, 2) is True
+
+    context = {'total_operatives': 1049, 'average_rank': 2.4567, 'timestamp': 'now'}
+    assert canonical_context(context) == {'total_operatives': 1049, 'average_rank': 2.5}
+    assert canonical_context({**context, 'total_operatives': 1050}) != canonical_context(context)
+
+
+def test_conditions_can_opt_in_to_rounding_integers():
+    assert quantize(1049, 2, integers=True) == 1000
+    condition = {'context': ['total_operatives'], 'round_integers': True}
+    assert canonical_context({'total_operatives': 1049}, condition) == {'total_operatives': 1000}
+    assert canonical_context({'total_operatives': 1049}, condition) == \
+        canonical_context({'total_operatives': 1001}, condition)
@@ -0,0 +1,172 @@
+"""
+Bulk jobs against a local stub of the OpenAI Files and Batch endpoints
+"""
+
+import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bulk_jobs import BulkJob, BulkJobKind, BulkJobStatus
+
+
+class BatchEndpoints(BaseHTTPRequestHandler):
+    """Accepts one batch upload and reports it in progress for `polls` retrievals, then `final`
+
+    The output file answers every request except those in `missing`, which are left out as
+    if the batch expired first, and those in `errors`, which come back as failed requests.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    polls = 1
+    final = 'completed'
+    missing = set()
+    errors = set()
+    custom_ids = []
+    retrievals = 0
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def batch(self):
+        cls = type(self)
+        status = 'in_progress' if cls.retrievals <= cls.polls else cls.final
+        answered = [c for c in cls.custom_ids if c not in cls.missing]
+        return {'id': 'batch-1', 'object': 'batch', 'endpoint': '/v1/chat/completions',
+                'input_file_id': 'file-in', 'completion_window': '24h', 'status': status, 'created_at': 0,
+                'output_file_id': 'file-out' if status != 'in_progress' and answered else None}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['content-length'])).decode()
+        if self.path.endswith('/files'):
+            type(self).custom_ids = re.findall(r'"custom_id": "([^"]+)"', body)
+            self.reply({'id': 'file-in', 'object': 'file', 'bytes': len(body), 'created_at': 0,
+                        'filename': 'batch_requests.jsonl', 'purpose': 'batch', 'status': 'processed'})
+        else:
+            self.reply(self.batch())
+
+    def do_GET(self):
+        cls = type(self)
+        if self.path.endswith('/content'):
+            lines = []
+            for custom_id in cls.custom_ids:
+                if custom_id in cls.missing:
+                    continue
+                if custom_id in cls.errors:
+                    lines.append({'custom_id': custom_id, 'response': {'status_code': 500},
+                                  'error': {'message': 'server error'}})
+                    continue
+                content = json.dumps({'title': f'Quest {custom_id}', 'difficulty': 3})
+                lines.append({'custom_id': custom_id, 'response': {'status_code': 200, 'body': {
+                    'choices': [{'message': {'role': 'assistant', 'content': content}}]}}})
+            self.reply('\n'.join(json.dumps(line) for line in lines).encode())
+        else:
+            cls.retrievals += 1
+            self.reply(self.batch())
+
+
+@pytest.fixture
+def batch_stub(offline, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BatchEndpoints)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('OPENAI_API_KEY', 'stub-key')
+    monkeypatch.setenv('OPENAI_BASE_URL', f'http://127.0.0.1:{server.server_address[1]}/v1')
+    monkeypatch.setenv('AI_CACHE', 'false')
+    for name, value in (('polls', 1), ('final', 'completed'), ('missing', set()), ('errors', set()),
+                        ('custom_ids', []), ('retrievals', 0)):
+        monkeypatch.setattr(BatchEndpoints, name, value)
+    yield BatchEndpoints
+    server.shutdown()
+
+
+def submit(daemon, count):
+    async def run():
+        try:
+            return await daemon.submit_bulk_quests(count, 3, ai_provider='openai')
+        finally:
+            await daemon.ai_core.close()
+    return asyncio.run(run())
+
+
+def resume(daemon, job_id):
+    async def run():
+        try:
+            return await daemon.resume_bulk_job(job_id, poll_interval=0.01)
+        finally:
+            await daemon.ai_core.close()
+    return asyncio.run(run())
+
+
+def test_job_is_resumed_after_a_restart_and_ingested(batch_stub, make_daemon):
+    daemon = make_daemon()
+    job = submit(daemon, 3)
+    assert job.status == BulkJobStatus.SUBMITTED and len(batch_stub.custom_ids) == 3
+    daemon.stop()
+    daemon.running = None
+
+    # A new daemon on the same data directory picks the job up by id
+    restarted = make_daemon()
+    job = resume(restarted, job.job_id)
+    assert job.status == BulkJobStatus.INGESTED
+    assert job.summary == {'created': 3, 'failed': 0, 'duplicates': 0}
+    assert batch_stub.retrievals > batch_stub.polls
+    assert sorted(q.title for q in restarted.quests.values()) == [f'Quest quest-{i}' for i in range(3)]
+    assert restarted.bulk_jobs.get(job.job_id).status == BulkJobStatus.INGESTED
+
+    # Resuming a finished job changes nothing
+    assert resume(restarted, job.job_id).summary == job.summary
+    assert len(restarted.quests) == 3
+
+
+def test_expired_openai_batch_ingests_the_requests_that_finished(batch_stub, make_daemon):
+    batch_stub.final = 'expired'
+    batch_stub.missing = {'quest-2', 'quest-3'}
+    batch_stub.errors = {'quest-1'}
+    daemon = make_daemon()
+    job = resume(daemon, submit(daemon, 4).job_id)
+    assert job.status == BulkJobStatus.INGESTED
+    assert job.summary == {'created': 1, 'failed': 3, 'duplicates': 0}
+    assert [q.title for q in daemon.quests.values()] == ['Quest quest-0']
+
+
+def test_expired_openai_batch_without_output_fails(batch_stub, make_daemon):
+    batch_stub.final = 'expired'
+    batch_stub.missing = {'quest-0', 'quest-1'}
+    daemon = make_daemon()
+    job = resume(daemon, submit(daemon, 2).job_id)
+    assert job.status == BulkJobStatus.FAILED
+    assert len(daemon.quests) == 0
+
+
+def test_bulk_quests_are_written_in_one_transaction(make_daemon):
+    daemon = make_daemon(persistence='sqlite')
+    job = BulkJob('job-1', BulkJobKind.GENERATE_QUESTS, 'claude', 'batch-1',
+                  items={f'q{i}': {'difficulty': 2} for i in range(20)})
+    results = {custom_id: {'title': f'Quest {custom_id}'} for custom_id in job.items}
+
+    statements = []
+    conn = daemon.store.conn
+    conn.set_trace_callback(lambda sql: statements.append((sql.split()[0].upper(), conn.in_transaction)))
+    summary = daemon.ingest_bulk_quests(job, results)
+    conn.set_trace_callback(None)
+
+    assert summary == {'created': 20, 'failed': 0, 'duplicates': 0}
+    inserts = [in_transaction for verb, in_transaction in statements if verb == 'INSERT']
+    assert len(inserts) == 20 and all(inserts)
+    assert [verb for verb, _ in statements].count('COMMIT') == 1
+
+    daemon.stop()
+    daemon.running = None
+    reopened = make_daemon(persistence='sqlite')
+    assert len(reopened.store.query("SELECT id FROM quests")) == 20
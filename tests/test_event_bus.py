@@ -0,0 +1,100 @@
+"""
+Domain events: delivery on the daemon loop and re-evaluation of only the dependent triggers
+"""
+
+import asyncio
+import threading
+
+from event_bus import DependencyIndex, DomainEvent, DomainEventType, EventBus, metric_dependencies
+
+
+async def running(bus):
+    """Start the bus and wait until it accepts events"""
+    task = asyncio.create_task(bus.run())
+    while bus._queue is None:
+        await asyncio.sleep(0)
+    return task
+
+
+async def drained(bus):
+    while not bus._queue.empty():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+def test_events_reach_sync_and_async_handlers_from_any_thread():
+    bus = EventBus()
+    seen = []
+
+    async def slow(event):
+        await asyncio.sleep(0)
+        seen.append(('async', event.data['n']))
+
+    def broken(event):
+        raise RuntimeError("handler bug")
+
+    bus.subscribe(DomainEventType.QUEST_CREATED, broken)
+    bus.subscribe(DomainEventType.QUEST_CREATED, lambda event: seen.append(('sync', event.data['n'])))
+    bus.subscribe(DomainEventType.QUEST_CREATED, slow)
+
+    async def run():
+        task = await running(bus)
+        bus.publish(DomainEvent(DomainEventType.QUEST_CREATED, {'n': 1}))
+        thread = threading.Thread(target=bus.publish, args=(DomainEvent(DomainEventType.QUEST_CREATED, {'n': 2}),))
+        thread.start()
+        thread.join()
+        bus.publish(DomainEvent(DomainEventType.QUEST_ASSIGNED, {'n': 3}))
+        await drained(bus)
+        task.cancel()
+
+    bus.publish(DomainEvent(DomainEventType.QUEST_CREATED, {'n': 0}))
+    asyncio.run(run())
+    assert seen == [('sync', 1), ('async', 1), ('sync', 2), ('async', 2)]
+    assert (bus.published, bus.dropped) == (3, 1)
+
+
+def test_dependency_index_tracks_triggers_per_event():
+    index = DependencyIndex()
+    index.add('t1', metric_dependencies(['total_operatives']))
+    index.add('t2', metric_dependencies(['active_quests', 'total_reputation']))
+    assert index.affected('operative_recruited') == ['t1']
+    assert sorted(index.affected('quest_completed')) == ['t2']
+
+    index.add('t1', metric_dependencies(['completed_quests']))
+    assert index.affected('operative_recruited') == []
+    assert sorted(index.affected('quest_completed')) == ['t1', 't2']
+    index.remove('t2')
+    assert index.affected('quest_assigned') == [] and len(index) == 1
+
+
+def test_mutations_evaluate_only_dependent_triggers(make_daemon):
+    daemon = make_daemon()
+    by_operatives = daemon.create_trigger('condition', {'type': 'operative_count', 'threshold': 2}, 'noop')
+    by_quests = daemon.create_trigger('condition', {'expression': 'completed_quests >= 1'}, 'noop')
+    evaluated = []
+
+    async def record(trigger):
+        evaluated.append(trigger.trigger_id)
+
+    daemon.evaluate_condition_trigger = record
+
+    async def run():
+        task = await running(daemon.event_bus)
+        operative_id = daemon.recruit_operative("ash", ['recon'])
+        await drained(daemon.event_bus)
+        assert evaluated == [by_operatives]
+        quest_id = daemon.create_quest("Relay", "", 1, {'reputation': 10}, {'min_rank': 1})
+        daemon.assign_quest(quest_id, operative_id)
+        await drained(daemon.event_bus)
+        assert evaluated == [by_operatives]
+        daemon.complete_quest(quest_id, operative_id)
+        await drained(daemon.event_bus)
+        assert evaluated == [by_operatives, by_quests]
+
+        daemon.set_trigger_active(by_operatives, False)
+        daemon.recruit_operative("birch", ['recon'])
+        await drained(daemon.event_bus)
+        task.cancel()
+
+    asyncio.run(run())
+    assert evaluated == [by_operatives, by_quests]
@@ -0,0 +1,58 @@
+"""
+Event store: indexed counts, tailing events.jsonl and reloading on change
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from event_store import EventStore
+
+
+def write_json(path, events, mtime):
+    path.write_text(json.dumps(events))
+    # Distinct mtimes, so a rewrite is always seen as a change
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_counts_by_type_and_window(tmp_path):
+    now = datetime.now()
+    events = [{'type': 'ping', 'timestamp': (now - timedelta(minutes=m)).isoformat()} for m in (1, 2, 90)]
+    write_json(tmp_path / 'events.json', events + [{'type': 'pong'}], 1)
+    store = EventStore(tmp_path / 'events.json', check_interval=0)
+    assert store.count('ping') == 3
+    assert store.count('ping', within_seconds=3600) == 2
+    assert store.count('pong') == 1
+    assert store.count('missing') == 0
+    assert store.summary() == {'ping': 3, 'pong': 1}
+
+
+def test_appended_jsonl_records_are_tailed(tmp_path):
+    store = EventStore(tmp_path / 'events.json', check_interval=0)
+    jsonl = tmp_path / 'events.jsonl'
+    with open(jsonl, 'a') as f:
+        f.write(json.dumps({'type': 'ping'}) + '\n')
+    assert store.count('ping') == 1
+    with open(jsonl, 'a') as f:
+        f.write(json.dumps({'type': 'ping'}) + '\n' + '{"type": "pi')
+    # The partially written record is left for the next refresh
+    assert store.count('ping') == 2
+    with open(jsonl, 'a') as f:
+        f.write('ng"}\n')
+    assert store.count('ping') == 3
+
+
+def test_failed_reload_keeps_the_index_and_is_retried(tmp_path):
+    path = tmp_path / 'events.json'
+    write_json(path, [{'type': 'ping'}], 1)
+    store = EventStore(path, check_interval=0)
+    assert store.count('ping') == 1
+
+    path.write_text('[{"type": "ping"}, {"type": "ping"}x')
+    os.utime(path, ns=(2, 2))
+    assert store.count('ping') == 1
+
+    # The file is fixed without changing its signature; the failed read must not count as seen
+    path.write_text('[{"type": "ping"}, {"type": "ping"}]')
+    os.utime(path, ns=(2, 2))
+    assert store.count('ping') == 2
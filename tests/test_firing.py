@@ -0,0 +1,72 @@
+"""
+Hysteresis re-arms on the side of the threshold opposite to the condition
+"""
+
+import pytest
+
+from conditions import ConditionError, compile_condition
+from firing import FiringPolicy, evaluate_firing
+
+
+class Metrics:
+    def __init__(self, **values):
+        self.values = values
+
+    def metric(self, name):
+        return self.values.get(name, 0)
+
+
+def fires(expression, values, hysteresis=2):
+    """Whether each successive metric value fires the trigger"""
+    evaluator = compile_condition('condition', {'expression': expression})
+    policy = FiringPolicy({'hysteresis': hysteresis})
+    state, fired = {}, []
+    for now, value in enumerate(values):
+        met, observed, threshold = evaluator(Metrics(available_quests=value))
+        fire, _ = evaluate_firing(policy, state, met, float(now), observed, threshold, evaluator.direction)
+        fired.append(fire)
+    return fired
+
+
+def test_greater_than_rearms_below_threshold_minus_hysteresis():
+    assert fires('available_quests > 5', [6, 5, 6, 4, 3, 6]) == [True, False, False, False, False, True]
+
+
+def test_less_than_rearms_above_threshold_plus_hysteresis():
+    assert fires('available_quests < 5', [3, 6, 3, 10, 20, 3, 1]) == [True, False, False, False, False, True, False]
+    assert fires('available_quests <= 5', [5, 6, 5, 7, 5]) == [True, False, False, False, True]
+
+
+def test_hysteresis_rejected_without_an_ordering_comparison(make_daemon):
+    daemon = make_daemon()
+    for condition in ({'expression': 'available_quests == 5'},
+                      {'expression': 'available_quests > 5 and total_operatives > 1'}):
+        with pytest.raises(ConditionError):
+            daemon.create_trigger('condition', condition, 'noop', firing={'hysteresis': 2})
+    assert daemon.create_trigger('condition', {'expression': 'available_quests < 5'}, 'noop',
+                                 firing={'hysteresis': 2})
+
+
+def test_max_fires_zero_never_fires_and_negative_is_rejected():
+    policy = FiringPolicy({'mode': 'level', 'max_fires': 0})
+    state = {}
+    assert [evaluate_firing(policy, state, True, float(now))[0] for now in range(3)] == [False] * 3
+    with pytest.raises(ConditionError):
+        FiringPolicy({'max_fires': -1})
+
+
+def test_max_fires_limits_firings_per_window():
+    policy = FiringPolicy({'mode': 'level', 'max_fires': 2, 'window_seconds': 10})
+    state = {}
+    fired = [evaluate_firing(policy, state, True, float(now))[0] for now in (0, 1, 2, 3, 10, 11, 12)]
+    assert fired == [True, True, False, False, True, True, False]
+
+
+def test_rising_edge_cooldown_and_once():
+    def run(firing, mets):
+        policy, state = FiringPolicy(firing), {}
+        return [evaluate_firing(policy, state, met, float(now))[0] for now, met in enumerate(mets)]
+
+    assert run({}, [True, True, False, True]) == [True, False, False, True]
+    assert run({'mode': 'level', 'cooldown_seconds': 2}, [True] * 5) == [True, False, True, False, True]
+    assert run({'mode': 'once'}, [True, False, True]) == [True, False, False]
@@ -0,0 +1,107 @@
+"""
+Journaled persistence: one appended entry per change, replay on load, compaction into the JSON snapshot
+"""
+
+import json
+
+from daemon_core import Operative, Quest, Trigger
+from state_store import JournaledStateStore, StateStore
+
+MODELS = {'triggers': Trigger, 'quests': Quest, 'operatives': Operative}
+
+
+def quest(i, **changes):
+    fields = dict(quest_id=f"q{i}", title=f"Quest {i}", description="", difficulty=1,
+                  rewards={'reputation': 10}, requirements={'min_rank': 1})
+    return Quest(**dict(fields, **changes))
+
+
+def journal_entries(data_dir):
+    return [json.loads(line) for line in (data_dir / "state.journal").read_text().splitlines()]
+
+
+def test_each_change_appends_one_entry(tmp_path):
+    store = JournaledStateStore(tmp_path, MODELS)
+    store.load()
+    store.record('quests', 'q1', quest(1))
+    store.record('quests', 'q1', quest(1, status='active'))
+    store.record('quests', 'q1', None)
+    store.close()
+
+    assert [(e['c'], e['k'], (e['v'] or {}).get('status')) for e in journal_entries(tmp_path)] == [
+        ('quests', 'q1', 'available'), ('quests', 'q1', 'active'), ('quests', 'q1', None)
+    ]
+    # Nothing was rewritten in full
+    assert not (tmp_path / "quests.json").exists()
+
+
+def test_load_replays_the_journal_over_the_snapshot(tmp_path):
+    StateStore(tmp_path, MODELS).save({'triggers': {}, 'operatives': {}, 'quests': {'q1': quest(1), 'q2': quest(2)}})
+    store = JournaledStateStore(tmp_path, MODELS)
+    store.load()
+    store.record('quests', 'q2', quest(2, status='completed'))
+    store.record('quests', 'q1', None)
+    store.record('quests', 'q3', quest(3))
+    store.close()
+
+    state = JournaledStateStore(tmp_path, MODELS).load()
+    assert sorted(state['quests']) == ['q2', 'q3']
+    assert state['quests']['q2'].status == 'completed'
+
+
+def test_torn_final_entry_is_skipped(tmp_path):
+    store = JournaledStateStore(tmp_path, MODELS)
+    store.load()
+    store.record('quests', 'q1', quest(1))
+    store.close()
+    # A crash mid-append leaves half a line behind
+    with open(tmp_path / "state.journal", 'a') as f:
+        f.write('{"c":"quests","k":"q2","v":{"quest_id":"q2","ti')
+
+    reopened = JournaledStateStore(tmp_path, MODELS)
+    assert list(reopened.load()['quests']) == ['q1']
+    reopened.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    store = JournaledStateStore(tmp_path, MODELS, compact_threshold=5)
+    store.load()
+    for i in range(5):
+        store.record('quests', f"q{i}", quest(i))
+    store.compact(wait=True)
+    store.record('quests', 'q5', quest(5))
+    store.close()
+
+    assert sorted(json.loads((tmp_path / "quests.json").read_text())) == [f"q{i}" for i in range(5)]
+    assert [e['k'] for e in journal_entries(tmp_path)] == ['q5']
+    assert not (tmp_path / "state.journal.compacting").exists()
+    # The plain JSON backend reads the compacted snapshot too
+    assert len(StateStore(tmp_path, MODELS).load()['quests']) == 5
+
+
+def test_interrupted_compaction_is_finished_on_load(tmp_path):
+    store = JournaledStateStore(tmp_path, MODELS)
+    store.load()
+    store.record('quests', 'q1', quest(1))
+    store.close()
+    (tmp_path / "state.journal").rename(tmp_path / "state.journal.compacting")
+
+    state = JournaledStateStore(tmp_path, MODELS).load()
+    assert list(state['quests']) == ['q1']
+    assert json.loads((tmp_path / "quests.json").read_text())['q1']['title'] == "Quest 1"
+
+
+def test_daemon_mutations_survive_a_restart(make_daemon):
+    daemon = make_daemon(persistence='journal')
+    operative_id = daemon.recruit_operative("ghost", ['recon'])
+    quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 150}, {'min_rank': 1})
+    daemon.assign_quest(quest_id, operative_id)
+    daemon.complete_quest(quest_id, operative_id)
+    daemon.flush()
+    daemon.store.close()
+
+    # Reopen without the final save, as after a crash
+    reopened = make_daemon(persistence='journal')
+    assert reopened.quests[quest_id].status == 'completed'
+    assert reopened.operatives[operative_id].reputation == 150
+    assert list(reopened.operatives[operative_id].completed_quests) == [quest_id]
@@ -0,0 +1,56 @@
+"""
+Leaderboard index: positions and pages agree with a plain sorted list under random updates
+"""
+
+import random
+
+from leaderboard import LeaderboardIndex
+
+
+def expected_order(standings):
+    return [op_id for op_id, _ in sorted(standings.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))]
+
+
+def test_pages_and_positions_match_a_sorted_list():
+    rng = random.Random(7)
+    standings = {f"op{i:03d}": (rng.randint(1, 5), rng.randint(0, 50)) for i in range(300)}
+    index = LeaderboardIndex((op_id, rank, rep) for op_id, (rank, rep) in standings.items())
+
+    for step in range(600):
+        op_id = f"op{rng.randrange(320):03d}"
+        if op_id in standings and step % 5 == 0:
+            index.remove(op_id)
+            del standings[op_id]
+        else:
+            standings[op_id] = (rng.randint(1, 5), rng.randint(0, 50))
+            index.update(op_id, *standings[op_id])
+
+    order = expected_order(standings)
+    assert len(index) == len(order)
+    assert index.page(0, len(order) + 10) == order
+    for offset, limit in ((0, 10), (37, 25), (len(order) - 3, 10)):
+        assert index.page(offset, limit) == order[offset:offset + limit]
+    assert all(index.position(op_id) == position for position, op_id in enumerate(order))
+
+
+def test_out_of_range_pages_and_unknown_operatives():
+    index = LeaderboardIndex([('a', 1, 0), ('b', 2, 0)])
+    assert index.page(2, 10) == [] and index.page(-1, 10) == [] and index.page(0, 0) == []
+    assert index.position('nobody') is None
+    assert 'a' in index and 'nobody' not in index
+
+
+def test_daemon_leaderboard_follows_completed_quests(make_daemon):
+    daemon = make_daemon()
+    first, second, third = (daemon.recruit_operative(name, ['recon']) for name in ('ash', 'birch', 'cedar'))
+    # Equal standings are ordered by operative id
+    assert daemon.get_operative_standing(third) == {'position': sorted([first, second, third]).index(third) + 1,
+                                                    'total': 3}
+
+    quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 150}, {'min_rank': 1})
+    daemon.assign_quest(quest_id, third)
+    daemon.complete_quest(quest_id, third)
+
+    assert daemon.get_operative_standing(third) == {'position': 1, 'total': 3}
+    assert [op.operative_id for op in daemon.get_leaderboard(limit=1)] == [third]
+    assert [op.operative_id for op in daemon.get_leaderboard(limit=5, offset=1)] == sorted([first, second])
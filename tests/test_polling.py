@@ -0,0 +1,80 @@
+"""
+Polled trigger ticks: bounded concurrency, per-trigger timeouts and the adaptive interval
+"""
+
+import asyncio
+import time
+
+from tick_stats import TickStats
+
+
+def test_interval_backs_off_on_overruns_and_eases_back():
+    stats = TickStats(base_interval=5, max_interval=30)
+    assert stats.record(2) is False and stats.interval == 5
+    assert stats.record(6) is True and stats.interval == 10
+    assert stats.record(12) is True and stats.interval == 20
+    assert stats.record(40) is True and stats.interval == 30
+    assert stats.sleep_time() == 0.0
+
+    for expected in (15, 7.5, 5, 5):
+        stats.record(1)
+        assert stats.interval == expected
+    # A tick that is neither slow nor fast keeps the interval
+    stats.record(4)
+    assert stats.interval == 5 and stats.sleep_time() == 1
+
+    summary = stats.as_dict()
+    assert summary['ticks'] == 9 and summary['overruns'] == 3 and summary['max_duration'] == 40
+
+
+def test_tick_evaluates_triggers_concurrently_within_limits(make_daemon, monkeypatch):
+    monkeypatch.setenv('DAEMON_TRIGGER_CONCURRENCY', '3')
+    monkeypatch.setenv('DAEMON_TRIGGER_TIMEOUT', '0.3')
+    daemon = make_daemon()
+    hanging = daemon.create_trigger('event', {'event_type': 'hang'}, 'noop')
+    failing = daemon.create_trigger('event', {'event_type': 'fail'}, 'noop')
+    for i in range(6):
+        daemon.create_trigger('event', {'event_type': f"ok{i}"}, 'noop')
+    daemon.create_trigger('time', {'interval': 60}, 'noop')
+    running, peak = 0, 0
+
+    async def evaluate(trigger):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            if trigger.trigger_id == failing:
+                raise RuntimeError("bad page")
+            await asyncio.sleep(3600 if trigger.trigger_id == hanging else 0.1)
+            return False, None, None
+        finally:
+            running -= 1
+
+    daemon.evaluate_polled_trigger = evaluate
+    started = time.monotonic()
+    asyncio.run(daemon.check_triggers())
+    elapsed = time.monotonic() - started
+
+    stats = daemon.get_tick_stats()
+    # Time triggers are scheduled, not polled
+    assert stats['triggers_evaluated'] == 8
+    assert (stats['timeouts'], stats['errors']) == (1, 1)
+    assert peak == 3
+    # The hung trigger holds one slot for the timeout while the others share the remaining two
+    assert elapsed < 2
+
+
+def test_overrunning_tick_widens_the_polling_interval(make_daemon, monkeypatch):
+    monkeypatch.setenv('DAEMON_TRIGGER_TIMEOUT', '5')
+    daemon = make_daemon()
+    daemon.tick_stats = TickStats(base_interval=0.05, max_interval=1)
+    daemon.create_trigger('event', {'event_type': 'slow'}, 'noop')
+
+    async def evaluate(trigger):
+        await asyncio.sleep(0.2)
+        return False, None, None
+
+    daemon.evaluate_polled_trigger = evaluate
+    asyncio.run(daemon.check_triggers())
+    assert daemon.tick_stats.overruns == 1
+    assert 0.2 < daemon.tick_stats.interval <= 1
@@ -0,0 +1,53 @@
+"""
+Quest indexes: per-operative quest boards agree with a scan over every quest
+"""
+
+import pytest
+
+from quest_index import QuestIndex
+
+
+def test_quests_move_between_buckets():
+    index = QuestIndex([('q1', 'available', 1, None), ('q2', 'available', 3, None), ('q3', 'available', 0, None)])
+    assert index.available(1) == ['q3', 'q1'] and index.available(5) == ['q3', 'q1', 'q2']
+
+    index.update('q1', 'active', 1, 'op1')
+    assert index.available(5) == ['q3', 'q2'] and index.active('op1') == ['q1']
+    index.update('q1', 'completed', 1, 'op1')
+    assert index.active('op1') == [] and index.completed('op1') == ['q1']
+
+    index.remove('q2')
+    assert index.available(5) == ['q3'] and len(index) == 2
+    # Emptied buckets are dropped rather than left behind
+    assert 3 not in index.available_by_rank and 'op1' not in index.active_by_operative
+
+
+def scanned_board(daemon, operative_id):
+    """Quest board by full scan, the way it was built before the index"""
+    rank = daemon.operatives[operative_id].rank
+    quests = daemon.quests.values()
+    return {
+        'available': sorted(q.quest_id for q in quests
+                            if q.status == 'available' and q.requirements.get('min_rank', 0) <= rank),
+        'active': sorted(q.quest_id for q in quests if q.status == 'active' and q.assigned_to == operative_id),
+        'completed': sorted(q.quest_id for q in quests if q.status == 'completed' and q.assigned_to == operative_id),
+    }
+
+
+@pytest.mark.parametrize('persistence', ['json', 'sqlite'])
+def test_daemon_quest_board_matches_a_scan(make_daemon, persistence):
+    daemon = make_daemon(persistence=persistence)
+    operatives = [daemon.recruit_operative(f"user{i}", ['recon']) for i in range(2)]
+    quests = [daemon.create_quest(f"Quest {i}", "", 1, {'reputation': 150}, {'min_rank': i % 3}) for i in range(9)]
+    # Build the index part way through so later changes are applied to it incrementally
+    daemon.get_quests_for_operative(operatives[0])
+    daemon.assign_quest(quests[0], operatives[0])
+    daemon.assign_quest(quests[3], operatives[0])
+    daemon.complete_quest(quests[0], operatives[0])
+    daemon.assign_quest(quests[1], operatives[1])
+    daemon.create_quest("Late", "", 1, {}, {'min_rank': 1})
+
+    for operative_id in operatives:
+        board = daemon.get_quests_for_operative(operative_id)
+        assert {k: sorted(q.quest_id for q in v) for k, v in board.items()} == scanned_board(daemon, operative_id)
+    assert daemon.get_quests_for_operative('nobody') == {'available': [], 'active': [], 'completed': []}
@@ -0,0 +1,150 @@
+"""
+AI rate limiting: throttled calls are retried after Retry-After and slow the provider down
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limit import RateLimiter, TokenBucket, retry_after_seconds
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def call(limiter, outcomes, estimated_tokens=100):
+    """Run one limited call whose attempts raise or return the given outcomes in turn"""
+    outcomes = list(outcomes)
+
+    async def request():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def run():
+        return await limiter.call(request, estimated_tokens, asyncio.Semaphore(1), usage=lambda r: r['used'])
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('status', [429, 529])
+def test_throttled_call_waits_for_retry_after_and_slows_down(status):
+    limiter = RateLimiter('stub', retry_backoff=5)
+    started = time.monotonic()
+    result = call(limiter, [StatusError(status, {'retry-after-ms': '100'}), {'used': 40}])
+
+    assert result == {'used': 40}
+    assert time.monotonic() - started >= 0.1
+    assert (limiter.counts['throttled'], limiter.counts['retried'], limiter.counts['attempts']) == (1, 1, 2)
+    # Halved by the throttle, then recovering by one step for the success
+    assert limiter.factor == pytest.approx(0.55)
+    assert limiter.counts['tokens_used'] == 40
+
+
+def test_slowdown_stretches_waits_and_recovers_gradually():
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.take(60)
+    assert bucket.time_until(1) == pytest.approx(1, abs=0.05)
+    assert bucket.time_until(1, factor=0.25) == pytest.approx(4, abs=0.2)
+
+    limiter = RateLimiter('stub', min_factor=0.1)
+    for attempt in range(5):
+        limiter.throttled(0, attempt)
+    assert limiter.factor == 0.1
+    for _ in range(20):
+        limiter.succeeded()
+    assert limiter.factor == 1.0
+
+
+def test_non_retryable_and_exhausted_failures_are_raised():
+    limiter = RateLimiter('stub', max_retries=2, retry_backoff=0.01)
+    with pytest.raises(StatusError):
+        call(limiter, [StatusError(400)])
+    assert (limiter.counts['attempts'], limiter.counts['failed']) == (1, 1)
+
+    with pytest.raises(StatusError):
+        call(limiter, [StatusError(502)] * 3)
+    assert (limiter.counts['attempts'], limiter.counts['retried'], limiter.counts['failed']) == (4, 2, 2)
+    # Transient server errors retry without slowing the provider
+    assert limiter.factor == 1.0
+
+
+def test_token_reservation_is_corrected_to_reported_usage():
+    limiter = RateLimiter('stub', tokens_per_minute=1000)
+    call(limiter, [{'used': 100}], estimated_tokens=600)
+    assert limiter.tokens.level == pytest.approx(900, abs=1)
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(StatusError(429, {'retry-after': '2'})) == 2
+    assert retry_after_seconds(StatusError(429, {'retry-after-ms': '250', 'retry-after': '9'})) == 0.25
+    assert retry_after_seconds(StatusError(429, {'retry-after': 'soon'})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+class ChatEndpoint(BaseHTTPRequestHandler):
+    """Chat Completions that answers 429 to the first `throttle` requests"""
+
+    protocol_version = 'HTTP/1.1'
+    throttle = 2
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['content-length']))
+        cls = type(self)
+        cls.requests += 1
+        if cls.requests <= cls.throttle:
+            body = json.dumps({'error': {'message': 'Rate limit reached', 'type': 'rate_limit'}}).encode()
+            self.send_response(429)
+            self.send_header('retry-after-ms', '50')
+        else:
+            body = json.dumps({
+                'id': 'chat-1', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': '{"ok": true}'}}],
+                'usage': {'prompt_tokens': 20, 'completion_tokens': 5, 'total_tokens': 25}
+            }).encode()
+            self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_openai_429s_are_retried_through_the_client(offline, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChatEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(ChatEndpoint, 'requests', 0)
+    monkeypatch.setenv('OPENAI_API_KEY', 'stub-key')
+    monkeypatch.setenv('OPENAI_BASE_URL', f'http://127.0.0.1:{server.server_address[1]}/v1')
+    monkeypatch.setenv('AI_CACHE', 'false')
+    from ai_integration import AICore
+
+    ai_core = AICore(str(offline / "ai_config.json"))
+
+    async def run():
+        try:
+            return await ai_core.query_openai("Say ok", response_format='json')
+        finally:
+            await ai_core.close()
+
+    try:
+        assert asyncio.run(run()) == {'ok': True}
+    finally:
+        server.shutdown()
+    stats = ai_core.get_rate_limit_stats()['openai']
+    assert ChatEndpoint.requests == 3
+    assert (stats['throttled'], stats['retried'], stats['failed'], stats['tokens_used']) == (2, 2, 0, 25)
+    assert stats['rate_factor'] == pytest.approx(0.3)
@@ -0,0 +1,55 @@
+"""
+Slotted records: interned enums, quest-id handles and plain-dict serialization
+"""
+
+import json
+import sys
+from dataclasses import asdict
+
+import pytest
+
+from daemon_core import Operative, Quest, Trigger
+from records import QuestRefs, QuestStatus, TriggerType, record_to_dict
+
+
+def test_status_and_type_strings_become_shared_enum_members():
+    quest = Quest("q1", "Relay", "", 1, {}, {}, status='active')
+    trigger = Trigger("t1", 'web_scrape', {}, 'noop')
+    assert quest.status is QuestStatus.ACTIVE and quest.status == 'active'
+    assert trigger.trigger_type is TriggerType.WEB_SCRAPE
+
+    # Values the enum does not know are kept, interned
+    custom = Quest("q2", "Relay", "", 1, {}, {}, status=''.join(['arch', 'ived']))
+    assert custom.status == 'archived' and custom.status is sys.intern('archived')
+
+
+def test_records_have_no_instance_dict():
+    operative = Operative("op1", "ghost", "Shadow1", 1, 0, ['recon'], [])
+    assert not hasattr(operative, '__dict__')
+    with pytest.raises(AttributeError):
+        operative.nickname = "shade"
+
+
+def test_quest_refs_behave_like_a_list_of_ids():
+    refs = QuestRefs(['q1', 'q2'])
+    refs.append('q3')
+    assert list(refs) == ['q1', 'q2', 'q3'] and len(refs) == 3
+    assert refs[0] == 'q1' and refs[-1] == 'q3' and refs[1:] == ['q2', 'q3']
+    assert 'q2' in refs and 'never-seen' not in refs and 7 not in refs
+    assert refs == ['q1', 'q2', 'q3'] and refs == QuestRefs(['q1', 'q2', 'q3'])
+    assert refs != QuestRefs(['q1'])
+
+
+def test_records_serialize_to_plain_json():
+    operative = Operative("op1", "ghost", "Shadow1", 2, 150, ['recon'], ['q1', 'q2'])
+    quest = Quest("q1", "Relay", "", 1, {'reputation': 50}, {'min_rank': 1}, status='completed')
+    assert isinstance(operative.completed_quests, QuestRefs)
+
+    plain = record_to_dict(operative)
+    assert plain['completed_quests'] == ['q1', 'q2'] and type(plain['completed_quests']) is list
+    assert type(record_to_dict(quest)['status']) is str
+    assert asdict(operative)['completed_quests'] == ['q1', 'q2']
+
+    restored = Operative(**json.loads(json.dumps(plain)))
+    assert restored == operative
+    assert Quest(**json.loads(json.dumps(record_to_dict(quest)))).status is QuestStatus.COMPLETED
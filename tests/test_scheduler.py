@@ -0,0 +1,100 @@
+"""
+Time trigger scheduling: cron and interval deadlines, DST changes and missed-run policies
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scheduler import ScheduleError, TimeSpec, TriggerScheduler
+
+NEW_YORK = 'America/New_York'
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def runs(condition, start, count):
+    """The next count deadlines after start, in UTC"""
+    spec = TimeSpec(condition)
+    result, moment = [], start
+    for _ in range(count):
+        moment = spec.next_after(moment)
+        result.append(moment.astimezone(timezone.utc))
+    return result
+
+
+def test_cron_fields_and_names():
+    # Friday 2026-10-16 17:50 New York time; the next run is Monday 09:00
+    start = utc(2026, 10, 16, 21, 50)
+    assert runs({'cron': '*/15 9-17 * * MON-FRI', 'timezone': NEW_YORK}, start, 2) == [
+        utc(2026, 10, 19, 13, 0), utc(2026, 10, 19, 13, 15)
+    ]
+    assert runs({'cron': '@monthly', 'timezone': 'UTC'}, start, 2) == [utc(2026, 11, 1), utc(2026, 12, 1)]
+    # Both day fields restricted: either may match (the 1st, or any Sunday)
+    assert runs({'cron': '0 0 1 * SUN', 'timezone': 'UTC'}, start, 3) == [
+        utc(2026, 10, 18), utc(2026, 10, 25), utc(2026, 11, 1)
+    ]
+
+
+@pytest.mark.parametrize('condition', [
+    {'cron': '* * *'}, {'cron': '61 * * * *'}, {'cron': '*/0 * * * *'}, {'cron': '0 0 31 2 *'},
+    {'interval': 0}, {'interval': '5 parsecs'}, {'time': '9am'}, {'timezone': 'UTC'},
+    {'interval': 60, 'timezone': 'Mars/Olympus'}, {'interval': 60, 'missed': 'sometimes'},
+])
+def test_invalid_schedules_are_rejected(condition):
+    with pytest.raises(ScheduleError):
+        runs(condition, utc(2026, 1, 1), 1)
+
+
+def test_daily_run_in_the_skipped_hour_fires_once_after_the_gap():
+    # 2026-03-08: New York clocks jump from 02:00 to 03:00
+    assert runs({'time': '02:30', 'timezone': NEW_YORK}, utc(2026, 3, 7, 12), 3) == [
+        utc(2026, 3, 8, 7, 30), utc(2026, 3, 9, 6, 30), utc(2026, 3, 10, 6, 30)
+    ]
+
+
+def test_daily_run_in_the_repeated_hour_fires_once():
+    # 2026-11-01: New York clocks fall back from 02:00 to 01:00, so 01:30 happens twice
+    assert runs({'time': '01:30', 'timezone': NEW_YORK}, utc(2026, 10, 31, 12), 2) == [
+        utc(2026, 11, 1, 5, 30), utc(2026, 11, 2, 6, 30)
+    ]
+
+
+@pytest.mark.parametrize('start', [utc(2026, 3, 8, 5, 30), utc(2026, 11, 1, 3, 30)])
+def test_intervals_are_exact_across_dst_changes(start):
+    deadlines = runs({'interval': '1h', 'timezone': NEW_YORK}, start, 5)
+    assert deadlines == [start + timedelta(hours=n) for n in range(1, 6)]
+
+
+def scheduler_with(condition, deadline):
+    scheduler = TriggerScheduler()
+    scheduler.schedule('t1', dict(condition, timezone='UTC'), next_run=deadline.isoformat())
+    return scheduler
+
+
+@pytest.mark.parametrize('missed, expected', [('skip', 0), ('once', 1), ('catch_up', 4)])
+def test_missed_runs_follow_the_policy(missed, expected):
+    # Down for three and a half intervals; the latest missed run is 30s late
+    condition = {'interval': 60, 'missed': missed, 'misfire_grace_seconds': 10}
+    scheduler = scheduler_with(condition, utc(2026, 1, 1, 0, 0))
+    assert scheduler.due(utc(2026, 1, 1, 0, 3, 30)) == [('t1', expected, utc(2026, 1, 1, 0, 4))]
+
+
+def test_run_within_the_grace_period_always_fires():
+    scheduler = scheduler_with({'interval': 3600, 'misfire_grace_seconds': 60}, utc(2026, 1, 1))
+    assert scheduler.due(utc(2026, 1, 1, 0, 0, 30)) == [('t1', 1, utc(2026, 1, 1, 1))]
+    assert scheduler.due(utc(2026, 1, 1, 0, 59)) == []
+
+
+def test_heap_orders_deadlines_and_drops_unscheduled_triggers():
+    now = utc(2026, 1, 1)
+    scheduler = TriggerScheduler()
+    for trigger_id, seconds in (('slow', 300), ('fast', 60), ('gone', 30)):
+        scheduler.schedule(trigger_id, {'interval': seconds, 'timezone': 'UTC'}, now=now)
+    scheduler.unschedule('gone')
+
+    assert len(scheduler) == 2 and 'gone' not in scheduler
+    assert scheduler.next_deadline() == (now + timedelta(seconds=60)).timestamp()
+    assert [trigger_id for trigger_id, _, _ in scheduler.due(now + timedelta(seconds=300))] == ['fast', 'slow']
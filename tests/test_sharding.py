@@ -0,0 +1,76 @@
+"""
+Two sharded workers on one SQLite database must see each other's changes
+"""
+
+import asyncio
+
+
+def make_workers(make_daemon):
+    return (make_daemon(persistence='sqlite', worker_id='worker-a'),
+            make_daemon(persistence='sqlite', worker_id='worker-b'))
+
+
+def stop(daemon):
+    daemon.stop()
+    daemon.running = None
+
+
+def test_rising_edge_fires_once_across_workers(make_daemon, monkeypatch):
+    a, b = make_workers(make_daemon)
+    executed = []
+
+    async def execute_action(action_id, trigger_id=None):
+        executed.append(trigger_id)
+
+    monkeypatch.setattr(a, 'execute_action', execute_action)
+    monkeypatch.setattr(b, 'execute_action', execute_action)
+
+    trigger_id = a.create_trigger('event', {'event_type': 'ping', 'threshold': 1}, 'noop')
+    # Worker B holds its own copy before worker A fires the trigger
+    assert b.triggers[trigger_id].fire_state == {}
+
+    assert asyncio.run(a.fire_trigger(a.triggers[trigger_id], met=True))
+    assert not asyncio.run(b.fire_trigger(b.triggers[trigger_id], met=True))
+    assert executed == [trigger_id]
+
+
+def test_stopping_a_worker_keeps_another_workers_changes(make_daemon):
+    a, b = make_workers(make_daemon)
+    quest_id = a.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 1})
+    # Worker A holds its own copy before worker B assigns the quest
+    assert a.quests[quest_id].status == 'available'
+
+    operative_id = b.recruit_operative("courier", ["stealth"])
+    assert b.assign_quest(quest_id, operative_id)
+    b.flush()
+    stop(a)
+
+    row = b.store.query("SELECT status, assigned_to FROM quests WHERE id = ?", (quest_id,))
+    assert row == [('active', operative_id)]
+
+
+def test_unsaved_edits_survive_another_workers_change_to_the_same_record(make_daemon, caplog):
+    a, b = make_workers(make_daemon)
+    quest_id = a.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 1})
+    b.quests[quest_id]
+
+    # Worker A edits the title in memory, worker B changes the rewards and persists
+    a.quests[quest_id].title = "Relay, urgent"
+    b.quests[quest_id].rewards = {'reputation': 80}
+    b.persist(('quests', quest_id))
+
+    # A's next read merges B's change and keeps its own edit
+    quest = a.quests[quest_id]
+    assert (quest.title, quest.rewards) == ("Relay, urgent", {'reputation': 80})
+    a.persist(('quests', quest_id))
+    assert (b.quests[quest_id].title, b.quests[quest_id].rewards) == ("Relay, urgent", {'reputation': 80})
+
+    # Both edit the same field: A keeps its value and logs the conflict
+    a.quests[quest_id].description = "From A"
+    b.quests[quest_id].description = "From B"
+    b.persist(('quests', quest_id))
+    with caplog.at_level('WARNING'):
+        assert a.quests[quest_id].description == "From A"
+    assert "also changed by another worker" in caplog.text
+    a.persist(('quests', quest_id))
+    assert b.quests[quest_id].description == "From A"
@@ -0,0 +1,129 @@
+"""
+Binary snapshots round-trip records, decode them lazily and survive an interrupted compaction
+"""
+
+import json
+
+import pytest
+
+from daemon_core import Operative, Quest, Trigger
+from snapshot import SnapshotError, SnapshotReader, write_snapshot
+from state_store import SnapshotStateStore
+
+MODELS = {'triggers': Trigger, 'quests': Quest, 'operatives': Operative}
+
+
+def operative(i, **changes):
+    fields = dict(operative_id=f"op{i:03d}", username=f"user{i}", darknet_name=f"Shadow{i}",
+                  rank=i % 4 + 1, reputation=i * 10, skills=['recon'], completed_quests=[])
+    return Operative(**dict(fields, **changes))
+
+
+def open_store(data_dir, **kwargs):
+    store = SnapshotStateStore(data_dir, MODELS, **kwargs)
+    return store, store.load()
+
+
+def test_reader_finds_every_key_in_sorted_order(tmp_path):
+    records = {f"k{i}": json.dumps({'n': i}).encode() for i in (5, 1, 9, 3)}
+    write_snapshot(tmp_path / "s", {'quests': records.items(), 'operatives': []})
+
+    reader = SnapshotReader(tmp_path / "s")
+    assert list(reader.keys('quests')) == ['k1', 'k3', 'k5', 'k9']
+    assert json.loads(reader.get_raw('quests', 'k9')) == {'n': 9}
+    assert reader.get_raw('quests', 'k4') is None
+    assert reader.count('operatives') == 0 and reader.count('triggers') == 0
+    reader.close()
+
+
+def test_unreadable_file_is_rejected(tmp_path):
+    (tmp_path / "s").write_bytes(b"not a snapshot at all")
+    with pytest.raises(SnapshotError):
+        SnapshotReader(tmp_path / "s")
+
+
+def test_records_round_trip_and_decode_on_first_access(tmp_path):
+    store, state = open_store(tmp_path)
+    for i in range(50):
+        state['operatives'][f"op{i:03d}"] = operative(i)
+    store.save(state)
+    store.close()
+
+    store, state = open_store(tmp_path)
+    operatives = state['operatives']
+    assert len(operatives) == 50 and operatives.materialized == 0
+    assert operatives['op007'] == operative(7)
+    assert 'op049' in operatives and 'op050' not in operatives
+    assert operatives.materialized == 1
+    assert dict(operatives.items()) == {f"op{i:03d}": operative(i) for i in range(50)}
+    store.close()
+
+
+def test_journal_changes_apply_over_the_snapshot_and_compact(tmp_path):
+    store, state = open_store(tmp_path)
+    for i in range(10):
+        state['operatives'][f"op{i:03d}"] = operative(i)
+    store.save(state)
+    store.record('operatives', 'op003', operative(3, reputation=999))
+    store.record('operatives', 'op004', None)
+    store.record('operatives', 'op100', operative(100))
+    store.close()
+
+    store, state = open_store(tmp_path)
+    assert state['operatives']['op003'].reputation == 999
+    assert 'op004' not in state['operatives'] and 'op100' in state['operatives']
+    assert len(state['operatives']) == 10
+    store.compact(wait=True)
+    store.close()
+
+    # The journal is folded into the snapshot; untouched records are copied as they were
+    assert not (tmp_path / "state.journal.compacting").exists()
+    reader = SnapshotReader(tmp_path / "state.snapshot")
+    assert reader.count('operatives') == 10
+    assert json.loads(reader.get_raw('operatives', 'op003'))['reputation'] == 999
+    assert reader.stats()['total_reputation'] == sum(i * 10 for i in range(10) if i not in (3, 4)) + 999 + 1000
+    reader.close()
+
+
+def test_interrupted_compaction_is_folded_on_load(tmp_path):
+    store, state = open_store(tmp_path)
+    state['operatives']['op001'] = operative(1)
+    store.save(state)
+    store.record('operatives', 'op002', operative(2))
+    store.close()
+    # A crash after sealing the journal leaves it under the compacting name
+    (tmp_path / "state.journal").rename(tmp_path / "state.journal.compacting")
+    with open(tmp_path / "state.journal.compacting", 'a') as f:
+        f.write('{"c":"operatives","k":"op0')
+
+    store, state = open_store(tmp_path)
+    assert sorted(state['operatives']) == ['op001', 'op002']
+    assert not (tmp_path / "state.journal.compacting").exists()
+    store.close()
+
+
+def test_json_state_files_are_converted(tmp_path):
+    (tmp_path / "operatives.json").write_text(json.dumps({'op001': {
+        'operative_id': 'op001', 'username': 'user1', 'darknet_name': 'Shadow1', 'rank': 2,
+        'reputation': 10, 'skills': [], 'completed_quests': []
+    }}))
+
+    store, state = open_store(tmp_path)
+    assert (tmp_path / "state.snapshot").exists()
+    assert state['operatives']['op001'].rank == 2
+    store.close()
+
+
+def test_daemon_startup_decodes_only_triggers(make_daemon):
+    daemon = make_daemon(persistence='snapshot')
+    for i in range(20):
+        daemon.recruit_operative(f"user{i}", ['recon'])
+        daemon.create_quest(f"Quest {i}", "", 1, {'reputation': 50}, {'min_rank': 1})
+    daemon.create_trigger('event', {'event_type': 'quest_completed'}, 'ai_decision')
+    daemon.stop()
+    daemon.running = None
+
+    restarted = make_daemon(persistence='snapshot')
+    assert len(restarted.operatives) == 20 and len(restarted.quests) == 20
+    assert restarted.operatives.materialized == 0 and restarted.quests.materialized == 0
+    assert restarted.triggers.materialized == 1
@@ -0,0 +1,125 @@
+"""
+State backends: SQLite migrates JSON state once, serves indexed queries and writes only through persist
+"""
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def traced(daemon):
+    """Verbs and tables of the statements run on a SQLite daemon's connection"""
+    statements = []
+    conn = daemon.store.conn
+    conn.set_trace_callback(lambda sql: statements.append(' '.join(sql.split()[:3]).upper()))
+    try:
+        yield statements
+    finally:
+        conn.set_trace_callback(None)
+
+
+def quest_writes(statements):
+    return [s for s in statements if s.startswith('INSERT OR REPLACE') or s.startswith('DELETE FROM QUESTS')]
+
+
+def test_sqlite_assignment_is_written_once_by_persist(make_daemon, monkeypatch):
+    monkeypatch.setenv('DAEMON_WRITE_BEHIND_MS', '0')
+    daemon = make_daemon(persistence='sqlite')
+    with traced(daemon) as statements:
+        quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 1})
+    assert len(quest_writes(statements)) == 1
+    assert daemon.store.query("SELECT status FROM quests WHERE id = ?", (quest_id,)) == [('available',)]
+
+    # Persisting an unchanged record writes nothing
+    with traced(daemon) as statements:
+        daemon.persist(('quests', quest_id))
+    assert quest_writes(statements) == []
+
+
+def test_sqlite_unsaved_assignments_are_visible_before_they_are_written(make_daemon):
+    daemon = make_daemon(persistence='sqlite')
+    quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 1})
+    trigger_id = daemon.create_trigger('event', {'event_type': 'ping', 'threshold': 1}, 'noop')
+    # Still queued for the background writer
+    assert daemon.store.query("SELECT COUNT(*) FROM quests") == [(0,)]
+
+    assert quest_id in daemon.quests and daemon.quests[quest_id].title == "Relay"
+    assert list(daemon.quests) == [quest_id] and len(daemon.quests) == 1
+    assert [t.trigger_id for t in daemon.store.query_triggers(active=True)] == [trigger_id]
+    assert daemon.store.query_triggers(active=False) == []
+
+    daemon.flush()
+    assert daemon.store.query("SELECT COUNT(*) FROM quests") == [(1,)]
+    assert len(daemon.quests) == 1
+
+    del daemon.quests[quest_id]
+    assert quest_id not in daemon.quests and len(daemon.quests) == 0
+    daemon.persist(('quests', quest_id))
+    daemon.flush()
+    assert daemon.store.query("SELECT COUNT(*) FROM quests") == [(0,)]
+
+
+def test_sqlite_records_survive_a_restart(make_daemon):
+    daemon = make_daemon(persistence='sqlite')
+    quest_id = daemon.create_quest("Relay", "Carry the message.", 2, {'reputation': 50}, {'min_rank': 1})
+    daemon.stop()
+    daemon.running = None
+
+    reopened = make_daemon(persistence='sqlite')
+    assert reopened.quests[quest_id].title == "Relay"
+    assert reopened.quests[quest_id].difficulty == 2
+
+
+def test_repeated_edits_to_one_sqlite_record_are_one_database_write(make_daemon):
+    daemon = make_daemon(persistence='sqlite')
+    assert daemon.writer is not None
+    with traced(daemon) as statements:
+        quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 1})
+        for reputation in range(20):
+            daemon.quests[quest_id].rewards = {'reputation': reputation}
+            daemon.persist(('quests', quest_id))
+        daemon.flush()
+    assert len(quest_writes(statements)) == 1
+    assert daemon.store.query("SELECT data FROM quests")[0][0].count('"reputation": 19') == 1
+
+
+def test_json_state_is_migrated_into_sqlite_once(make_daemon, offline):
+    daemon = make_daemon(persistence='journal')
+    quest_id = daemon.create_quest("Relay", "Carry the message.", 1, {'reputation': 50}, {'min_rank': 3})
+    operative_id = daemon.recruit_operative("ghost", ['recon'])
+    daemon.flush()
+    daemon.store.close()
+    daemon.running = None
+
+    migrated = make_daemon(persistence='sqlite')
+    assert migrated.quests[quest_id].requirements == {'min_rank': 3}
+    assert migrated.operatives[operative_id].username == "ghost"
+    assert migrated.store.query("SELECT status, min_rank, assigned_to FROM quests") == [('available', 3, None)]
+    assert migrated.store.query("SELECT journal_mode FROM pragma_journal_mode") == [('wal',)]
+    assert migrated.store.migrate_from_json() is False
+
+
+def test_sqlite_queries_use_the_indexed_columns(make_daemon):
+    daemon = make_daemon(persistence='sqlite')
+    operatives = [daemon.recruit_operative(f"user{i}", ['recon']) for i in range(3)]
+    quests = [daemon.create_quest(f"Quest {i}", "", 1, {'reputation': 150}, {'min_rank': i}) for i in range(3)]
+    daemon.quests[quests[2]].requirements = {'min_rank': 'high'}
+    daemon.persist(('quests', quests[2]))
+    daemon.assign_quest(quests[0], operatives[0])
+    daemon.complete_quest(quests[0], operatives[0])
+    event = daemon.create_trigger('event', {'event_type': 'ping'}, 'noop')
+    daemon.create_trigger('time', {'interval': 60}, 'noop')
+    daemon.set_trigger_active(event, False)
+    daemon.persist(('triggers', event))
+    daemon.flush()
+
+    assert sorted(daemon.store.quest_entries()) == sorted([
+        (quests[0], 'completed', 0, operatives[0]), (quests[1], 'available', 1, None),
+        (quests[2], 'available', 0, None)
+    ])
+    assert sorted(daemon.store.standings()) == sorted([
+        (operatives[0], 2, 150), (operatives[1], 1, 0), (operatives[2], 1, 0)
+    ])
+    assert [t.trigger_id for t in daemon.store.query_triggers(active=False)] == [event]
+    assert [t.trigger_type for t in daemon.store.query_triggers(active=True)] == ['time']
+    assert daemon.store.query_triggers(trigger_type='event', active=True) == []
+    assert daemon.aggregates.diff(daemon.store.network_stats()) == {}
@@ -0,0 +1,29 @@
+"""
+Trigger definitions are validated when the trigger is created
+"""
+
+import pytest
+
+from conditions import ConditionError
+
+
+@pytest.mark.parametrize('condition', [
+    {'time': '25:00'},
+    {'cron': 'nope'},
+    {'cron': '0 0 31 2 *'},
+    {'interval': -5},
+    {'interval': 60, 'timezone': 'Mars/Olympus_Mons'},
+    {'interval': 60, 'missed': 'sometimes'},
+    {},
+])
+def test_invalid_time_conditions_are_rejected(make_daemon, condition):
+    daemon = make_daemon()
+    with pytest.raises(ConditionError):
+        daemon.create_trigger('time', condition, 'noop')
+    assert not daemon.triggers
+
+
+def test_valid_time_condition_is_scheduled(make_daemon):
+    daemon = make_daemon()
+    trigger_id = daemon.create_trigger('time', {'cron': '*/15 9-17 * * MON-FRI', 'timezone': 'UTC'}, 'noop')
+    assert trigger_id in daemon.scheduler
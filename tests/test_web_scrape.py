@@ -0,0 +1,144 @@
+"""
+web_scrape conditions are validated when compiled, and pages are fetched from a local server
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from conditions import ConditionError, compile_condition
+from web_scrape import WebFetcher
+
+
+@pytest.mark.parametrize('interval', ['soon', None, [5], -1])
+def test_invalid_interval_is_a_condition_error(interval):
+    with pytest.raises(ConditionError, match='interval_seconds'):
+        compile_condition('web_scrape', {'url': 'https://example.com', 'interval_seconds': interval})
+
+
+def test_stored_trigger_with_bad_interval_is_disabled_not_raised(make_daemon):
+    daemon = make_daemon()
+    trigger_id = daemon.create_trigger('web_scrape', {'url': 'https://example.com'}, 'noop')
+    trigger = daemon.triggers[trigger_id]
+    trigger.condition['interval_seconds'] = 'hourly'
+    daemon.invalidate_evaluator(trigger_id)
+    assert daemon.evaluator_for(trigger) is not None
+    assert daemon.evaluator_for(trigger)(daemon) == (False, None, None)
+
+
+class Pages(BaseHTTPRequestHandler):
+    """Pages with ETag and Last-Modified validators, a large page and a slow page"""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append((self.path, dict(self.headers)))
+        if self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                return self.send(304)
+            return self.send(200, b'<p>etag page</p>', [('ETag', '"v1"')])
+        if self.path == '/modified':
+            stamp = 'Wed, 01 Jan 2025 00:00:00 GMT'
+            if self.headers.get('If-Modified-Since') == stamp:
+                return self.send(304)
+            return self.send(200, b'<p>dated page</p>', [('Last-Modified', stamp)])
+        if self.path == '/large':
+            return self.send(200, b'x' * 100000)
+        if self.path == '/slow':
+            with cls.lock:
+                cls.in_flight += 1
+                cls.peak = max(cls.peak, cls.in_flight)
+            time.sleep(0.1)
+            with cls.lock:
+                cls.in_flight -= 1
+        self.send(200, b'<p>Status: UP</p>')
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Pages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Pages, 'requests', [])
+    monkeypatch.setattr(Pages, 'peak', 0)
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def fetch_all(fetcher, *urls):
+    async def run():
+        try:
+            return [await fetcher.fetch(url) for url in urls]
+        finally:
+            await fetcher.close()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('path, header', [('/etag', 'If-None-Match'), ('/modified', 'If-Modified-Since')])
+def test_revalidated_page_is_served_from_the_304(pages, path, header):
+    fetcher = WebFetcher()
+    first, second = fetch_all(fetcher, pages + path, pages + path)
+    assert header not in Pages.requests[0][1] and header in Pages.requests[1][1]
+    assert (first.status, first.not_modified) == (200, False)
+    assert (second.status, second.not_modified) == (304, True)
+    assert second.body == first.body and second.content_hash == first.content_hash
+    assert fetcher.stats['not_modified'] == 1
+
+
+def test_unchanged_body_is_not_decoded_or_extracted_again(pages, monkeypatch):
+    evaluator = compile_condition('web_scrape', {'url': pages + '/status', 'regex': 'Status: (\\w+)',
+                                                 'contains': 'UP', 'interval_seconds': 0})
+    extracted = []
+    extract = evaluator.extract
+    monkeypatch.setattr(evaluator, 'extract', lambda body: extracted.append(body) or extract(body))
+    ctx = SimpleNamespace(web_fetcher=WebFetcher())
+
+    async def run():
+        try:
+            return [await evaluator(ctx) for _ in range(3)]
+        finally:
+            await ctx.web_fetcher.close()
+
+    assert asyncio.run(run()) == [(True, None, None)] * 3
+    assert len(extracted) == 1
+    assert ctx.web_fetcher.stats['unchanged'] == 2 and ctx.web_fetcher.stats['changed'] == 1
+
+
+def test_large_page_is_truncated_at_max_bytes(pages):
+    fetcher = WebFetcher(max_bytes=1000)
+    (result,) = fetch_all(fetcher, pages + '/large')
+    assert len(result.body) == 1000
+    assert fetcher.stats['bytes'] == 1000
+
+
+def test_requests_to_one_host_respect_the_per_host_limit(pages):
+    fetcher = WebFetcher(per_host=2)
+
+    async def run():
+        try:
+            return await asyncio.gather(*[fetcher.fetch(pages + '/slow') for _ in range(6)])
+        finally:
+            await fetcher.close()
+
+    results = asyncio.run(run())
+    assert [r.status for r in results] == [200] * 6
+    assert Pages.peak == 2
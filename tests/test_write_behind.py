@@ -0,0 +1,30 @@
+"""
+The background writer coalesces bursts of changes into one write
+"""
+
+import threading
+
+from state_store import WriteBehindWriter
+
+
+def test_burst_of_changes_is_written_once():
+    calls, written = [], threading.Event()
+
+    def write(changes):
+        calls.append(set(changes))
+        written.set()
+
+    writer = WriteBehindWriter(write, interval_ms=50)
+    for i in range(100):
+        writer.mark_dirty([('quests', f'q{i % 3}')])
+    assert written.wait(2)
+    writer.stop()
+    assert calls == [{('quests', 'q0'), ('quests', 'q1'), ('quests', 'q2')}]
+
+
+def test_stop_flushes_pending_changes():
+    calls = []
+    writer = WriteBehindWriter(calls.append, interval_ms=60000)
+    writer.mark_dirty([('quests', 'q1')])
+    writer.stop()
+    assert calls == [{('quests', 'q1')}]
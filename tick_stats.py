@@ -0,0 +1,69 @@
+"""
+Tick Stats - Timing of the daemon's trigger polling loop
+Records how long each check_triggers tick takes, and adapts the polling interval: it backs off
+when a tick overruns its interval and eases back to the configured interval once ticks are fast.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict
+
+
+class TickStats:
+    """Rolling tick durations plus the adaptive polling interval"""
+
+    def __init__(self, base_interval: float = 5.0, max_interval: float = 60.0, window: int = 100):
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.interval = base_interval
+        self._durations = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.overruns = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.triggers_evaluated = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def record(self, duration: float, evaluated: int = 0, timeouts: int = 0, errors: int = 0) -> bool:
+        """Record a finished tick and adapt the interval; returns True if the tick overran"""
+        with self._lock:
+            self.ticks += 1
+            self.triggers_evaluated += evaluated
+            self.timeouts += timeouts
+            self.errors += errors
+            self.last_duration = duration
+            self.max_duration = max(self.max_duration, duration)
+            self._durations.append(duration)
+
+            overran = duration > self.interval
+            if overran:
+                self.overruns += 1
+                self.interval = min(self.max_interval, max(self.interval * 2, duration * 1.5))
+            elif duration < self.base_interval / 2:
+                self.interval = max(self.base_interval, self.interval / 2)
+            return overran
+
+    def sleep_time(self) -> float:
+        """Delay before the next tick, so ticks start one interval apart"""
+        with self._lock:
+            return max(self.interval - self.last_duration, 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            durations = sorted(self._durations)
+            count = len(durations)
+            return {
+                'ticks': self.ticks,
+                'interval': round(self.interval, 3),
+                'base_interval': self.base_interval,
+                'last_duration': round(self.last_duration, 3),
+                'mean_duration': round(sum(durations) / count, 3) if count else 0.0,
+                'p95_duration': round(durations[min(int(count * 0.95), count - 1)], 3) if count else 0.0,
+                'max_duration': round(self.max_duration, 3),
+                'overruns': self.overruns,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'triggers_evaluated': self.triggers_evaluated
+            }
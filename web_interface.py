@@ -5,13 +5,17 @@ This provides the user-facing interface for the daemon system.
 
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 from flask_cors import CORS
+import asyncio
 import secrets
+import threading
 import hashlib
 import json
 import os
 from datetime import datetime
 from pathlib import Path
 from daemon_core import DaemonCore
+from records import record_to_dict
+from firing import FiringPolicy
 from dotenv import load_dotenv
 import fade
 # Load environment variables
@@ -44,6 +48,17 @@ CORS(app)
 # Initialize daemon core
 daemon = DaemonCore()
 
+# One long-lived event loop for the daemon's async calls, so the AI clients and their
+# pooled connections are reused across requests instead of rebuilt for each one
+event_loop = asyncio.new_event_loop()
+threading.Thread(target=event_loop.run_forever, daemon=True).start()
+
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, event_loop).result()
+
+
 # Store sessions securely
 SESSION_DIR = Path("./daemon_data/sessions")
 SESSION_DIR.mkdir(exist_ok=True, parents=True)
@@ -184,27 +199,12 @@ def get_quests():
     if not operative:
         return jsonify({'error': 'Operative not found'}), 404
     
-    # Get available quests
-    available_quests = []
-    active_quests = []
-    completed_quests = []
-    
-    from dataclasses import asdict
-    
-    for quest in daemon.quests.values():
-        quest_dict = asdict(quest)
-        
-        if quest.status == 'available' and quest.requirements.get('min_rank', 0) <= operative.rank:
-            available_quests.append(quest_dict)
-        elif quest.status == 'active' and quest.assigned_to == operative_id:
-            active_quests.append(quest_dict)
-        elif quest.status == 'completed' and quest.quest_id in operative.completed_quests:
-            completed_quests.append(quest_dict)
+    quests = daemon.get_quests_for_operative(operative_id)
     
     return jsonify({
-        'available': available_quests,
-        'active': active_quests,
-        'completed': completed_quests
+        'available': [record_to_dict(q) for q in quests['available']],
+        'active': [record_to_dict(q) for q in quests['active']],
+        'completed': [record_to_dict(q) for q in quests['completed']]
     })
 
 
@@ -239,38 +239,60 @@ def complete_quest(quest_id):
 @app.route('/api/network/status')
 def network_status():
     """Get overall network status"""
+    context = daemon.get_network_context()
     return jsonify({
-        'total_operatives': len(daemon.operatives),
-        'active_operatives': sum(1 for op in daemon.operatives.values() if op.active),
-        'total_quests': len(daemon.quests),
-        'completed_quests': sum(1 for q in daemon.quests.values() if q.status == 'completed'),
-        'active_triggers': sum(1 for t in daemon.triggers.values() if t.active),
+        'total_operatives': context['total_operatives'],
+        'active_operatives': context['active_operatives'],
+        'total_quests': context['total_quests'],
+        'completed_quests': context['completed_quests'],
+        'active_triggers': context['active_triggers'],
         'timestamp': datetime.now().isoformat()
     })
 
 
 @app.route('/api/leaderboard')
 def leaderboard():
-    """Get operative leaderboard"""
-    from dataclasses import asdict
+    """Get operative leaderboard, paginated with ?page=&per_page="""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+    offset = (page - 1) * per_page
     
-    operatives = sorted(
-        daemon.operatives.values(),
-        key=lambda op: (op.rank, op.reputation),
-        reverse=True
-    )
+    operatives = daemon.get_leaderboard(per_page, offset)
     
     return jsonify([
         {
+            'position': offset + i + 1,
             'darknet_name': op.darknet_name,
             'rank': op.rank,
             'reputation': op.reputation,
             'completed_quests': len(op.completed_quests)
         }
-        for op in operatives[:10]
+        for i, op in enumerate(operatives)
     ])
 
 
+@app.route('/api/leaderboard/me')
+def leaderboard_me():
+    """Get the current operative's leaderboard position"""
+    if 'operative_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    operative_id = session['operative_id']
+    operative = daemon.operatives.get(operative_id)
+    standing = daemon.get_operative_standing(operative_id)
+
+    if not operative or not standing:
+        return jsonify({'error': 'Operative not found'}), 404
+
+    return jsonify({
+        'position': standing['position'],
+        'total_operatives': standing['total'],
+        'darknet_name': operative.darknet_name,
+        'rank': operative.rank,
+        'reputation': operative.reputation
+    })
+
+
 @app.route('/triggers')
 def triggers_page():
     """Trigger management page"""
@@ -304,16 +326,16 @@ def create_trigger():
     if not description:
         return jsonify({'error': 'Description required'}), 400
     
-    import asyncio
-    
+    # Optional firing policy: mode, cooldown_seconds, max_fires, window_seconds, hysteresis
+    firing = data.get('firing')
+    try:
+        FiringPolicy(firing)
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'Invalid firing policy: {e}'}), 400
+
     # Run async trigger creation
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        trigger_id = loop.run_until_complete(
-            daemon.create_trigger_from_natural_language(description)
-        )
-        loop.close()
+        trigger_id = run_async(daemon.create_trigger_from_natural_language(description, firing))
         
         if trigger_id:
             return jsonify({
@@ -358,15 +380,8 @@ def generate_quest():
     data = request.json
     difficulty = data.get('difficulty', 2)
     
-    import asyncio
-    
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        quest_id = loop.run_until_complete(
-            daemon.generate_quest_with_ai(difficulty)
-        )
-        loop.close()
+        quest_id = run_async(daemon.generate_quest_with_ai(difficulty))
         
         if quest_id:
             return jsonify({
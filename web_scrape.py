@@ -0,0 +1,228 @@
+"""
+Web Scrape - Pooled async page fetching for web_scrape triggers
+All web_scrape triggers share one HTTP connection pool with a per-host concurrency limit.
+Pages are fetched with ETag/Last-Modified conditional requests and content-hashed, so an
+unchanged page is neither re-parsed nor passed on to the trigger's action.
+
+Condition:
+    {"url": "https://example.com/status",
+     "selector": "div.status"  or  "regex": "Status: (\\w+)",   (optional extraction rule)
+     "match": "DOWN|DEGRADED"  or  "contains": "outage",        (optional; fire while it matches)
+     "interval_seconds": 300}                                   (minimum time between fetches)
+Without match/contains the trigger fires when the extracted text changes.
+CSS selectors need beautifulsoup4; regex extraction has no extra dependency.
+"""
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from conditions import ConditionError
+from http_pool import ConnectionStats, PoolConfig, pooled_client
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResult:
+    """Outcome of one fetch; body is the current page text (from cache when unchanged)"""
+
+    __slots__ = ('status', 'body', 'content_hash', 'not_modified')
+
+    def __init__(self, status: int, body: str, content_hash: str, not_modified: bool):
+        self.status = status
+        self.body = body
+        self.content_hash = content_hash
+        self.not_modified = not_modified
+
+
+class WebFetcher:
+    """Shared async HTTP client with per-host limits and conditional GETs"""
+
+    def __init__(self, max_connections: int = 20, per_host: int = 2, timeout: float = 15.0,
+                 max_bytes: int = 2 * 1024 * 1024):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        # url -> (etag, last_modified, content_hash, body)
+        self._pages: Dict[str, Tuple[Optional[str], Optional[str], str, str]] = {}
+        self.connection_stats = ConnectionStats()
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'errors': 0, 'bytes': 0}
+
+    @classmethod
+    def from_env(cls) -> 'WebFetcher':
+        return cls(
+            max_connections=int(os.getenv('DAEMON_SCRAPE_MAX_CONNECTIONS', '20')),
+            per_host=int(os.getenv('DAEMON_SCRAPE_PER_HOST', '2')),
+            timeout=float(os.getenv('DAEMON_SCRAPE_TIMEOUT', '15')),
+            max_bytes=int(float(os.getenv('DAEMON_SCRAPE_MAX_MB', '2')) * 1024 * 1024)
+        )
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        # The pool belongs to the loop that created it
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            config = PoolConfig(max_connections=self.max_connections, max_keepalive=self.max_connections,
+                                timeout=self.timeout, connect_timeout=min(self.timeout, 10.0))
+            self._client = pooled_client(
+                config, self.connection_stats,
+                follow_redirects=True,
+                headers={'User-Agent': 'DaemonCore-WebScrape/1.0'}
+            )
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    async def fetch(self, url: str) -> FetchResult:
+        """GET a page, revalidating against the previous response"""
+        client = self._client_for_loop()
+        host = urlsplit(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        cached = self._pages.get(url)
+        headers = {}
+        if cached:
+            etag, last_modified = cached[0], cached[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        async with limit:
+            self.stats['requests'] += 1
+            try:
+                async with client.stream('GET', url, headers=headers) as response:
+                    if response.status_code == 304 and cached:
+                        self.stats['not_modified'] += 1
+                        return FetchResult(304, cached[3], cached[2], True)
+                    response.raise_for_status()
+                    chunks, size = [], 0
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= self.max_bytes:
+                            logger.warning(f"Truncated {url} at {self.max_bytes} bytes")
+                            break
+                    raw = b''.join(chunks)[:self.max_bytes]
+                    encoding = response.encoding or 'utf-8'
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+                    status = response.status_code
+            except httpx.HTTPError:
+                self.stats['errors'] += 1
+                raise
+
+        self.stats['bytes'] += len(raw)
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if cached and cached[2] == content_hash:
+            self.stats['unchanged'] += 1
+            body = cached[3]
+        else:
+            self.stats['changed'] += 1
+            body = raw.decode(encoding, errors='replace')
+        self._pages[url] = (etag, last_modified, content_hash, body)
+        return FetchResult(status, body, content_hash, False)
+
+    async def close(self):
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except RuntimeError:
+                pass
+            self._client = None
+            self._loop = None
+
+
+class WebScrapeEvaluator:
+    """Compiled web_scrape condition with the trigger's last observation"""
+
+    metrics = frozenset()
+    direction = None
+
+    def __init__(self, condition: Dict[str, Any]):
+        url = condition.get('url')
+        if not isinstance(url, str) or urlsplit(url).scheme not in ('http', 'https'):
+            raise ConditionError("web_scrape condition needs an http(s) 'url'")
+        self.url = url
+        self.selector = condition.get('selector')
+        self.regex = None
+        self.match = None
+        self.contains = condition.get('contains')
+        try:
+            if condition.get('regex'):
+                self.regex = re.compile(condition['regex'], re.S)
+            if condition.get('match'):
+                self.match = re.compile(condition['match'])
+        except re.error as e:
+            raise ConditionError(f"Invalid regex in web_scrape condition: {e}")
+        if self.selector and BeautifulSoup is None:
+            raise ConditionError("CSS selectors need beautifulsoup4 (pip install beautifulsoup4)")
+        self.fire_on_change = self.match is None and self.contains is None
+        interval = condition.get('interval_seconds', os.getenv('DAEMON_SCRAPE_INTERVAL', '300'))
+        try:
+            self.interval = float(interval)
+        except (TypeError, ValueError):
+            raise ConditionError(f"web_scrape 'interval_seconds' must be a number of seconds, got {interval!r}")
+        if self.interval < 0:
+            raise ConditionError(f"web_scrape 'interval_seconds' must not be negative, got {interval!r}")
+
+        self.last_fetched: Optional[float] = None
+        self.last_hash: Optional[str] = None
+        self.extracted: Optional[str] = None
+        self.met = False
+
+    def extract(self, body: str) -> str:
+        """Apply the extraction rule to a page"""
+        if self.selector:
+            soup = BeautifulSoup(body, 'html.parser')
+            return '\n'.join(el.get_text(' ', strip=True) for el in soup.select(self.selector))
+        if self.regex:
+            return '\n'.join(
+                m.group(1) if m.groups() else m.group(0) for m in self.regex.finditer(body)
+            )
+        return body
+
+    def matches(self, text: str) -> bool:
+        if self.match is not None and not self.match.search(text):
+            return False
+        if self.contains is not None and self.contains not in text:
+            return False
+        return True
+
+    async def __call__(self, ctx) -> Tuple[bool, None, None]:
+        now = time.monotonic()
+        if self.last_fetched is not None and now - self.last_fetched < self.interval:
+            # Between fetches a change has already been reported; a match still holds
+            return (False if self.fire_on_change else self.met), None, None
+        self.last_fetched = now
+
+        result = await ctx.web_fetcher.fetch(self.url)
+        if result.content_hash == self.last_hash:
+            return (False if self.fire_on_change else self.met), None, None
+
+        extracted = self.extract(result.body)
+        first_fetch = self.last_hash is None
+        self.last_hash = result.content_hash
+        previous, self.extracted = self.extracted, extracted
+
+        if self.fire_on_change:
+            # The first fetch is the baseline, not a change
+            self.met = not first_fetch and extracted != previous
+        else:
+            self.met = self.matches(extracted)
+        return self.met, None, None
@@ -0,0 +1,55 @@
+"""
+Workers - Run the daemon as several sharded worker processes
+Each worker is a full DaemonCore on the shared SQLite state that evaluates only the triggers
+on the shards it holds leases for (see sharding.py).
+
+Usage: python workers.py [count] [data_dir]
+"""
+
+import sys
+import asyncio
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(worker_id: str, data_dir: str):
+    """Process entry point: run one sharded daemon until interrupted"""
+    from daemon_core import DaemonCore
+
+    daemon = DaemonCore(data_dir, persistence='sqlite', worker_id=worker_id)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        logger.info(f"Worker {worker_id} shutdown requested")
+    finally:
+        daemon.stop()
+
+
+def run_workers(count: int, data_dir: str = "./daemon_data"):
+    """Start count worker processes and wait for them to exit"""
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(f"worker-{i}", data_dir), name=f"daemon-worker-{i}")
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {count} daemon workers")
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping daemon workers")
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.getenv('DAEMON_WORKERS', str(os.cpu_count() or 1)))
+    run_workers(count, sys.argv[2] if len(sys.argv) > 2 else "./daemon_data")